@@ -1,21 +1,41 @@
 from __future__ import annotations
 
 import json
+import random
 import re
+import time
+from dataclasses import asdict
 from typing import Any, Dict, List, Optional
 
-from langchain_ollama import ChatOllama
+from nodes.llm_guard import LLMUnavailable
+from nodes.llm_provider import DEFAULT_NUM_CTX, LLMConfig, cascade_model, cascade_tiers, chat_invoke
+from nodes.prompt_budget import PromptSection, assemble_prompt, messages_tokens, prompt_budget
+from nodes.retry_scheduler import FIRST_CONTEXT, fixed_ladder, plan_attempt, primary_reason, record_outcome, scheduler_mode
 from nodes.state import DebateState
+from nodes.structured_output import (
+    ARGUMENT_SCHEMA,
+    PATH_FAILED,
+    PATH_TRUNCATED,
+    count_parse,
+    json_format,
+    parse_json_object,
+)
+from nodes.telemetry import record_cascade
+from nodes.token_stream import reject_draft
 
 
 def _clean(s: str) -> str:
     return (s or "").strip()
 
 
-def _llm_from_state(state: Dict[str, Any], temperature: float) -> ChatOllama:
-    model = state.get("llmmodel", "llama3.2:1b")
-    max_tokens = int(state.get("llmmaxtokens", 320))
-    return ChatOllama(model=model, temperature=temperature, num_predict=max_tokens, format="json")
+def _llm_config(state: Dict[str, Any], model: str, temperature: float) -> LLMConfig:
+    return LLMConfig(
+        model=model,
+        temperature=temperature,
+        max_tokens=int(state.get("llmmaxtokens", 320)),
+        num_ctx=int(state.get("llmnumctx", DEFAULT_NUM_CTX)),
+        format=json_format(state, ARGUMENT_SCHEMA),
+    )
 
 
 def _sentences(text: str) -> List[str]:
@@ -78,7 +98,9 @@ def _agent_turn(state: DebateState, speaker: str) -> DebateState:
     last_opp = (memory or {}).get("lastopponentturn") or {}
     opp_text = _clean(last_opp.get("text", ""))
 
-    model_name = out.get("llmmodel", "llama3.2:1b")
+    # Drafts start on the cheapest model; a retry escalates one tier (see cascade_tiers).
+    tiers = cascade_tiers(out)
+    model_name = tiers[0]
     max_tokens = int(out.get("llmmaxtokens", 320))
 
     retrycount = int(out.get("retrycount", 0))
@@ -94,12 +116,15 @@ def _agent_turn(state: DebateState, speaker: str) -> DebateState:
             "pendingspeaker": pending,
             "agent_name": agent_name,
             "model": model_name,
+            "cascade": tiers,
             "temperature_base": float(out.get("llmtemperature", 0.2)),
             "max_tokens": max_tokens,
             "topic_preview": topic[:120],
             "opp_text_preview": opp_text[:160],
             "retrycount": retrycount,
+            "max_retries": int(out.get("maxretries", 2)),
             "retryreason_preview": retryreason[:120],
+            "retry_scheduler": scheduler_mode(out),
         },
         "output": {},
     }
@@ -121,78 +146,154 @@ def _agent_turn(state: DebateState, speaker: str) -> DebateState:
 
     max_retries = int(out.get("maxretries", 2))
     base_temp = float(out.get("llmtemperature", 0.2))
-    temps = [base_temp] + [min(0.9, base_temp + 0.15 * i) for i in range(1, max_retries + 1)]
+    temps = fixed_ladder(base_temp, max_retries)
 
     # If MemoryNode already rejected, don't restart at attempt 0.
     start_i = min(max(retrycount, 0), len(temps) - 1)
 
     last_raw = ""
     last_reason = ""
+    llm_calls = 0
+    seed = out.get("seed")
+    guard: Dict[str, Any] = {}
+    out["pendingattempt"] = {}
+
+    system = (
+        f"You are {agent_name} in a debate.\n"
+        f"Topic: {topic}\n"
+        f"Persona: {persona}\n"
+        "Return ONLY valid JSON with keys: argument.\n"
+        "Hard constraints:\n"
+        "- Write one cohesive paragraph of 2–4 sentences.\n"
+        "- Stay strictly on the topic.\n"
+        "- Do not include headings, bullets, or labels.\n"
+        "- Do not ask questions.\n"
+        "- Do not start with boilerplate or contrast-openers such as: "
+        "'While', 'While the idea', 'While the creation', 'While the technical aspects', 'However,'.\n"
+    )
 
-    for attempt, temp in enumerate(temps[start_i:], start=start_i):
-        system = (
-            f"You are {agent_name} in a debate.\n"
-            f"Topic: {topic}\n"
-            f"Persona: {persona}\n"
-            "Return ONLY valid JSON with keys: argument.\n"
-            "Hard constraints:\n"
-            "- Write one cohesive paragraph of 2–4 sentences.\n"
-            "- Stay strictly on the topic.\n"
-            "- Do not include headings, bullets, or labels.\n"
-            "- Do not ask questions.\n"
-            "- Do not start with boilerplate or contrast-openers such as: "
-            "'While', 'While the idea', 'While the creation', 'While the technical aspects', 'However,'.\n"
-        )
-
-        user = "Write your next round argument."
-        if opp_text:
-            q = _pick_quote_from_opponent(opp_text)
-            if q:
-                user += f"\nOpponent last point (respond to it): {q}"
-
-        if retrycount > 0 or attempt > start_i:
-            user += "\nThis is a rewrite request."
-            if retryreason:
-                user += f"\nRejection reason(s): {retryreason}"
-            user += "\nDo NOT reuse any full sentence from the rejected draft."
-            user += "\nDo NOT begin your first sentence with: While / However / The debate on."
+    # Prompt + completion must fit in num_ctx; the user message absorbs any trimming.
+    budget = prompt_budget(int(out.get("llmnumctx", DEFAULT_NUM_CTX)), max_tokens)
+    system_tokens = messages_tokens(system)
+    user_budget = budget - system_tokens - messages_tokens("")
+    quote = _pick_quote_from_opponent(opp_text) if opp_text else ""
+
+    for attempt, ladder_temp in enumerate(temps[start_i:], start=start_i):
+        rewrite = retrycount > 0 or attempt > start_i
+        if attempt > start_i:
+            context = last_reason or FIRST_CONTEXT
+        else:
+            context = primary_reason(retryreason) if retrycount > 0 else FIRST_CONTEXT
+        rng = random.Random(f"{seed}-{roundidx}-{speaker}-{attempt}") if seed is not None else random.Random()
+        plan = plan_attempt(out, context, ladder_temp, rng)
+        temp = plan.temperature
+        retry = retrycount + attempt - start_i
+        tier, model = cascade_model(tiers, retry)
+        sections = [PromptSection("instruction", "Write your next round argument.", priority=100)]
+        if quote:
+            sections.append(
+                PromptSection("opponent_quote", f"Opponent last point (respond to it): {quote}", priority=60, max_tokens=120, min_tokens=16)
+            )
+
+        if rewrite:
+            sections.append(
+                PromptSection(
+                    "rewrite_rules",
+                    "This is a rewrite request.\n"
+                    + (f"Rejection reason(s): {retryreason}\n" if retryreason else "")
+                    + "Do NOT reuse any full sentence from the rejected draft.\n"
+                    "Do NOT begin your first sentence with: While / However / The debate on.",
+                    priority=90,
+                    max_tokens=120,
+                )
+            )
+            if plan.hint:
+                sections.append(PromptSection("hint", f"Hint: {plan.hint}", priority=80, max_tokens=48))
             if lastrejected:
-                user += f"\nPrevious rejected text (forbidden to copy): {lastrejected}"
+                sections.append(
+                    PromptSection(
+                        "rejected_text",
+                        f"Previous rejected text (forbidden to copy): {lastrejected}",
+                        priority=10,
+                        max_tokens=360,
+                        min_tokens=24,
+                    )
+                )
+
+        user, prompt_report = assemble_prompt(sections, max(0, user_budget))
+        prompt_tokens = system_tokens + messages_tokens(user)
 
         # record attempt metadata
         out["last_node_io"]["output"] = {
             "attempt": attempt,
+            "model": model,
+            "tier": tier,
             "temperature": temp,
+            "arm": plan.arm,
+            "context": context,
             "start_i": start_i,
             "system_preview": system[:260],
             "user_preview": user[:260],
+            "prompt_tokens": prompt_tokens,
+            "prompt_budget": budget,
+            "prompt_sections": prompt_report["sections"],
+            "prompt_trimmed": prompt_report["trimmed"] + prompt_report["dropped"],
         }
 
-        llm = _llm_from_state(out, temperature=temp)
-        msg = llm.invoke([{"role": "system", "content": system}, {"role": "user", "content": user}])
+        messages = [{"role": "system", "content": system}, {"role": "user", "content": user}]
+        try:
+            label = {"round": roundidx + 1, "speaker": speaker, "agent": agent_name, "retry": retry}
+            t0 = time.perf_counter()
+            msg, guard = chat_invoke(out, _llm_config(out, model, temperature=temp), messages, stream_label=label)
+            wall_s = time.perf_counter() - t0
+        except LLMUnavailable as e:
+            # Backend unhealthy: stop spending retries and take the fallback argument path.
+            guard = e.decisions
+            last_reason = "llm_unavailable"
+            out["last_node_io"]["output"]["llm_guard"] = guard
+            break
+        out["last_node_io"]["output"]["llm_guard"] = guard
         raw = getattr(msg, "content", str(msg)).strip()
         last_raw = raw
-
-        try:
-            data = json.loads(raw)
-        except Exception:
-            last_reason = "non_json"
+        llm_calls += 1
+
+        data, parse_path = parse_json_object(raw)
+        count_parse(out, "argument", parse_path)
+        out["last_node_io"]["output"]["parse_path"] = parse_path
+        if parse_path in (PATH_FAILED, PATH_TRUNCATED) or data is None:
+            # A reply cut off at num_predict would close into a mid-sentence argument.
+            last_reason = "truncated_output" if parse_path == PATH_TRUNCATED else "non_json"
+            reject_draft(last_reason)
+            record_outcome(out, asdict(plan), accepted=False, reasons=[last_reason])
+            record_cascade(out, "agent", tier, model, accepted=False, wall_s=wall_s)
             continue
 
-        argument = _clean(data.get("argument", ""))
+        argument = _clean(str(data.get("argument", "")))
         reason = _validate_argument(argument)
         if reason:
             last_reason = reason
+            reject_draft(last_reason)
+            record_outcome(out, asdict(plan), accepted=False, reasons=[last_reason])
+            record_cascade(out, "agent", tier, model, accepted=False, wall_s=wall_s)
             continue
 
         out["pendingagentname"] = agent_name
         out["pendingtext"] = json.dumps({"argument": argument}, ensure_ascii=False)
+        # MemoryNode records whether this draft is accepted (retry scheduler arm and cascade tier).
+        out["pendingattempt"] = {**asdict(plan), "tier": tier, "model": model, "wall_s": round(wall_s, 4)}
 
         out["last_node_io"]["output"] = {
             "action": "produced_pendingtext",
             "attempt": attempt,
+            "model": model,
+            "tier": tier,
             "temperature": temp,
+            "arm": plan.arm,
+            "llm_calls": llm_calls,
+            "llm_guard": guard,
             "start_i": start_i,
+            "prompt_tokens": prompt_tokens,
+            "parse_path": parse_path,
             "argument_preview": argument[:220],
         }
         return out
@@ -234,6 +335,8 @@ def _agent_turn(state: DebateState, speaker: str) -> DebateState:
         "last_reason": last_reason,
         "last_raw_preview": last_raw[:200],
         "argument_preview": argument[:220],
+        "llm_calls": llm_calls,
+        "llm_guard": guard,
         "start_i": start_i,
     }
     return out
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+
+DEFAULT_BACKEND = "http://127.0.0.1:11434"
+DEFAULT_CONCURRENCY = 2
+HEALTH_INTERVAL_S = 15.0
+HEALTH_TIMEOUT_S = 2.0
+
+
+@dataclass
+class Backend:
+    url: str
+    max_concurrency: int = DEFAULT_CONCURRENCY
+    outstanding: int = 0
+    healthy: bool = True
+    loaded: Set[str] = field(default_factory=set)   # models resident on this server (from /api/ps + what we sent)
+    served: int = 0
+    failures: int = 0
+
+
+def default_base_url() -> str:
+    """The endpoint ChatOllama uses without a base_url: $OLLAMA_HOST, else localhost:11434."""
+    host = os.environ.get("OLLAMA_HOST", "").strip() or "127.0.0.1:11434"
+    return host if "://" in host else f"http://{host}"
+
+
+def parse_backend_spec(spec: str) -> Tuple[str, int]:
+    """'http://host:port' or 'http://host:port=N' (N = max concurrent requests)."""
+    spec = spec.strip()
+    url, _, n = spec.partition("=")
+    url = url.rstrip("/")
+    if "://" not in url:
+        url = "http://" + url
+    return url, int(n) if n.strip() else DEFAULT_CONCURRENCY
+
+
+class BackendPool:
+    """
+    Routes each request to a healthy backend with free capacity:
+    1) servers that already hold the model (affinity keeps weights warm),
+    2) then idle servers with nothing loaded,
+    3) then anything else; ties broken by fewest outstanding requests.
+    """
+
+    def __init__(self, specs: Sequence[str], health_interval_s: float = HEALTH_INTERVAL_S):
+        self.backends: List[Backend] = []
+        for s in specs:
+            url, n = parse_backend_spec(s)
+            self.backends.append(Backend(url=url, max_concurrency=max(1, n)))
+        if not self.backends:
+            self.backends.append(Backend(url=DEFAULT_BACKEND))
+        self.key = ",".join(b.url for b in self.backends)
+        self._cond = threading.Condition()
+        self._health_interval_s = health_interval_s
+        self._health_thread: Optional[threading.Thread] = None
+
+    # ---------- routing ----------
+    def _rank(self, b: Backend, model: str) -> Tuple[int, int, int]:
+        if model in b.loaded:
+            affinity = 0
+        elif not b.loaded:
+            affinity = 1
+        else:
+            affinity = 2
+        return (affinity, b.outstanding, self.backends.index(b))
+
+    def _pick(self, model: str, usable: Optional[Callable[[str], bool]] = None) -> Optional[Backend]:
+        allowed = [b for b in self.backends if usable is None or usable(b.url)]
+        free = [b for b in allowed if b.outstanding < b.max_concurrency]
+        healthy = [b for b in free if b.healthy]
+        # With every server marked down, still try one: health checks may simply be stale.
+        candidates = healthy or ([] if any(b.healthy for b in allowed) else free)
+        if not candidates:
+            return None
+        return min(candidates, key=lambda b: self._rank(b, model))
+
+    def acquire(
+        self, model: str, timeout_s: float, usable: Optional[Callable[[str], bool]] = None
+    ) -> Tuple[Optional[Backend], str]:
+        """
+        Reserves a slot on the best backend, waiting up to timeout_s for capacity (0 = don't wait).
+        `usable(url)` excludes backends (e.g. with an open circuit breaker). Returns (backend, "")
+        or (None, reason); release() must follow every successful acquire.
+        """
+        self._ensure_health_thread()
+        deadline = time.monotonic() + timeout_s
+        with self._cond:
+            while True:
+                if usable is not None and not any(usable(b.url) for b in self.backends):
+                    return None, f"circuit open for every backend of {model}"
+                b = self._pick(model, usable)
+                if b is not None:
+                    b.outstanding += 1
+                    b.loaded.add(model)
+                    return b, ""
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None, f"no backend capacity for {model} within {timeout_s:.1f}s"
+                self._cond.wait(remaining)
+
+    def release(self, b: Backend, ok: bool) -> None:
+        with self._cond:
+            b.outstanding -= 1
+            if ok:
+                b.served += 1
+                b.failures = 0
+            self._cond.notify_all()
+
+    @contextmanager
+    def lease(self, model: str, timeout_s: float) -> Iterator[Backend]:
+        b, reason = self.acquire(model, timeout_s)
+        if b is None:
+            raise TimeoutError(reason)
+        ok = False
+        try:
+            yield b
+            ok = True
+        finally:
+            self.release(b, ok)
+
+    def mark_failure(self, url: str) -> None:
+        with self._cond:
+            for b in self.backends:
+                if b.url == url:
+                    b.failures += 1
+                    b.healthy = False
+            self._cond.notify_all()
+
+    # ---------- health ----------
+    def _probe(self, b: Backend) -> Tuple[bool, Optional[Set[str]]]:
+        import urllib.request
+
+        try:
+            with urllib.request.urlopen(f"{b.url}/api/ps", timeout=HEALTH_TIMEOUT_S) as resp:
+                data = json.loads(resp.read().decode("utf-8") or "{}")
+        except Exception:
+            return False, None
+        models = {str(m.get("name") or m.get("model")) for m in data.get("models", []) if isinstance(m, dict)}
+        return True, models
+
+    def check_health(self) -> None:
+        results = [(b, *self._probe(b)) for b in self.backends]
+        with self._cond:
+            for b, ok, models in results:
+                b.healthy = ok
+                if models is not None:
+                    b.loaded = models | (b.loaded if b.outstanding else set())
+            self._cond.notify_all()
+
+    def _ensure_health_thread(self) -> None:
+        if self._health_interval_s <= 0 or self._health_thread is not None:
+            return
+        with self._cond:
+            if self._health_thread is not None:
+                return
+
+            def loop() -> None:
+                while True:
+                    time.sleep(self._health_interval_s)
+                    self.check_health()
+
+            self._health_thread = threading.Thread(target=loop, name="backend-health", daemon=True)
+            self._health_thread.start()
+
+    def status(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            return [
+                {
+                    "url": b.url,
+                    "healthy": b.healthy,
+                    "outstanding": b.outstanding,
+                    "max_concurrency": b.max_concurrency,
+                    "loaded": sorted(b.loaded),
+                    "served": b.served,
+                }
+                for b in self.backends
+            ]
+
+
+_POOLS: Dict[Tuple[str, ...], BackendPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def backend_specs(state: Dict[str, Any]) -> List[str]:
+    specs = state.get("llmbackends")
+    if isinstance(specs, str):
+        specs = specs.split(",")
+    if not specs:
+        env = os.environ.get("OLLAMA_BACKENDS", "")
+        specs = env.split(",") if env.strip() else []
+    return [s for s in (specs or []) if str(s).strip()]
+
+
+def pool_from_state(state: Dict[str, Any]) -> Optional[BackendPool]:
+    """None means "no pool configured": use ChatOllama's default endpoint as before."""
+    specs = backend_specs(state)
+    if not specs:
+        return None
+    key = tuple(specs)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = BackendPool(specs)
+            _POOLS[key] = pool
+        return pool
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _project_root() -> str:
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def default_cache_dir() -> str:
+    return os.path.join(_project_root(), ".cache", "dag")
+
+
+def graph_structure(app: Any) -> Tuple[List[str], List[Tuple[str, str, bool]]]:
+    g = app.get_graph()
+    nodes = sorted(str(n) for n in g.nodes)
+    edges = sorted((str(e.source), str(e.target), bool(e.conditional)) for e in g.edges)
+    return nodes, edges
+
+
+def structure_hash(nodes: List[str], edges: List[Tuple[str, str, bool]]) -> str:
+    payload = json.dumps({"nodes": nodes, "edges": edges}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def to_dot(nodes: List[str], edges: List[Tuple[str, str, bool]]) -> str:
+    lines = ["digraph DebateDAG {", '  rankdir=TB;', '  node [shape=box, style="rounded"];']
+    for n in nodes:
+        shape = ' [shape=oval]' if n in ("__start__", "__end__") else ""
+        lines.append(f'  "{n}"{shape};')
+    for src, dst, conditional in edges:
+        style = ' [style=dashed]' if conditional else ""
+        lines.append(f'  "{src}" -> "{dst}"{style};')
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _render_png(dot_source: str) -> bytes:
+    # Local rendering only (graphviz package + `dot` binary); never a remote service.
+    import graphviz
+
+    return graphviz.Source(dot_source).pipe(format="png")
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(dst)), exist_ok=True)
+    if os.path.abspath(src) == os.path.abspath(dst):
+        return
+    try:
+        if os.path.lexists(dst):
+            os.remove(dst)
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def export_dag(app: Any, dag_path: str, cache_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Renders the DAG once per graph structure into cache_dir/<hash>.png and hardlinks
+    (or copies) it to dag_path. Without a `dot` binary the DOT source is written next
+    to dag_path instead. Never raises; returns what happened.
+    """
+    cache_dir = cache_dir or default_cache_dir()
+    try:
+        nodes, edges = graph_structure(app)
+    except Exception as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    key = structure_hash(nodes, edges)
+    os.makedirs(cache_dir, exist_ok=True)
+    dot_cached = os.path.join(cache_dir, f"dag_{key}.dot")
+    png_cached = os.path.join(cache_dir, f"dag_{key}.png")
+
+    try:
+        if not os.path.exists(dot_cached):
+            _write_atomic(dot_cached, to_dot(nodes, edges).encode("utf-8"))
+        cache_hit = os.path.exists(png_cached)
+        if not cache_hit:
+            with open(dot_cached, "r", encoding="utf-8") as f:
+                _write_atomic(png_cached, _render_png(f.read()))
+        _link_or_copy(png_cached, dag_path)
+        return {"ok": True, "path": dag_path, "hash": key, "cache_hit": cache_hit}
+    except Exception as e:
+        dot_path = os.path.splitext(dag_path)[0] + ".dot"
+        try:
+            _link_or_copy(dot_cached, dot_path)
+        except OSError:
+            dot_path = ""
+        return {"ok": False, "hash": key, "dot_path": dot_path, "error": f"{type(e).__name__}: {e}"[:200]}
+
+
+def exported_path(result: Dict[str, Any]) -> str:
+    """The file export_dag actually wrote: the PNG, the .dot fallback, or "" for neither."""
+    return str(result.get("path") or result.get("dot_path") or "")
+
+
+def export_dag_async(
+    app: Any, dag_path: str, cache_dir: Optional[str] = None
+) -> Tuple[threading.Thread, Dict[str, Any]]:
+    """
+    Runs export_dag on a daemon thread so neither the debate nor process exit waits on it
+    (files are written atomically, so an unfinished render leaves no partial image). The
+    returned dict is filled with export_dag's result once the thread finishes.
+    """
+    result: Dict[str, Any] = {}
+    th = threading.Thread(target=lambda: result.update(export_dag(app, dag_path, cache_dir)), name="dag-export", daemon=True)
+    th.start()
+    return th, result
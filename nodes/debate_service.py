@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional
+
+from nodes.diagnostics import close_diagnostics
+from nodes.log_codec import FORMAT_JSONL, close_writer
+from nodes.log_manager import SHARD_NONE, debate_log_path, flush as flush_logs
+from nodes.retry_scheduler import flush_all as flush_retry_stats
+from nodes.state import new_debate_state
+from nodes.telemetry import merge_telemetry, to_prometheus
+from nodes.user_input_node import sanitize_topic, validate_topic
+
+QUEUED, RUNNING, DONE, ERROR = "queued", "running", "done", "error"
+
+
+class QueueFull(Exception):
+    """Raised by DebateService.submit when every worker is busy and max_queue debates wait (HTTP 429)."""
+
+
+class DebateJob:
+    """
+    One submitted debate. Events are append-only dicts ({"event": ..., ...}) so any number of
+    readers can replay them from the start and then follow along.
+    """
+
+    def __init__(self, topic: str, seed: Optional[int], log_path: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.topic = topic
+        self.seed = seed
+        self.log_path = log_path
+        self.status = QUEUED
+        self.error = ""
+        self.verdict: Optional[Dict[str, Any]] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.events: List[Dict[str, Any]] = []
+        self._cond = threading.Condition()
+
+    def emit(self, event: str, **data: Any) -> None:
+        with self._cond:
+            self.events.append({"event": event, **data})
+            self._cond.notify_all()
+
+    def finish(self, status: str, **data: Any) -> None:
+        # Status and the closing event change together, so a follower never stops early.
+        with self._cond:
+            self.status = status
+            self.finished_at = time.time()
+            self.events.append({"event": "done", "status": status, **data})
+            self._cond.notify_all()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, ERROR)
+
+    def follow(self, start: int = 0, heartbeat_s: float = 15.0) -> Iterator[Optional[Dict[str, Any]]]:
+        """Events from index `start` until the debate finishes; None every heartbeat_s of silence."""
+        i = start
+        while True:
+            with self._cond:
+                if i >= len(self.events) and not self.finished:
+                    self._cond.wait(heartbeat_s)
+                batch = self.events[i:]
+                finished = self.finished
+            i += len(batch)
+            if not batch:
+                if finished:
+                    return
+                yield None
+            for ev in batch:
+                yield ev
+            if finished and i >= len(self.events):
+                return
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "topic": self.topic,
+            "seed": self.seed,
+            "status": self.status,
+            "error": self.error,
+            "verdict": self.verdict,
+            "rounds": sum(1 for e in self.events if e["event"] == "round"),
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "log_path": self.log_path,
+        }
+
+
+class DebateService:
+    """
+    Long-running debate runner for scripts/debate_server.py: one compiled graph, `workers`
+    threads and a bounded backlog. submit() raises QueueFull instead of queueing without
+    limit, so callers see backpressure. Finished jobs are kept (for their events and log)
+    up to keep_finished, oldest dropped first.
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        log_dir: str,
+        workers: int = 2,
+        max_queue: int = 16,
+        overrides: Optional[Dict[str, Any]] = None,
+        recursion_limit: int = 200,
+        keep_finished: int = 256,
+        log_shard: str = SHARD_NONE,
+    ):
+        self.app = app
+        self.log_dir = os.path.abspath(log_dir)
+        self.workers = max(1, int(workers))
+        self.max_queue = max(0, int(max_queue))
+        self.overrides = dict(overrides or {})
+        self.recursion_limit = int(recursion_limit)
+        self.keep_finished = max(1, int(keep_finished))
+        self.log_shard = log_shard
+        self.jobs: "OrderedDict[str, DebateJob]" = OrderedDict()
+        self.telemetry: Dict[str, Any] = {"nodes": {}, "llm": {}}
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[DebateJob]]" = queue.Queue()
+        self._pending = 0  # accepted and not finished (queued + running)
+        self._running = 0
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._threads = [threading.Thread(target=self._worker, name=f"debate-worker-{i}", daemon=True) for i in range(self.workers)]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, topic: str, seed: Optional[int] = None) -> DebateJob:
+        """Validates the topic (ValueError) and queues a debate (QueueFull when the backlog is full)."""
+        topic = sanitize_topic(topic)
+        validate_topic(topic)
+        job = DebateJob(topic, seed, "")
+        log_format = str(self.overrides.get("logformat") or FORMAT_JSONL)
+        job.log_path = debate_log_path(self.log_dir, log_format, self.log_shard, prefix=f"debate_{job.id}")
+        with self._lock:
+            # Capacity is one debate per worker plus max_queue waiting (0 = no backlog).
+            if self._pending >= self.workers + self.max_queue:
+                raise QueueFull(f"{self._pending - self._running} debates already queued")
+            self._pending += 1
+            position = max(0, self._pending - self.workers)
+            self.jobs[job.id] = job
+            self._evict()
+        job.emit("queued", id=job.id, topic=topic, position=position)
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[DebateJob]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            by_status: Dict[str, int] = {}
+            for j in self.jobs.values():
+                by_status[j.status] = by_status.get(j.status, 0) + 1
+            return {
+                "workers": self.workers,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "max_queue": self.max_queue,
+                "jobs": by_status,
+            }
+
+    def metrics(self) -> str:
+        """Prometheus text for all debates finished so far."""
+        with self._lock:
+            return to_prometheus(self.telemetry)
+
+    def shutdown(self) -> None:
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join(timeout=5.0)
+        flush_retry_stats()
+        flush_logs()
+
+    def _evict(self) -> None:
+        # Called with self._lock held.
+        finished = [k for k, j in self.jobs.items() if j.finished]
+        for k in finished[: max(0, len(finished) - self.keep_finished)]:
+            del self.jobs[k]
+
+    def _worker(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            with self._lock:
+                self._running += 1
+            try:
+                self._run(job)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._pending -= 1
+                    self._evict()
+
+    def _run(self, job: DebateJob) -> None:
+        job.status, job.started_at = RUNNING, time.time()
+        job.emit("started", id=job.id)
+        state = new_debate_state(job.topic, job.log_path, job.seed, **self.overrides)
+        seen = 0
+        final: Dict[str, Any] = {}
+        try:
+            for chunk in self.app.stream(state, stream_mode="updates", config={"recursion_limit": self.recursion_limit}):
+                if not isinstance(chunk, dict) or not chunk:
+                    continue
+                node_name, update = next(iter(chunk.items()))
+                if not isinstance(update, dict):
+                    continue
+                final = update
+                # Same rule as the CLI: a turn is final once MemoryNode has appended it.
+                if node_name == "MemoryNode" and "turns" in update:
+                    turns = update.get("turns") or []
+                    for t in turns[seen:]:
+                        job.emit("round", round=t.get("round"), speaker=t.get("speaker"), agent=t.get("agent"), text=t.get("text", ""))
+                    seen = max(seen, len(turns))
+                if update.get("status") == "ERROR":
+                    break
+        except Exception as e:
+            final = {"status": "ERROR", "error": f"{type(e).__name__}: {e}"}
+        finally:
+            close_writer(job.log_path)
+            close_diagnostics(job.log_path)
+
+        if final.get("telemetry"):
+            with self._lock:
+                self.telemetry = merge_telemetry([self.telemetry, final["telemetry"]])
+        seconds = round(time.time() - (job.started_at or time.time()), 3)
+        if final.get("status") == "ERROR":
+            job.error = str(final.get("error") or "unknown error")
+            job.emit("error", error=job.error)
+            job.finish(ERROR, seconds=seconds)
+        else:
+            job.verdict = final.get("verdict") or {}
+            job.emit("verdict", **job.verdict)
+            job.finish(DONE, seconds=seconds)
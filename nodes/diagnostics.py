@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Rejection details kept in memory per debate (state["diagcap"]); older ones go to the side file.
+DEFAULT_DIAG_CAP = 32
+DIAG_SUFFIX = ".diag.jsonl"
+
+
+def side_path(log_path: str) -> str:
+    return os.path.abspath(log_path) + DIAG_SUFFIX
+
+
+class DiagnosticsStore:
+    """
+    Rejection details of one debate, stored once and referenced by id from coherence flags,
+    rejectionhistory and the verdict. At most `cap` details stay in memory; older ones are
+    appended to the side file, and everything left is written there when the debate closes.
+    Without a side file (replays, benchmarks) the oldest details are simply dropped.
+    """
+
+    def __init__(self, path: Optional[str], cap: int = DEFAULT_DIAG_CAP):
+        self.path = path
+        self.cap = max(0, int(cap))
+        self.spilled = 0
+        self.dropped = 0
+        self._run = uuid.uuid4().hex[:6]  # the same log (and side file) may hold several debates
+        self._n = 0
+        self._mem: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, detail: Dict[str, Any], **context: Any) -> str:
+        with self._lock:
+            self._n += 1
+            ref = f"{self._run}-{self._n}"
+            self._mem[ref] = {"id": ref, **context, "detail": detail}
+            if len(self._mem) > self.cap:
+                self._spill(len(self._mem) - self.cap)
+            return ref
+
+    def close(self) -> None:
+        with self._lock:
+            self._spill(len(self._mem))
+
+    def _spill(self, n: int) -> None:
+        # Called with self._lock held.
+        batch = [self._mem.popitem(last=False)[1] for _ in range(n)]
+        if not batch:
+            return
+        if not self.path:
+            self.dropped += len(batch)
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in batch:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.spilled += len(batch)
+
+
+_STORES: Dict[str, DiagnosticsStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def diagnostics_for(state: Dict[str, Any]) -> DiagnosticsStore:
+    """The debate's store, keyed by its log path; a private, memory-only one when there is no log."""
+    log_path = state.get("logpath")
+    cap = int(state.get("diagcap", DEFAULT_DIAG_CAP))
+    if not log_path:
+        return DiagnosticsStore(None, cap)
+    key = os.path.abspath(log_path)
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = _STORES[key] = DiagnosticsStore(side_path(key), cap)
+        return store
+
+
+def close_diagnostics(log_path: str) -> None:
+    """Writes the remaining details to <log>.diag.jsonl and forgets the store (end of a debate)."""
+    with _STORES_LOCK:
+        store = _STORES.pop(os.path.abspath(log_path), None)
+    if store is not None:
+        store.close()
+
+
+def iter_details(path: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """(id, entry) pairs of a side file (<log>.diag.jsonl); entry holds round, speaker and detail."""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for ln in f:
+            if ln.strip():
+                entry = json.loads(ln)
+                yield str(entry.get("id")), entry
+
+
+def load_details(log_path: str) -> Dict[str, Dict[str, Any]]:
+    """Every detail written for a log, keyed by id (empty when the side file does not exist yet)."""
+    return {entry_id: entry.get("detail") for entry_id, entry in iter_details(side_path(log_path))}
+
+
+def resolve_refs(value: Any, details: Dict[str, Dict[str, Any]]) -> Any:
+    """
+    Copy of a log record (or any part of it) where each {"ref", "reasons"} also carries the
+    stored "detail". Refs whose detail is not in `details` are left as they are.
+    """
+    if isinstance(value, dict):
+        out = {k: resolve_refs(v, details) for k, v in value.items()}
+        ref = value.get("ref")
+        if isinstance(ref, str) and "reasons" in value and ref in details:
+            out["detail"] = details[ref]
+        return out
+    if isinstance(value, list):
+        return [resolve_refs(v, details) for v in value]
+    return value
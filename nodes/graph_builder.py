@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Literal
 
 from langgraph.graph import END, StateGraph
@@ -11,18 +12,21 @@ from nodes.agent_node import agent_a_node, agent_b_node
 from nodes.memory_node import memory_node
 from nodes.judge_node import judge_node
 from nodes.logger_node import logger_node
+from nodes.telemetry import timed_node
 
 
+@lru_cache(maxsize=None)
 def build_graph():
+    """Compiled once per process; the compiled graph is stateless and safe to reuse across debates."""
     g: StateGraph = StateGraph(DebateState)
 
-    g.add_node("UserInputNode", user_input_node)
-    g.add_node("Coordinator", coordinator_node)
-    g.add_node("AgentA", agent_a_node)
-    g.add_node("AgentB", agent_b_node)
-    g.add_node("MemoryNode", memory_node)
-    g.add_node("JudgeNode", judge_node)
-    g.add_node("LoggerNode", logger_node)
+    g.add_node("UserInputNode", timed_node("UserInputNode", user_input_node))
+    g.add_node("Coordinator", timed_node("Coordinator", coordinator_node))
+    g.add_node("AgentA", timed_node("AgentA", agent_a_node))
+    g.add_node("AgentB", timed_node("AgentB", agent_b_node))
+    g.add_node("MemoryNode", timed_node("MemoryNode", memory_node))
+    g.add_node("JudgeNode", timed_node("JudgeNode", judge_node))
+    g.add_node("LoggerNode", timed_node("LoggerNode", logger_node))
 
     g.set_entry_point("UserInputNode")
 
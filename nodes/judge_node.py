@@ -1,10 +1,17 @@
 from __future__ import annotations
 
-import json
-from typing import Any, Dict
+import time
+from typing import Any, Dict, List
 
-from langchain_ollama import ChatOllama
+from nodes.llm_guard import LLMUnavailable
+from nodes.llm_provider import DEFAULT_NUM_CTX, LLMConfig, cascade_tiers, chat_invoke
+from nodes.prompt_budget import PromptSection, assemble_prompt, messages_tokens, prompt_budget
 from nodes.state import DebateState
+from nodes.structured_output import PATH_FAILED, PATH_TRUNCATED, VERDICT_SCHEMA, count_parse, json_format, parse_json_object
+from nodes.telemetry import record_cascade
+
+
+_JUDGE_MAX_TOKENS = 420
 
 
 def judge_node(state: DebateState) -> DebateState:
@@ -13,17 +20,10 @@ def judge_node(state: DebateState) -> DebateState:
     turns = out.get("turns", [])
     topic = out.get("topic", "")
 
-    # Transcript uses the clean paragraph text stored in turns.
-    transcript = "\n".join([f"R{t.get('round')} {t.get('agent')}: {t.get('text')}" for t in turns])
-
-    judge_model = out.get("judgemodel") or out.get("judge_model") or "llama3.2:1b"
-
-    llm = ChatOllama(
-        model=judge_model,
-        temperature=0.0,
-        format="json",
-        num_predict=420,
-    )
+    # Invalid JSON or an unavailable backend on one tier escalates to the next (state judgecascade).
+    tiers = cascade_tiers({**out, "judgemodel": out.get("judgemodel") or out.get("judge_model")}, "judge")
+    judge_model = tiers[0]
+    num_ctx = int(out.get("llmnumctx", DEFAULT_NUM_CTX))
 
     system = (
         "You are an impartial debate judge.\n"
@@ -31,17 +31,60 @@ def judge_node(state: DebateState) -> DebateState:
         "winner MUST be exactly 'Scientist' or 'Philosopher'.\n"
         "summary and reason MUST be concise strings.\n"
     )
-    user = f"Topic: {topic}\nTranscript:\n{transcript}"
 
-    msg = llm.invoke([{"role": "system", "content": system}, {"role": "user", "content": user}])
-    raw = getattr(msg, "content", str(msg)).strip()
+    # Transcript uses the clean paragraph text stored in turns.
+    # Every round gets an equal share of the budget so late rounds are never cut off.
+    budget = prompt_budget(num_ctx, _JUDGE_MAX_TOKENS)
+    header = PromptSection("header", f"Topic: {topic}\nTranscript:", priority=100, max_tokens=96)
+    transcript_budget = budget - messages_tokens(system, "") - messages_tokens(header.text)
+    per_turn = max(16, transcript_budget // max(1, len(turns)))
+    sections = [header] + [
+        PromptSection(f"R{t.get('round')}", f"R{t.get('round')} {t.get('agent')}: {t.get('text')}", priority=50, max_tokens=per_turn)
+        for t in turns
+    ]
+    user, prompt_report = assemble_prompt(sections, max(0, budget - messages_tokens(system, "")))
+    prompt_tokens = messages_tokens(system, user)
+
+    messages = [{"role": "system", "content": system}, {"role": "user", "content": user}]
+    unavailable = True  # until some tier answers
+    raw, parsed, parse_path = "", None, PATH_FAILED
+    attempts: List[Dict[str, Any]] = []
+    for tier, judge_model in enumerate(tiers):
+        cfg = LLMConfig(
+            model=judge_model,
+            temperature=0.0,
+            max_tokens=_JUDGE_MAX_TOKENS,
+            num_ctx=num_ctx,
+            format=json_format(out, VERDICT_SCHEMA),
+        )
+        t0 = time.perf_counter()
+        try:
+            msg, guard = chat_invoke(out, cfg, messages)
+        except LLMUnavailable as e:
+            # This tier's backend is down; the next one may be served elsewhere.
+            guard = e.decisions
+            record_cascade(out, "judge", tier, judge_model, False, time.perf_counter() - t0)
+            attempts.append({"model": judge_model, "unavailable": True, "error": str(e)[:200]})
+            continue
+        unavailable = False
+        raw = getattr(msg, "content", str(msg)).strip()
+
+        parsed, parse_path = parse_json_object(raw)
+        count_parse(out, "verdict", parse_path)
+        # A truncated verdict escalates like invalid JSON; the last tier's partial verdict is still used.
+        ok = parse_path not in (PATH_FAILED, PATH_TRUNCATED) and parsed is not None
+        record_cascade(out, "judge", tier, judge_model, ok, time.perf_counter() - t0)
+        attempts.append({"model": judge_model, "parse_path": parse_path})
+        if ok:
+            break
 
     # attach coherence flags into verdict for auditability
     coherenceflags = out.get("coherenceflags", [])
 
     verdict: Dict[str, Any]
     try:
-        parsed = json.loads(raw) if raw.startswith("{") else {}
+        if parse_path == PATH_FAILED or parsed is None:
+            raise ValueError("judge output is not a JSON object")
         winner = str(parsed.get("winner", "")).strip()
         if winner not in ("Scientist", "Philosopher"):
             # fallback mapping if model used old values
@@ -68,7 +111,11 @@ def judge_node(state: DebateState) -> DebateState:
         verdict = {
             "summary": raw[:2000],
             "winner": "Scientist",
-            "reason": "Judge returned invalid JSON; raw output stored in summary.",
+            "reason": (
+                "Judge model unavailable; default verdict."
+                if unavailable
+                else "Judge returned invalid JSON; raw output stored in summary."
+            ),
             "coherenceflags": coherenceflags,
         }
 
@@ -76,4 +123,19 @@ def judge_node(state: DebateState) -> DebateState:
     out["status"] = "OK"
     out["error"] = ""
     out["lastnode"] = "JUDGE"
+    out["last_node_name"] = "JudgeNode"
+    out["last_node_io"] = {
+        "node": "JUDGE",
+        "input": {"model": tiers[0], "cascade": tiers, "turns_len": len(turns), "topic_preview": topic[:120]},
+        "output": {
+            "winner": verdict.get("winner"),
+            "model": judge_model,
+            "parse_path": parse_path,
+            "cascade_attempts": attempts,
+            "llm_guard": guard,
+            "prompt_tokens": prompt_tokens,
+            "prompt_budget": budget,
+            "prompt_trimmed": prompt_report["trimmed"] + prompt_report["dropped"],
+        },
+    }
     return out
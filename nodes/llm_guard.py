@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+
+class LLMUnavailable(RuntimeError):
+    """Raised when the backend's circuit is open or every attempt failed; callers use their fallback path."""
+
+    def __init__(self, message: str, decisions: Dict[str, Any]):
+        super().__init__(message)
+        self.decisions = decisions
+
+
+@dataclass
+class CallPolicy:
+    timeout_s: float = 120.0          # per-attempt deadline
+    hedge: bool = True                # duplicate a request that is slower than the observed p95
+    hedge_min_s: float = 2.0          # never hedge earlier than this
+    hedge_min_samples: int = 8        # p95 is meaningless before this many samples
+    transport_retries: int = 2        # extra attempts after connection errors / timeouts
+    backoff_base_s: float = 0.5
+    backoff_max_s: float = 8.0
+    breaker_failures: int = 3         # consecutive failures that open the circuit
+    breaker_reset_s: float = 30.0     # open -> half-open after this long
+    queue_timeout_s: float = 300.0    # wait for a free backend slot; not part of the call deadline
+
+
+def policy_from_state(state: Dict[str, Any]) -> CallPolicy:
+    d = CallPolicy()
+    return CallPolicy(
+        timeout_s=float(state.get("llmtimeout", d.timeout_s)),
+        hedge=bool(state.get("llmhedge", d.hedge)),
+        hedge_min_s=float(state.get("llmhedgemin", d.hedge_min_s)),
+        hedge_min_samples=d.hedge_min_samples,
+        transport_retries=int(state.get("llmtransportretries", d.transport_retries)),
+        backoff_base_s=d.backoff_base_s,
+        backoff_max_s=d.backoff_max_s,
+        breaker_failures=int(state.get("llmbreakerfailures", d.breaker_failures)),
+        breaker_reset_s=float(state.get("llmbreakerreset", d.breaker_reset_s)),
+        queue_timeout_s=float(state.get("llmqueuetimeout", d.queue_timeout_s)),
+    )
+
+
+class LatencyTracker:
+    def __init__(self, maxlen: int = 64):
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+        self._maxlen = maxlen
+
+    def add(self, key: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self._maxlen)).append(seconds)
+
+    def quantile(self, key: str, q: float, min_samples: int) -> Optional[float]:
+        with self._lock:
+            xs = sorted(self._samples.get(key, ()))
+        if len(xs) < min_samples:
+            return None
+        return xs[min(len(xs) - 1, int(q * len(xs)))]
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow(self, policy: CallPolicy) -> bool:
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= policy.breaker_reset_s:
+                self.state = self.HALF_OPEN
+            return self.state != self.OPEN
+
+    def success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def failure(self, policy: CallPolicy) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= policy.breaker_failures:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-call")
+_LATENCY = LatencyTracker()
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def breaker_for(key: str) -> CircuitBreaker:
+    with _BREAKERS_LOCK:
+        b = _BREAKERS.get(key)
+        if b is None:
+            b = CircuitBreaker()
+            _BREAKERS[key] = b
+        return b
+
+
+def breaker_key(url: str, model: str) -> str:
+    """One circuit per backend and model: a model that fails to load does not block the others."""
+    return f"{url}|{model}"
+
+
+@dataclass
+class Slot:
+    """
+    A backend reserved for one call; release(ok) runs when that call returns or fails.
+    The call must give up by `deadline` (time.monotonic()) or once `cancelled` is set:
+    chat_invoke passes the remaining time to the HTTP client and checks both between chunks.
+    """
+
+    key: str                        # circuit breaker key (see breaker_key)
+    url: Optional[str] = None       # None -> the client's default endpoint
+    release: Callable[[bool], None] = lambda ok: None
+    deadline: float = 0.0
+    cancelled: threading.Event = field(default_factory=threading.Event)
+
+    def remaining(self) -> float:
+        return self.deadline - time.monotonic()
+
+
+class SingleBackend:
+    """Slot source for one endpoint without a pool: never waits, only checks the breaker."""
+
+    def __init__(self, key: str, url: Optional[str] = None):
+        self.key = key
+        self.url = url
+
+    def acquire(self, policy: CallPolicy, block: bool = True) -> Tuple[Optional[Slot], str]:
+        if not breaker_for(self.key).allow(policy):
+            return None, f"circuit open for {self.key}"
+        return Slot(self.key, self.url), ""
+
+
+def is_transport_error(e: BaseException) -> bool:
+    if isinstance(e, (ConnectionError, TimeoutError)):
+        return True
+    mod = type(e).__module__ or ""
+    if mod.startswith(("httpx", "httpcore")):
+        return True
+    # ollama.ResponseError carries the HTTP status; 5xx means the server side is unhealthy.
+    status = getattr(e, "status_code", None)
+    return isinstance(status, int) and status >= 500
+
+
+def _backoff(policy: CallPolicy, attempt: int) -> float:
+    # Full jitter: uniform(0, min(cap, base * 2^attempt)).
+    return random.uniform(0.0, min(policy.backoff_max_s, policy.backoff_base_s * (2 ** attempt)))
+
+
+# How long a timed-out call may take to notice its deadline before the guard stops retrying.
+_DRAIN_GRACE_S = 5.0
+
+
+def _stop(futures: List[Future], running: Dict[Future, Slot]) -> None:
+    for f in futures:
+        running[f].cancelled.set()
+        f.cancel()  # only helps while the call is still queued on the executor
+
+
+def _run_in_slot(call: Callable[[Slot], Any], slot: Slot) -> Any:
+    ok = False
+    try:
+        result = call(slot)
+        ok = True
+        return result
+    finally:
+        slot.release(ok)
+
+
+def guarded_invoke(
+    call: Callable[[Slot], Any],
+    policy: CallPolicy,
+    *,
+    latency_key: str,
+    slots: Any,
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Runs call(slot) with a deadline, an optional hedge and jittered retries on transport errors.
+    `slots.acquire(policy, block)` reserves a backend (SingleBackend, or a pool adapter) before
+    the deadline starts: waiting for capacity is bounded by policy.queue_timeout_s and never
+    counts as a backend failure. A hedge only starts when a second slot is free right away.
+    Timed-out calls and losing hedges are told to stop (Slot.cancelled), and a retry only starts
+    once the previous call has returned and released its slot.
+    Returns (result, decisions); decisions is a small dict meant for last_node_io.
+    Raises LLMUnavailable when the circuit is open, no slot frees up, or all attempts failed.
+    """
+    decisions: Dict[str, Any] = {"timeout_s": policy.timeout_s, "hedged": False, "attempts": []}
+
+    hedge_after = None
+    if policy.hedge:
+        p95 = _LATENCY.quantile(latency_key, 0.95, policy.hedge_min_samples)
+        if p95 is not None and max(p95, policy.hedge_min_s) < policy.timeout_s:
+            hedge_after = max(p95, policy.hedge_min_s)
+    decisions["hedge_after_s"] = round(hedge_after, 3) if hedge_after else None
+
+    last_error = ""
+    for attempt in range(policy.transport_retries + 1):
+        if attempt:
+            delay = _backoff(policy, attempt - 1)
+            time.sleep(delay)
+        q0 = time.monotonic()
+        slot, reason = slots.acquire(policy)
+        if slot is None:
+            last_error = reason
+            outcome = "circuit_open" if reason.startswith("circuit open") else "no_capacity"
+            decisions["attempts"].append({"outcome": outcome, "waited_s": round(time.monotonic() - q0, 3)})
+            if outcome == "circuit_open":
+                decisions["breaker"] = CircuitBreaker.OPEN
+            break
+        decisions["backend"] = slot.key
+        t0 = time.monotonic()
+        slot.deadline = t0 + policy.timeout_s
+        running: Dict[Future, Slot] = {_EXECUTOR.submit(_run_in_slot, call, slot): slot}
+        futures: List[Future] = list(running)
+        hedge_future: Optional[Future] = None
+        done: set = set()
+
+        if hedge_after is not None:
+            done, _ = wait(futures, timeout=hedge_after, return_when=FIRST_COMPLETED)
+            spare = None if done else slots.acquire(policy, block=False)[0]
+            if spare is not None:
+                spare.deadline = slot.deadline
+                hedge_future = _EXECUTOR.submit(_run_in_slot, call, spare)
+                running[hedge_future] = spare
+                futures.append(hedge_future)
+                decisions["hedged"] = True
+
+        while not done:
+            remaining = policy.timeout_s - (time.monotonic() - t0)
+            if remaining <= 0:
+                break
+            done, _ = wait(futures, timeout=remaining, return_when=FIRST_COMPLETED)
+            # A failed call should not mask the other one (primary or hedge) that may still succeed.
+            failed = [f for f in done if f.exception() is not None]
+            if failed and len(failed) < len(futures) and len(done) == len(failed):
+                for f in failed:
+                    decisions["attempts"].append(
+                        {
+                            "outcome": type(f.exception()).__name__,
+                            "elapsed_s": round(time.monotonic() - t0, 3),
+                            "hedge": f is hedge_future,
+                        }
+                    )
+                    if is_transport_error(f.exception()):
+                        breaker_for(running[f].key).failure(policy)
+                futures = [f for f in futures if f not in failed]
+                done = set()
+                last_error = f"{type(failed[0].exception()).__name__}: {failed[0].exception()}"
+
+        elapsed = time.monotonic() - t0
+        if not done:
+            _stop(futures, running)
+            for f in futures:
+                breaker_for(running[f].key).failure(policy)
+            last_error = f"timeout after {policy.timeout_s:.1f}s"
+            decisions["attempts"].append({"outcome": "timeout", "elapsed_s": round(elapsed, 3)})
+            _, still_running = wait(futures, timeout=_DRAIN_GRACE_S)
+            if still_running:
+                decisions["attempts"].append({"outcome": "still_running", "calls": len(still_running)})
+                break
+            continue
+
+        winner = next((f for f in done if f.exception() is None), next(iter(done)))
+        won = running[winner]
+        breaker = breaker_for(won.key)
+        err = winner.exception()
+        if err is None:
+            _stop([f for f in futures if f is not winner], running)
+            _LATENCY.add(latency_key, elapsed)
+            breaker.success()
+            decisions["attempts"].append(
+                {"outcome": "ok", "elapsed_s": round(elapsed, 3), "hedge_won": winner is hedge_future}
+            )
+            decisions["backend"] = won.key
+            if won.url:
+                decisions["backend_url"] = won.url
+            decisions["breaker"] = breaker.state
+            return winner.result(), decisions
+
+        decisions["attempts"].append({"outcome": type(err).__name__, "elapsed_s": round(elapsed, 3)})
+        if not is_transport_error(err):
+            decisions["breaker"] = breaker.state
+            raise err
+        last_error = f"{type(err).__name__}: {err}"
+        breaker.failure(policy)
+
+    if decisions.get("backend") and "breaker" not in decisions:
+        decisions["breaker"] = breaker_for(decisions["backend"]).state
+    decisions["error"] = last_error[:200]
+    raise LLMUnavailable(last_error or "LLM call failed", decisions)
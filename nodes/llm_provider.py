@@ -1,32 +1,191 @@
 from __future__ import annotations
 
+import time
+from contextlib import nullcontext
 from dataclasses import dataclass
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 
-from langchain_ollama import ChatOllama, OllamaEmbeddings
+from nodes.backend_pool import BackendPool, default_base_url, pool_from_state
+from nodes.llm_guard import (
+    LLMUnavailable,
+    SingleBackend,
+    Slot,
+    breaker_for,
+    breaker_key,
+    guarded_invoke,
+    is_transport_error,
+    policy_from_state,
+)
+from nodes.model_scheduler import active_scheduler
+from nodes.telemetry import llm_span, record_llm_span
+from nodes.token_stream import active_sink
+
+if TYPE_CHECKING:
+    from langchain_ollama import ChatOllama, OllamaEmbeddings
+
+
+# Context window requested from Ollama; prompt budgets are derived from it.
+DEFAULT_NUM_CTX = 2048
+
+# Agent and judge model unless state sets llmmodel / judgemodel.
+DEFAULT_CHAT_MODEL = "llama3.2:1b"
+
+# Escalation tier of the default cascade (--cascade without a list), see cascade_tiers.
+LARGE_CHAT_MODEL = "llama3.1:8b"
+DEFAULT_CASCADE = (DEFAULT_CHAT_MODEL, LARGE_CHAT_MODEL)
+
+# How long Ollama keeps a model resident after the last request (also used by warm-up).
+KEEP_ALIVE = "10m"
 
 
 @dataclass
 class LLMConfig:
-    model: str = "llama3.1:8b"
+    model: str = LARGE_CHAT_MODEL
     temperature: float = 0.2
     max_tokens: int = 260
     seed: Optional[int] = None  # Ollama may ignore seed; keep for interface compatibility.
+    num_ctx: int = DEFAULT_NUM_CTX
+    timeout: float = 120.0
+    format: Union[str, Dict[str, Any], None] = None
+    base_url: Optional[str] = None  # None -> Ollama client default (OLLAMA_HOST or localhost:11434)
+
+
+def cascade_tiers(state: Dict[str, Any], role: str = "agent") -> List[str]:
+    """
+    Models of the agent ("agent") or judge ("judge") cascade, cheapest first: state llmcascade /
+    judgecascade, else the single llmmodel / judgemodel. The first attempt uses tier 0 and each
+    retry moves up one tier, staying on the last one (see cascade_model).
+    """
+    if role == "judge":
+        tiers, single = state.get("judgecascade"), state.get("judgemodel") or DEFAULT_CHAT_MODEL
+    else:
+        tiers, single = state.get("llmcascade"), state.get("llmmodel", DEFAULT_CHAT_MODEL)
+    tiers = [str(m).strip() for m in (tiers or []) if str(m).strip()]
+    return tiers or [single]
+
+
+def cascade_model(tiers: List[str], retry: int) -> Tuple[int, str]:
+    tier = min(max(int(retry), 0), len(tiers) - 1)
+    return tier, tiers[tier]
+
+
+def parse_cascade(spec: Optional[str]) -> List[str]:
+    """CLI form "small,large"; an empty spec means DEFAULT_CASCADE."""
+    tiers = [m.strip() for m in (spec or "").split(",") if m.strip()]
+    return tiers or list(DEFAULT_CASCADE)
+
+
+def state_models(state: Dict[str, Any]) -> List[str]:
+    """Every model a debate with this configuration may call (warm-up preloads all of them)."""
+    models = {*cascade_tiers(state, "agent"), *cascade_tiers(state, "judge")}
+    return sorted(models)
 
 
 def build_chat_llm(cfg: LLMConfig) -> ChatOllama:
+    # Imported on first use: langchain_ollama dominates CLI start-up time.
+    from langchain_ollama import ChatOllama
+
     return ChatOllama(
         model=cfg.model,
         temperature=cfg.temperature,
         num_predict=cfg.max_tokens,  # max output tokens [web:204]
-        num_ctx=2048,                # keep context small for speed
-        timeout=120,                 # request stream timeout [web:204]
-        keep_alive="10m",            # keep model loaded to avoid reload delays [web:204]
+        num_ctx=cfg.num_ctx,         # keep context small for speed
+        format=cfg.format,
+        base_url=cfg.base_url,
+        client_kwargs={"timeout": cfg.timeout},  # request stream timeout [web:204]
+        keep_alive=KEEP_ALIVE,       # keep model loaded to avoid reload delays [web:204]
         )
 
 
+class _PoolSlots:
+    """Slot source over a BackendPool: skips backends whose breaker for this model is open."""
+
+    def __init__(self, pool: BackendPool, model: str):
+        self.pool = pool
+        self.model = model
+
+    def acquire(self, policy: Any, block: bool = True) -> Tuple[Optional[Slot], str]:
+        def usable(url: str) -> bool:
+            return breaker_for(breaker_key(url, self.model)).allow(policy)
+
+        b, reason = self.pool.acquire(self.model, policy.queue_timeout_s if block else 0.0, usable)
+        if b is None:
+            return None, reason
+        return Slot(breaker_key(b.url, self.model), b.url, release=lambda ok: self.pool.release(b, ok)), ""
+
+
+def chat_invoke(
+    state: Dict[str, Any],
+    cfg: LLMConfig,
+    messages: List[Dict[str, str]],
+    stream_label: Optional[Dict[str, Any]] = None,
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Single entry point for agent/judge chat calls:
+    batch model-residency slot (if a scheduler is installed) + backend pool lease
+    (if llmbackends / OLLAMA_BACKENDS is set) + deadline/hedge/breaker guard.
+    Returns (message, decisions for last_node_io). Raises nodes.llm_guard.LLMUnavailable.
+    Every attempt, failed or not, is recorded as a telemetry span on `state`.
+    With a stream_label ({round, speaker, agent, retry}) and a token sink installed
+    (run_debate.py on a terminal), the reply is streamed and shown as it is generated.
+    """
+    policy = policy_from_state(state)
+    pool = pool_from_state(state)
+    sink = active_sink() if stream_label is not None else None
+    owner = object()  # this draft; a stale stream from an abandoned call cannot take its line
+
+    def run(llm: Any, slot: Slot) -> Any:
+        if sink is None:
+            return llm.invoke(messages)
+        stream = object()  # one per attempt, so a hedged duplicate does not interleave
+        full = None
+        for chunk in llm.stream(messages):
+            if slot.cancelled.is_set() or slot.remaining() <= 0:
+                raise TimeoutError("LLM stream abandoned by the call guard")
+            full = chunk if full is None else full + chunk
+            if chunk.content:
+                sink.token(owner, stream, str(chunk.content))
+        return full
+
+    def call(slot: Slot) -> Any:
+        # The HTTP timeout is the time left until the guard's deadline, so the worker thread
+        # (and its backend slot) is freed about when the guard gives up on the call.
+        routed = LLMConfig(**{**cfg.__dict__, "base_url": slot.url or cfg.base_url, "timeout": max(0.1, slot.remaining())})
+        try:
+            return run(build_chat_llm(routed), slot)
+        except Exception as e:
+            if pool is not None and is_transport_error(e):
+                pool.mark_failure(slot.url)
+            raise
+
+    if pool is not None:
+        slots: Any = _PoolSlots(pool, cfg.model)
+    else:
+        slots = SingleBackend(breaker_key(cfg.base_url or default_base_url(), cfg.model), cfg.base_url)
+    scheduler = active_scheduler()
+    t0 = time.perf_counter()
+    queue_s = 0.0
+    if sink is not None:
+        sink.begin(stream_label, owner)
+    try:
+        with scheduler.slot(cfg.model) if scheduler is not None else nullcontext(0.0) as queue_s:
+            msg, decisions = guarded_invoke(call, policy, latency_key=cfg.model, slots=slots)
+    except LLMUnavailable as e:
+        span_info = {**e.decisions, "queue_s": queue_s}
+        record_llm_span(state, llm_span(None, span_info, cfg.model, time.perf_counter() - t0, error=str(e)[:200]))
+        raise
+    decisions["queue_s"] = round(queue_s, 3)
+    if sink is not None:
+        sink.end(owner, str(getattr(msg, "content", "")))
+    # Ollama reports eval_duration (ns) = time spent generating after the first token.
+    meta = getattr(msg, "response_metadata", None) or {}
+    decisions["first_token_at"] = round(time.time() - float(meta.get("eval_duration", 0) or 0) / 1e9, 3)
+    record_llm_span(state, llm_span(msg, decisions, cfg.model, time.perf_counter() - t0))
+    return msg, decisions
+
 
 def build_embeddings(model: str = "mxbai-embed-large") -> OllamaEmbeddings:
+    from langchain_ollama import OllamaEmbeddings
+
     # Ollama provides local embedding models, usable via LangChain embeddings wrappers. [web:169]
     return OllamaEmbeddings(model=model)
-
@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+import csv
+import glob
+import os
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from nodes.log_codec import iter_records
+from nodes.log_index import map_logs, memory_decision, record_keys
+
+# Rejection reasons emitted by memory_node, one bit each in decisions.reasons.
+REASONS = (
+    "argument_too_short",
+    "argument_too_long",
+    "argument_contains_newlines",
+    "topic_keywords_missing",
+    "boilerplate_lead_while",
+    "looks_like_fallback_template",
+    "duplicate_argument",
+    "duplicate_last_turn",
+    "duplicate_lead_sentence",
+    "other",
+)
+_REASON_BIT = {r: 1 << i for i, r in enumerate(REASONS)}
+
+ACTIONS = ("accept", "retry", "forced_rewrite", "exhausted_accept")
+WINNERS = ("Scientist", "Philosopher")
+
+DEBATE_COLUMNS: Dict[str, str] = {
+    "debate": "i8",
+    "path": "U",
+    "topic": "U",
+    "model": "U",
+    "judge_model": "U",
+    "ok": "?",
+    "rounds": "i2",
+    "decisions": "i4",
+    "rejections": "i4",
+    "agent_fallbacks": "i4",
+    "forced_rewrites": "i4",
+    "exhausted_accepts": "i4",
+    "winner": "i1",          # index into WINNERS, -1 = no verdict
+    "llm_calls": "i4",
+    "prompt_tokens": "i8",
+    "completion_tokens": "i8",
+}
+DECISION_COLUMNS: Dict[str, str] = {
+    "debate": "i8",
+    "round": "i2",
+    "speaker": "i1",         # 0 = A, 1 = B, -1 unknown
+    "action": "i1",          # index into ACTIONS
+    "reasons": "u4",         # bitmask over REASONS
+}
+
+
+def _reason_mask(reasons: Iterable[str]) -> int:
+    m = 0
+    for r in reasons:
+        m |= _REASON_BIT.get(r, _REASON_BIT["other"])
+    return m
+
+
+def _new_debate(path: str) -> Dict[str, Any]:
+    return {
+        "path": path, "topic": "", "model": "", "judge_model": "", "ok": True, "rounds": 0,
+        "decisions": 0, "rejections": 0, "agent_fallbacks": 0, "forced_rewrites": 0,
+        "exhausted_accepts": 0, "winner": -1, "llm_calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+    }
+
+
+def parse_log(path: str) -> List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+    """
+    Worker: streams one log into debate rows, each with its memory_node decision rows.
+    A USER_INPUT record starts a new debate, so logs reused across runs split correctly.
+    Runs in a separate process; only the (small) rows travel back.
+    """
+    out: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]] = []
+    debate: Dict[str, Any] = _new_debate(path)
+    decisions: List[Dict[str, Any]] = []
+    seen = False
+    prev: Optional[Dict[str, Any]] = None
+    for rec in iter_records(path):
+        node = rec.get("node")
+        if node == "USER_INPUT" and seen:
+            out.append((debate, decisions))
+            debate, decisions, prev = _new_debate(path), [], None
+        seen = True
+        keys = record_keys(rec, prev)
+        prev = rec
+        snap = rec.get("snapshot") or {}
+        io = rec.get("node_io") or {}
+        io_in, io_out = io.get("input") or {}, io.get("output") or {}
+
+        debate["topic"] = debate["topic"] or str(snap.get("topic") or "")
+        debate["rounds"] = max(debate["rounds"], int(snap.get("roundidx") or 0))
+        if snap.get("status") == "ERROR":
+            debate["ok"] = False
+        debate["agent_fallbacks"] += "AGENT_FALLBACK_USED" in keys["flag"]
+        for span in ((io.get("telemetry") or {}).get("llm") or []):
+            debate["llm_calls"] += 1
+            debate["prompt_tokens"] += int(span.get("prompt_tokens") or 0)
+            debate["completion_tokens"] += int(span.get("completion_tokens") or 0)
+
+        decision = memory_decision(rec, keys)
+        if node in ("AGENT_A", "AGENT_B") and io_in.get("model"):
+            debate["model"] = str(io_in["model"])
+        elif node == "JUDGE":
+            debate["judge_model"] = str(io_in.get("model") or "")
+            w = io_out.get("winner")
+            debate["winner"] = WINNERS.index(w) if w in WINNERS else -1
+        elif decision is not None:
+            action, _ = decision
+            speaker = io_in.get("pendingspeaker")
+            decisions.append(
+                {
+                    "round": int(keys["round"][0]) if keys["round"] else 0,
+                    "speaker": ("A", "B").index(speaker) if speaker in ("A", "B") else -1,
+                    "action": ACTIONS.index(action),
+                    "reasons": _reason_mask(keys["reason"]),
+                }
+            )
+            debate["decisions"] += 1
+            debate["rejections"] += action != "accept"
+            debate["forced_rewrites"] += action == "forced_rewrite"
+            debate["exhausted_accepts"] += action == "exhausted_accept"
+    if seen:
+        out.append((debate, decisions))
+    return out
+
+
+def _columns(rows: List[Dict[str, Any]], schema: Dict[str, str]) -> Dict[str, np.ndarray]:
+    out: Dict[str, np.ndarray] = {}
+    for col, dt in schema.items():
+        vals = [r[col] for r in rows]
+        out[col] = np.array(vals, dtype=str) if dt == "U" else np.array(vals, dtype=dt)
+    return out
+
+
+class PartitionWriter:
+    """Buffers up to `rows_per_partition` debates, then writes part-NNNNN as .npz or two CSV files."""
+
+    def __init__(self, out_dir: str, fmt: str = "npz", rows_per_partition: int = 512):
+        if fmt not in ("npz", "csv"):
+            raise ValueError(f"unknown partition format: {fmt!r}")
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.rows_per_partition = max(1, int(rows_per_partition))
+        self.partitions: List[str] = []
+        self.n_debates = 0
+        self._debates: List[Dict[str, Any]] = []
+        self._decisions: List[Dict[str, Any]] = []
+        os.makedirs(out_dir, exist_ok=True)
+
+    def add(self, debate: Dict[str, Any], decisions: List[Dict[str, Any]]) -> None:
+        did = self.n_debates
+        self.n_debates += 1
+        self._debates.append({**debate, "debate": did})
+        self._decisions.extend({**d, "debate": did} for d in decisions)
+        if len(self._debates) >= self.rows_per_partition:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._debates:
+            return
+        name = os.path.join(self.out_dir, f"part-{len(self.partitions):05d}")
+        if self.fmt == "npz":
+            arrays = {f"debates.{k}": v for k, v in _columns(self._debates, DEBATE_COLUMNS).items()}
+            arrays.update({f"decisions.{k}": v for k, v in _columns(self._decisions, DECISION_COLUMNS).items()})
+            np.savez_compressed(name + ".npz", **arrays)
+            self.partitions.append(name + ".npz")
+        else:
+            for table, rows, schema in (("debates", self._debates, DEBATE_COLUMNS), ("decisions", self._decisions, DECISION_COLUMNS)):
+                with open(f"{name}.{table}.csv", "w", encoding="utf-8", newline="") as f:
+                    w = csv.DictWriter(f, fieldnames=list(schema), extrasaction="ignore")
+                    w.writeheader()
+                    w.writerows(rows)
+            self.partitions.append(name + ".debates.csv")
+        self._debates, self._decisions = [], []
+
+
+def export_logs(
+    paths: Iterable[str],
+    out_dir: str,
+    fmt: str = "npz",
+    workers: Optional[int] = None,
+    rows_per_partition: int = 512,
+) -> Dict[str, Any]:
+    """
+    Parses logs in worker processes and writes columnar partitions. At most 4 logs per
+    worker are in flight and partitions are flushed as they fill, so memory stays flat
+    regardless of how many logs are exported.
+    """
+    writer = PartitionWriter(out_dir, fmt, rows_per_partition)
+    errors: List[str] = []
+    for path, rows, err in map_logs(parse_log, paths, workers):
+        if err is not None:
+            errors.append(f"{path}: {type(err).__name__}: {err}"[:300])
+            continue
+        for debate, decisions in rows:
+            writer.add(debate, decisions)
+    writer.flush()
+    return {"debates": writer.n_debates, "partitions": writer.partitions, "errors": errors}
+
+
+def _read_csv(path: str, schema: Dict[str, str]) -> Dict[str, np.ndarray]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    out: Dict[str, np.ndarray] = {}
+    for col, dt in schema.items():
+        vals = [r[col] for r in rows]
+        if dt == "U":
+            out[col] = np.array(vals, dtype=str)
+        elif dt == "?":
+            out[col] = np.array([v == "True" for v in vals], dtype=bool)
+        else:
+            out[col] = np.array(vals, dtype=np.int64).astype(dt)
+    return out
+
+
+def iter_partitions(export_dir: str) -> Iterator[Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]]:
+    """Yields (debates, decisions) column dicts one partition at a time."""
+    for path in sorted(glob.glob(os.path.join(export_dir, "part-*.npz"))):
+        with np.load(path) as z:
+            yield (
+                {k.split(".", 1)[1]: z[k] for k in z.files if k.startswith("debates.")},
+                {k.split(".", 1)[1]: z[k] for k in z.files if k.startswith("decisions.")},
+            )
+    for path in sorted(glob.glob(os.path.join(export_dir, "part-*.debates.csv"))):
+        yield _read_csv(path, DEBATE_COLUMNS), _read_csv(path.replace(".debates.csv", ".decisions.csv"), DECISION_COLUMNS)
+
+
+class _Group:
+    def __init__(self) -> None:
+        self.debates = 0
+        self.ok = 0
+        self.decisions = 0
+        self.rejections = 0
+        self.agent_fallbacks = 0
+        self.forced_rewrites = 0
+        self.exhausted_accepts = 0
+        self.wins = np.zeros(len(WINNERS) + 1, dtype=np.int64)  # last slot: no verdict
+        self.reasons = np.zeros(len(REASONS), dtype=np.int64)
+        self.round_retries: Dict[int, int] = defaultdict(int)
+        self.round_debates: Dict[int, Set[int]] = defaultdict(set)
+
+    def row(self) -> Dict[str, Any]:
+        return {
+            "debates": self.debates,
+            "ok": self.ok,
+            "decisions": self.decisions,
+            "rejection_rate": round(self.rejections / self.decisions, 4) if self.decisions else 0.0,
+            "agent_fallbacks_per_debate": round(self.agent_fallbacks / self.debates, 3) if self.debates else 0.0,
+            "forced_rewrites": self.forced_rewrites,
+            "exhausted_accepts": self.exhausted_accepts,
+            "winners": {**{w: int(self.wins[i]) for i, w in enumerate(WINNERS)}, "none": int(self.wins[-1])},
+            "top_reasons": {REASONS[i]: int(self.reasons[i]) for i in np.argsort(-self.reasons)[:3] if self.reasons[i]},
+        }
+
+
+def build_report(export_dir: str) -> Dict[str, Any]:
+    """Per-topic and per-model breakdowns, plus retries per round; one partition in memory at a time."""
+    groups: Dict[str, Dict[str, _Group]] = {"all": defaultdict(_Group), "topic": defaultdict(_Group), "model": defaultdict(_Group)}
+    bits = np.array([_REASON_BIT[r] for r in REASONS], dtype=np.uint32)
+    round_retries = np.zeros(0, dtype=np.int64)
+    round_decisions = np.zeros(0, dtype=np.int64)
+
+    for deb, dec in iter_partitions(export_dir):
+        n = len(deb["debate"])
+        if not n:
+            continue
+        # Map decision rows to their debate row in this partition.
+        row_of = np.searchsorted(deb["debate"], dec["debate"])
+        rejected = dec["action"] != ACTIONS.index("accept")
+        reason_hits = (dec["reasons"][:, None] & bits[None, :]) != 0 if len(dec["reasons"]) else np.zeros((0, len(REASONS)), bool)
+
+        if len(dec["round"]):
+            size = int(dec["round"].max()) + 1
+            if size > len(round_retries):
+                round_retries = np.pad(round_retries, (0, size - len(round_retries)))
+                round_decisions = np.pad(round_decisions, (0, size - len(round_decisions)))
+            np.add.at(round_retries, dec["round"], rejected.astype(np.int64))
+            np.add.at(round_decisions, dec["round"], 1)
+
+        for kind, labels in (("all", np.full(n, "all")), ("topic", deb["topic"]), ("model", deb["model"])):
+            for label in np.unique(labels):
+                sel = labels == label
+                g = groups[kind][str(label) or "(unknown)"]
+                g.debates += int(sel.sum())
+                g.ok += int(deb["ok"][sel].sum())
+                g.agent_fallbacks += int(deb["agent_fallbacks"][sel].sum())
+                g.forced_rewrites += int(deb["forced_rewrites"][sel].sum())
+                g.exhausted_accepts += int(deb["exhausted_accepts"][sel].sum())
+                w = deb["winner"][sel]
+                g.wins += np.bincount(np.where(w < 0, len(WINNERS), w), minlength=len(WINNERS) + 1)
+                dsel = sel[row_of] if len(row_of) else np.zeros(0, bool)
+                g.decisions += int(dsel.sum())
+                g.rejections += int(rejected[dsel].sum())
+                g.reasons += reason_hits[dsel & rejected].sum(axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        per_round = np.where(round_decisions > 0, round_retries / np.maximum(round_decisions, 1), 0.0)
+    return {
+        "overall": groups["all"]["all"].row() if "all" in groups["all"] else _Group().row(),
+        "by_topic": {k: g.row() for k, g in sorted(groups["topic"].items())},
+        "by_model": {k: g.row() for k, g in sorted(groups["model"].items())},
+        "rejections_per_decision_by_round": {int(r): round(float(v), 4) for r, v in enumerate(per_round) if round_decisions[r]},
+    }
+
+
+def format_report(report: Dict[str, Any], top: int = 20) -> str:
+    lines: List[str] = []
+    header = f"{'':<40}{'debates':>8}{'decisions':>10}{'reject %':>9}{'fallback/deb':>13}{'forced':>7}{'Sci':>5}{'Phi':>5}"
+    for title, rows in (("overall", {"all": report["overall"]}), ("by topic", report["by_topic"]), ("by model", report["by_model"])):
+        lines += [f"[{title}]", header]
+        for name, r in sorted(rows.items(), key=lambda kv: -kv[1]["debates"])[:top]:
+            lines.append(
+                f"{name[:39]:<40}{r['debates']:>8}{r['decisions']:>10}{r['rejection_rate'] * 100:>8.1f}%"
+                f"{r['agent_fallbacks_per_debate']:>13.2f}{r['forced_rewrites']:>7}"
+                f"{r['winners']['Scientist']:>5}{r['winners']['Philosopher']:>5}"
+            )
+        lines.append("")
+    lines.append("[rejections per decision by round]")
+    lines.append("  " + "  ".join(f"R{r}: {v:.2f}" for r, v in report["rejections_per_decision_by_round"].items()))
+    return "\n".join(lines)
@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import os
+import re
+import threading
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Log formats selectable with state["logformat"]; plain JSONL stays the default.
+FORMAT_JSONL = "jsonl"
+FORMAT_DELTA_GZIP = "delta-gzip"
+FORMAT_DELTA_ZSTD = "delta-zstd"
+FORMATS = (FORMAT_JSONL, FORMAT_DELTA_GZIP, FORMAT_DELTA_ZSTD)
+
+SUFFIXES = {FORMAT_DELTA_GZIP: ".dlog.gz", FORMAT_DELTA_ZSTD: ".dlog.zst"}
+
+# A full record is written at least this often (and at the start of every frame).
+DEFAULT_KEYFRAME_EVERY = 32
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_DEL = "$del"
+
+# Rotated JSONL parts (see nodes.log_manager.append_jsonl): <log>.1, <log>.2.gz, ...
+_SEGMENT_RE = re.compile(r"\.(\d+)(\.gz)?$")
+
+
+def diff(prev: Dict[str, Any], cur: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Nested-dict delta: keys whose value changed (dicts recursively), removed keys under "$del".
+    Lists and scalars are replaced whole.
+    """
+    out: Dict[str, Any] = {}
+    for k, v in cur.items():
+        if k not in prev:
+            out[k] = v
+            continue
+        p = prev[k]
+        if isinstance(v, dict) and isinstance(p, dict):
+            d = diff(p, v)
+            if d:
+                out[k] = d
+        elif v != p:
+            out[k] = v
+    removed = [k for k in prev if k not in cur]
+    if removed:
+        out[_DEL] = removed
+    return out
+
+
+def apply_diff(prev: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    out = dict(prev)
+    for k in delta.get(_DEL, ()):
+        out.pop(k, None)
+    for k, v in delta.items():
+        if k == _DEL:
+            continue
+        if isinstance(v, dict) and isinstance(out.get(k), dict):
+            out[k] = apply_diff(out[k], v)
+        else:
+            out[k] = v
+    return out
+
+
+class _GzipFrames:
+    """One gzip member per frame; records inside a frame are sync-flushed so a crash loses at most one record."""
+
+    def __init__(self) -> None:
+        self._c: Optional[Any] = None
+
+    def write(self, data: bytes, new_frame: bool) -> bytes:
+        head = b""
+        if new_frame and self._c is not None:
+            head = self._c.flush(zlib.Z_FINISH)
+            self._c = None
+        if self._c is None:
+            self._c = zlib.compressobj(6, zlib.DEFLATED, 31)
+        return head + self._c.compress(data) + self._c.flush(zlib.Z_SYNC_FLUSH)
+
+    def close(self) -> bytes:
+        return self._c.flush(zlib.Z_FINISH) if self._c is not None else b""
+
+
+class _ZstdFrames:
+    def __init__(self) -> None:
+        try:
+            import zstandard
+        except ImportError as e:  # optional dependency
+            raise RuntimeError("logformat 'delta-zstd' needs the 'zstandard' package (pip install zstandard)") from e
+        self._zstd = zstandard
+        self._c: Optional[Any] = None
+
+    def write(self, data: bytes, new_frame: bool) -> bytes:
+        z = self._zstd
+        head = b""
+        if new_frame and self._c is not None:
+            head = self._c.flush(z.COMPRESSOBJ_FLUSH_FINISH)
+            self._c = None
+        if self._c is None:
+            self._c = z.ZstdCompressor(level=3).compressobj()
+        return head + self._c.compress(data) + self._c.flush(z.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def close(self) -> bytes:
+        return self._c.flush(self._zstd.COMPRESSOBJ_FLUSH_FINISH) if self._c is not None else b""
+
+
+class DeltaLogWriter:
+    """
+    Appends records as deltas against the previous record, with a full keyframe every
+    `keyframe_every` records. Each keyframe starts a new compression frame, so a reader
+    can start decoding at any frame boundary. Lines inside the stream are
+    {"k": record} (keyframe) or {"d": delta}.
+    """
+
+    def __init__(self, path: str, fmt: str = FORMAT_DELTA_GZIP, keyframe_every: int = DEFAULT_KEYFRAME_EVERY):
+        if fmt not in SUFFIXES:
+            raise ValueError(f"not a delta log format: {fmt!r}")
+        self.path = os.path.abspath(path)
+        self.keyframe_every = max(1, int(keyframe_every))
+        self._frames = _ZstdFrames() if fmt == FORMAT_DELTA_ZSTD else _GzipFrames()
+        self._prev: Optional[Dict[str, Any]] = None
+        self._since_key = 0
+        self._lock = threading.Lock()
+
+    def append(self, record: Dict[str, Any], fsync: bool = True) -> None:
+        with self._lock:
+            keyframe = self._prev is None or self._since_key >= self.keyframe_every
+            if keyframe:
+                line = {"k": record}
+                self._since_key = 0
+            else:
+                line = {"d": diff(self._prev, record)}
+            self._since_key += 1
+            payload = self._frames.write((json.dumps(line, ensure_ascii=False) + "\n").encode("utf-8"), keyframe)
+            # Round-trip so the next delta is computed against what a reader reconstructs.
+            self._prev = json.loads(json.dumps(record, ensure_ascii=False))
+            with open(self.path, "ab") as f:
+                f.write(payload)
+                f.flush()
+                if fsync:
+                    os.fsync(f.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            tail = self._frames.close()
+            if tail:
+                with open(self.path, "ab") as f:
+                    f.write(tail)
+            self._prev = None
+
+
+_WRITERS: Dict[str, DeltaLogWriter] = {}
+_WRITERS_LOCK = threading.Lock()
+
+
+def writer_for(path: str, fmt: str, keyframe_every: int = DEFAULT_KEYFRAME_EVERY) -> DeltaLogWriter:
+    """One writer per log file per process: LoggerNode calls keep the delta chain and frame open."""
+    key = os.path.abspath(path)
+    with _WRITERS_LOCK:
+        w = _WRITERS.get(key)
+        if w is None:
+            w = _WRITERS[key] = DeltaLogWriter(key, fmt, keyframe_every)
+        return w
+
+
+def close_writer(path: str) -> None:
+    with _WRITERS_LOCK:
+        w = _WRITERS.pop(os.path.abspath(path), None)
+    if w is not None:
+        w.close()
+
+
+def rotated_segments(path: str) -> List[str]:
+    """
+    Rotated parts of a JSONL log, oldest first: <path>.1[.gz], <path>.2[.gz], ...
+    While a part is being compressed both names can exist; the plain one is returned then.
+    """
+    directory, base = os.path.split(os.path.abspath(path))
+    first = os.path.join(directory, base + ".1")
+    if not (os.path.exists(first) or os.path.exists(first + ".gz")):
+        return []  # never rotated: skip listing a possibly large log directory
+    try:
+        names = os.listdir(directory or ".")
+    except OSError:
+        return []
+    parts: Dict[int, str] = {}
+    for name in names:
+        if not name.startswith(base + "."):
+            continue
+        m = _SEGMENT_RE.fullmatch(name[len(base):])
+        if not m:
+            continue
+        n = int(m.group(1))
+        if n not in parts or not m.group(2):
+            parts[n] = os.path.join(directory, name)
+    return [parts[n] for n in sorted(parts)]
+
+
+def next_segment_path(path: str) -> str:
+    """Name for the next rotated part of `path`."""
+    segments = rotated_segments(path)
+    return f"{os.path.abspath(path)}.{segment_number(segments[-1]) + 1 if segments else 1}"
+
+
+def segment_number(segment: str) -> int:
+    """N of a rotated part <log>.N[.gz]; stays the same when the part is compressed."""
+    m = _SEGMENT_RE.search(segment)
+    return int(m.group(1)) if m else 0
+
+
+def iter_segment(segment: str) -> Iterator[Dict[str, Any]]:
+    try:
+        f = open(segment, "rb")
+    except FileNotFoundError:
+        f = open(segment + ".gz", "rb")  # compressed (and removed) since it was listed
+    with f:
+        head = f.read(2)
+        f.seek(0)
+        stream = gzip.open(f, "rt", encoding="utf-8") if head == _GZIP_MAGIC else io.TextIOWrapper(f, encoding="utf-8")
+        for ln in stream:
+            if ln.strip():
+                yield json.loads(ln)
+
+
+def detect_format(path: str) -> str:
+    with open(path, "rb") as f:
+        head = f.read(4)
+    if head.startswith(_GZIP_MAGIC):
+        return FORMAT_DELTA_GZIP
+    if head == _ZSTD_MAGIC:
+        return FORMAT_DELTA_ZSTD
+    return FORMAT_JSONL
+
+
+def _gzip_frames(f: Any, chunk: int) -> Iterator[Tuple[int, bytes]]:
+    # Yields (frame start offset, decompressed bytes); tolerates a truncated last frame.
+    offset = f.tell()
+    d = zlib.decompressobj(31)
+    pending = b""
+    while True:
+        data = pending or f.read(chunk)
+        pending = b""
+        if not data:
+            return
+        out = d.decompress(data)
+        if out:
+            yield offset, out
+        if d.eof:
+            rest = d.unused_data
+            offset = f.tell() - len(rest)
+            d = zlib.decompressobj(31)
+            pending = rest
+
+
+def _zstd_frames(f: Any, chunk: int) -> Iterator[Tuple[int, bytes]]:
+    import zstandard
+
+    offset = f.tell()
+    d = zstandard.ZstdDecompressor().decompressobj()
+    pending = b""
+    while True:
+        data = pending or f.read(chunk)
+        pending = b""
+        if not data:
+            return
+        out = d.decompress(data)
+        if out:
+            yield offset, out
+        if d.eof:
+            rest = d.unused_data
+            offset = f.tell() - len(rest)
+            d = zstandard.ZstdDecompressor().decompressobj()
+            pending = rest
+
+
+def iter_lines(path: str, offset: int = 0, chunk: int = 1 << 16) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Raw stream lines of a delta log as (frame offset, {"k": ...} | {"d": ...}).
+    `offset` must be a frame boundary (as reported here); 0 reads the whole file.
+    """
+    fmt = detect_format(path)
+    with open(path, "rb") as f:
+        f.seek(offset)
+        frames = _zstd_frames(f, chunk) if fmt == FORMAT_DELTA_ZSTD else _gzip_frames(f, chunk)
+        buf = b""
+        buf_offset = offset
+        for frame_offset, data in frames:
+            if not buf:
+                buf_offset = frame_offset
+            buf += data
+            *lines, buf = buf.split(b"\n")
+            for ln in lines:
+                if ln.strip():
+                    yield buf_offset, json.loads(ln)
+                buf_offset = frame_offset
+        # A trailing partial line means the writer died mid-record; drop it.
+
+
+def iter_records(path: str, offset: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Full log records, reconstructed one at a time, from either format:
+    plain JSONL is parsed line by line, delta logs are decompressed and re-applied lazily.
+    A rotated JSONL log (see nodes.log_manager) is read part by part when offset is 0.
+    """
+    if offset == 0:
+        for segment in rotated_segments(path):
+            yield from iter_segment(segment)
+        if not os.path.exists(path):
+            return
+    if detect_format(path) == FORMAT_JSONL:
+        with open(path, "r", encoding="utf-8") as f:
+            f.seek(offset)
+            for ln in f:
+                if ln.strip():
+                    yield json.loads(ln)
+        return
+
+    prev: Optional[Dict[str, Any]] = None
+    for _, line in iter_lines(path, offset):
+        if "k" in line:
+            prev = line["k"]
+        elif prev is None:
+            continue  # started mid-frame; wait for the next keyframe
+        else:
+            prev = apply_diff(prev, line["d"])
+        yield prev
+
+
+def frame_offsets(path: str) -> List[int]:
+    """Offsets where decoding can start (each begins with a keyframe)."""
+    seen: List[int] = []
+    for off, line in iter_lines(path):
+        if "k" in line and (not seen or seen[-1] != off):
+            seen.append(off)
+    return seen
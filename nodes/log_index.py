@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from nodes.diagnostics import DIAG_SUFFIX
+from nodes.log_codec import (
+    FORMAT_JSONL,
+    apply_diff,
+    detect_format,
+    iter_lines,
+    iter_records,
+    iter_segment,
+    rotated_segments,
+    segment_number,
+)
+
+# 2: JSONL positions carry the rotated part they live in (see build_index).
+INDEX_VERSION = 2
+INDEX_SUFFIX = ".idx.json"
+LOG_SUFFIXES = (".jsonl", ".dlog.gz", ".dlog.zst")
+# Files next to a log that share its suffix but are not debate logs.
+SIDE_SUFFIXES = (DIAG_SUFFIX,)
+
+# Query keys; every record is indexed under "<key>:<value>" postings.
+KEYS = ("node", "round", "speaker", "flag", "reason")
+
+_NODES_WITH_ROUND = ("AGENT_A", "AGENT_B", "MEMORY")
+
+
+def index_path(log_path: str) -> str:
+    return log_path + INDEX_SUFFIX
+
+
+def record_keys(rec: Dict[str, Any], prev: Optional[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """
+    Index values of one record. Flags and rejection reasons are taken only from entries new
+    in this record (the *_tail lists repeat older ones), using the snapshot lengths.
+    """
+    snap = rec.get("snapshot") or {}
+    psnap = (prev or {}).get("snapshot") or {}
+    io = rec.get("node_io") or {}
+    io_in, io_out = io.get("input") or {}, io.get("output") or {}
+    node = str(rec.get("node") or "")
+
+    n_flags = max(0, int(snap.get("coherenceflags_len", 0)) - int(psnap.get("coherenceflags_len", 0)))
+    n_rej = max(0, int(snap.get("rejectionhistory_len", 0)) - int(psnap.get("rejectionhistory_len", 0)))
+    new_flags = (rec.get("coherenceflags_tail") or [])[-n_flags:] if n_flags else []
+    new_rej = (rec.get("rejectionhistory_tail") or [])[-n_rej:] if n_rej else []
+
+    rounds = {f.get("round") for f in new_flags + new_rej if f.get("round") is not None}
+    if io_out.get("round") is not None:
+        rounds.add(io_out["round"])
+    if not rounds:
+        rounds.add(int(snap.get("roundidx", 0)) + (1 if node in _NODES_WITH_ROUND else 0))
+
+    speakers = {f.get("speaker") for f in new_flags + new_rej if f.get("speaker")}
+    sp = io_in.get("speaker") or io_in.get("pendingspeaker")
+    if sp:
+        speakers.add(sp)
+
+    reasons = {r for e in new_rej for r in ((e.get("details") or {}).get("reasons") or [])}
+    reasons.update(io_out.get("reasons") or [])
+
+    return {
+        "node": [node] if node else [],
+        "round": sorted(str(r) for r in rounds),
+        "speaker": sorted(speakers),
+        "flag": sorted({str(f.get("type")) for f in new_flags if f.get("type")}),
+        "reason": sorted(reasons),
+    }
+
+
+def memory_decision(rec: Dict[str, Any], keys: Dict[str, List[str]]) -> Optional[Tuple[str, List[str]]]:
+    """
+    (action, reasons) of a MEMORY record, where action is accept / retry / forced_rewrite /
+    exhausted_accept; None for other records. `keys` comes from record_keys.
+    """
+    out = ((rec.get("node_io") or {}).get("output") or {})
+    if rec.get("node") != "MEMORY" or out.get("action") not in ("accept", "retry"):
+        return None
+    flags = set(keys["flag"])
+    if "RETRY_EXHAUSTED_FORCED_REWRITE" in flags:
+        return "forced_rewrite", keys["reason"]
+    if "RETRY_EXHAUSTED_ACCEPTED" in flags:
+        return "exhausted_accept", keys["reason"]
+    return out["action"], keys["reason"]
+
+
+def _jsonl_lines(path: str, start: int) -> Iterator[Tuple[int, int, bytes]]:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size <= start:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = start
+            end = len(mm)
+            while pos < end:
+                nl = mm.find(b"\n", pos)
+                if nl < 0:
+                    return  # partial last line: picked up on the next update
+                if nl > pos:
+                    yield pos, nl - pos, mm[pos:nl]
+                pos = nl + 1
+
+
+def _tail_mark(path: str, end: int) -> str:
+    # Last bytes before `end`: detects a rewritten (not just appended) file.
+    with open(path, "rb") as f:
+        f.seek(max(0, end - 64))
+        return f.read(min(64, end)).hex()
+
+
+def _stat(log_path: str) -> Tuple[int, int]:
+    # Right after a rotation the live file may not exist yet: index the rotated parts only.
+    try:
+        st = os.stat(log_path)
+    except FileNotFoundError:
+        if not rotated_segments(log_path):
+            raise
+        return 0, 0
+    return st.st_size, st.st_mtime_ns
+
+
+def _segment_numbers(log_path: str) -> List[int]:
+    return [segment_number(p) for p in rotated_segments(log_path)]
+
+
+def build_index(log_path: str, old: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Indexes one log. JSONL positions are [part, a, b]: part 0 is the live file with
+    (byte offset, length); part N is the rotated <log>.N[.gz] with (record number, 0).
+    With `old` (a previous index of a plain JSONL log that has only been appended to since),
+    only the new bytes are read; a rotation since then (new parts, live file restarted)
+    means a full rebuild. Delta logs are re-read in full.
+    """
+    size, mtime_ns = _stat(log_path)
+    fmt = detect_format(log_path) if size else FORMAT_JSONL
+    segments = _segment_numbers(log_path) if fmt == FORMAT_JSONL else []
+    idx: Dict[str, Any] = {"version": INDEX_VERSION, "format": fmt, "segments": segments, "positions": [], "postings": {}, "last": None, "end": 0}
+    if old and old.get("format") == fmt == FORMAT_JSONL and old.get("segments") == segments and 0 < old.get("end", 0) <= size:
+        if _tail_mark(log_path, old["end"]) == old.get("tail_mark"):
+            idx = {**old, "positions": list(old["positions"]), "postings": {k: list(v) for k, v in old["postings"].items()}}
+
+    prev = idx.get("last")
+
+    def add(pos: List[int], rec: Dict[str, Any]) -> None:
+        nonlocal prev
+        n = len(idx["positions"])
+        idx["positions"].append(pos)
+        for key, values in record_keys(rec, prev).items():
+            for v in values:
+                idx["postings"].setdefault(f"{key}:{v}", []).append(n)
+        # Only what record_keys needs from the previous record.
+        prev = {"snapshot": {k: (rec.get("snapshot") or {}).get(k, 0) for k in ("coherenceflags_len", "rejectionhistory_len")}}
+
+    if fmt == FORMAT_JSONL:
+        if not idx["positions"]:
+            for n, segment in zip(segments, rotated_segments(log_path)):
+                for i, rec in enumerate(iter_segment(segment)):
+                    add([n, i, 0], rec)
+        end = idx["end"]
+        for off, length, raw in _jsonl_lines(log_path, idx["end"]) if size else ():
+            try:
+                rec = json.loads(raw)
+            except ValueError:
+                continue
+            add([0, off, length], rec)
+            end = off + length + 1
+        idx["end"] = end
+    else:
+        # Position = (frame offset, record number inside the frame).
+        rec: Dict[str, Any] = {}
+        frame, n_in_frame = -1, 0
+        for off, line in iter_lines(log_path):
+            if off != frame:
+                frame, n_in_frame = off, 0
+            if "k" in line:
+                rec = line["k"]
+            else:
+                rec = apply_diff(rec, line["d"])
+            add([frame, n_in_frame], rec)
+            n_in_frame += 1
+        idx["end"] = size
+
+    idx["last"] = prev
+    idx["size"] = size
+    idx["mtime_ns"] = mtime_ns
+    idx["tail_mark"] = _tail_mark(log_path, idx["end"]) if size else ""
+    return idx
+
+
+def load_index(log_path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(index_path(log_path), "r", encoding="utf-8") as f:
+            idx = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return idx if idx.get("version") == INDEX_VERSION else None
+
+
+def update_index(log_path: str) -> Tuple[Dict[str, Any], bool]:
+    """Returns (index, rebuilt?); unchanged logs (same size and mtime) are not touched."""
+    old = load_index(log_path)
+    size, mtime_ns = _stat(log_path)
+    if old and old.get("size") == size and old.get("mtime_ns") == mtime_ns:
+        if old.get("format") != FORMAT_JSONL or old.get("segments") == _segment_numbers(log_path):
+            return old, False
+    idx = build_index(log_path, old)
+    tmp = index_path(log_path) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(idx, f, separators=(",", ":"))
+    os.replace(tmp, index_path(log_path))
+    return idx, True
+
+
+def iter_log_paths(paths: Iterable[str]) -> Iterator[str]:
+    """
+    Walks files/directories lazily (no full listing in memory). A rotated log whose live file
+    has not been re-created yet is found through its first part (<log>.1[.gz]).
+    """
+    for p in paths:
+        if os.path.isfile(p) or (p.endswith(LOG_SUFFIXES) and rotated_segments(p)):
+            yield os.path.abspath(p)
+            continue
+        for root, dirs, files in os.walk(p):
+            dirs.sort()
+            names = set(files)
+            for f in sorted(files):
+                if f.endswith(SIDE_SUFFIXES):
+                    continue
+                if f.endswith(LOG_SUFFIXES):
+                    yield os.path.join(root, f)
+                    continue
+                base = f[:-3] if f.endswith(".1.gz") else f
+                if base.endswith(".1") and base[:-2].endswith(LOG_SUFFIXES) and base[:-2] not in names:
+                    if f.endswith(".gz") and base in names:
+                        continue  # .1 and .1.gz both exist while the part is being compressed
+                    yield os.path.join(root, base[:-2])
+
+
+def find_logs(paths: Iterable[str]) -> List[str]:
+    return sorted(iter_log_paths(paths))
+
+
+def match(idx: Dict[str, Any], query: Dict[str, str]) -> List[int]:
+    """Record numbers matching every `key: value` in query (an empty query matches all)."""
+    postings = idx.get("postings") or {}
+    hits: Optional[set] = None
+    for key, value in query.items():
+        ids = set(postings.get(f"{key}:{value}", ()))
+        hits = ids if hits is None else hits & ids
+        if not hits:
+            return []
+    return sorted(hits) if hits is not None else list(range(len(idx.get("positions") or [])))
+
+
+def read_records(log_path: str, idx: Dict[str, Any], ids: List[int]) -> Iterator[Tuple[List[int], Dict[str, Any]]]:
+    """
+    Seeks straight to the indexed records (mmap for the live JSONL file, frame offset for delta
+    logs). Records in rotated parts are read by streaming each needed part once.
+    """
+    positions = idx["positions"]
+    if idx.get("format") == FORMAT_JSONL:
+        parts = {segment_number(p): p for p in rotated_segments(log_path)}
+        live = [i for i in ids if positions[i][0] == 0]
+        rotated: Dict[int, Dict[int, int]] = {}
+        for i in ids:
+            if positions[i][0]:
+                rotated.setdefault(positions[i][0], {})[positions[i][1]] = i
+        for n, wanted in sorted(rotated.items()):
+            if n not in parts:
+                continue  # removed since indexing; update_index rebuilds on the next pass
+            for k, rec in enumerate(iter_segment(parts[n])):
+                if k in wanted:
+                    yield positions[wanted[k]], rec
+                if k >= max(wanted):
+                    break
+        if not live:
+            return
+        with open(log_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for i in live:
+                _, off, length = positions[i]
+                yield positions[i], json.loads(mm[off:off + length])
+        return
+    for i in ids:
+        frame, n = positions[i]
+        rec = next(islice(iter_records(log_path, frame), n, None), None)
+        if rec is not None:
+            yield positions[i], rec
+
+
+def map_logs(fn: Callable[[str], Any], paths: Iterable[str], workers: Optional[int] = None) -> Iterator[Tuple[str, Any, Optional[BaseException]]]:
+    """
+    Runs fn(path) for every log in worker processes and yields (path, result, error) as they
+    finish. At most 4 logs per worker are in flight, so memory stays flat for any archive size.
+    """
+    workers = max(1, workers or os.cpu_count() or 1)
+    path_iter = iter_log_paths(paths)
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        inflight: Dict[Future, str] = {}
+
+        def fill() -> None:
+            for p in path_iter:
+                inflight[ex.submit(fn, p)] = p
+                if len(inflight) >= workers * 4:
+                    return
+
+        fill()
+        while inflight:
+            done, _ = wait(list(inflight), return_when=FIRST_COMPLETED)
+            for fut in done:
+                path = inflight.pop(fut)
+                err = fut.exception()
+                yield path, (None if err else fut.result()), err
+            fill()
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import gzip
+import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from nodes.log_codec import FORMAT_JSONL, SUFFIXES, next_segment_path
+
+# state["logverbosity"]:
+#   minimal - only accepted turns, rejections, the verdict and errors (bulk runs)
+#   normal  - every state transition with node inputs/outputs (default)
+#   debug   - normal plus the process diagnostics block (cwd, which helper keys were set)
+VERBOSITY_MINIMAL = "minimal"
+VERBOSITY_NORMAL = "normal"
+VERBOSITY_DEBUG = "debug"
+VERBOSITIES = (VERBOSITY_MINIMAL, VERBOSITY_NORMAL, VERBOSITY_DEBUG)
+
+# Directory layout under the log root: flat, <YYYY-MM-DD>/ or <YYYY-MM-DD>/<HH>/.
+SHARD_NONE = "none"
+SHARD_DATE = "date"
+SHARD_HOUR = "hour"
+SHARDS = (SHARD_NONE, SHARD_DATE, SHARD_HOUR)
+
+# Node-input keys dropped from minimal records (the accepted text is in turns_tail anyway).
+_MINIMAL_DROP_INPUT = ("pendingtext",)
+
+
+def debate_log_path(
+    root: str,
+    log_format: str = FORMAT_JSONL,
+    shard: str = SHARD_NONE,
+    prefix: str = "debate_log",
+    now: Optional[datetime] = None,
+) -> str:
+    """
+    A fresh per-debate log path: <root>[/<date>[/<hour>]]/<prefix>_<YYYYmmdd_HHMMSS>_<id>.<ext>.
+    The random id keeps runs started in the same second (or in parallel) from sharing a file.
+    """
+    if shard not in SHARDS:
+        raise ValueError(f"unknown log shard {shard!r} (expected one of {', '.join(SHARDS)})")
+    now = now or datetime.now()
+    parts = [os.path.abspath(root)]
+    if shard in (SHARD_DATE, SHARD_HOUR):
+        parts.append(now.strftime("%Y-%m-%d"))
+    if shard == SHARD_HOUR:
+        parts.append(now.strftime("%H"))
+    name = f"{prefix}_{now.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:12]}{SUFFIXES.get(log_format, '.jsonl')}"
+    return os.path.join(*parts, name)
+
+
+def record_for(verbosity: str, node: str, status: str, node_io: Any) -> str:
+    """
+    What LoggerNode writes for a transition at this verbosity: "skip", "minimal", "normal"
+    or "debug". Minimal keeps MEMORY decisions (accept/retry), JUDGE and errors.
+    """
+    if verbosity == VERBOSITY_DEBUG:
+        return VERBOSITY_DEBUG
+    if verbosity != VERBOSITY_MINIMAL:
+        return VERBOSITY_NORMAL
+    if status == "ERROR" or node == "JUDGE":
+        return VERBOSITY_MINIMAL
+    if node == "MEMORY" and isinstance(node_io, dict):
+        if (node_io.get("output") or {}).get("action") in ("accept", "retry"):
+            return VERBOSITY_MINIMAL
+    return "skip"
+
+
+def minimal_node_io(node_io: Dict[str, Any]) -> Dict[str, Any]:
+    io_in = {k: v for k, v in (node_io.get("input") or {}).items() if k not in _MINIMAL_DROP_INPUT}
+    return {**node_io, "input": io_in}
+
+
+class _Compressor:
+    """One background thread gzips rotated segments, off the LoggerNode hot path."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._ex: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Future] = []
+
+    def submit(self, path: str) -> None:
+        with self._lock:
+            if self._ex is None:
+                self._ex = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-compress")
+            self._pending = [f for f in self._pending if not f.done()]
+            self._pending.append(self._ex.submit(_gzip_file, path))
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for f in pending:
+            f.result()
+
+
+def _gzip_file(path: str) -> None:
+    tmp = path + ".gz.tmp"
+    with open(path, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, 1 << 20)
+    os.replace(tmp, path + ".gz")
+    os.remove(path)
+
+
+_COMPRESSOR = _Compressor()
+
+
+def append_jsonl(path: str, line: str, max_bytes: int = 0, compress: bool = True) -> None:
+    """
+    Appends one JSONL line (fsynced). With max_bytes > 0, a file that has reached the limit
+    is renamed to the next <path>.N and gzipped in the background; writing continues in a
+    fresh file at `path`. nodes.log_codec.iter_records reads the parts back in order.
+    """
+    # One debate's LoggerNode calls are sequential, so a path has a single writer.
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+        size = f.tell()
+    if max_bytes > 0 and size >= max_bytes:
+        segment = next_segment_path(path)
+        os.replace(path, segment)
+        if compress:
+            _COMPRESSOR.submit(segment)
+
+
+def flush() -> None:
+    """Waits for background compression; CLIs call this before exiting."""
+    _COMPRESSOR.flush()
@@ -5,6 +5,9 @@ import os
 from datetime import datetime, timezone
 from typing import Any, Dict, List
 
+from nodes.diagnostics import close_diagnostics
+from nodes.log_codec import DEFAULT_KEYFRAME_EVERY, FORMAT_JSONL, close_writer, writer_for
+from nodes.log_manager import VERBOSITY_DEBUG, VERBOSITY_MINIMAL, append_jsonl, debate_log_path, minimal_node_io, record_for
 from nodes.state import DebateState
 
 
@@ -16,9 +19,8 @@ def _project_root() -> str:
     return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
-def _default_log_path() -> str:
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return os.path.join(_project_root(), "examples", f"debate_log_{ts}.jsonl")
+def _default_log_path(log_format: str = FORMAT_JSONL) -> str:
+    return debate_log_path(os.path.join(_project_root(), "examples"), log_format)
 
 
 def _safe_tail(xs: Any, n: int) -> Any:
@@ -32,16 +34,11 @@ def logger_node(state: DebateState) -> DebateState:
 
     log_path = out.get("logpath") or out.get("log_path") or out.get("logPath")
     if not log_path:
-        log_path = _default_log_path()
+        log_path = _default_log_path(out.get("logformat") or FORMAT_JSONL)
         out["logpath"] = log_path
 
     abs_path = os.path.abspath(log_path)
     out["logpath"] = abs_path
-    os.makedirs(os.path.dirname(abs_path), exist_ok=True)
-
-    turns: List[Dict[str, Any]] = list(out.get("turns", []))
-    coherenceflags: List[Dict[str, Any]] = list(out.get("coherenceflags", []))
-    rejectionhistory: List[Dict[str, Any]] = list(out.get("rejectionhistory", []))
 
     # These will be added by other nodes in the next rewrite pass.
     # LoggerNode will log them if present, otherwise it logs what it can.
@@ -49,15 +46,22 @@ def logger_node(state: DebateState) -> DebateState:
     node_io = out.get("last_node_io")  # optional dict: {"node":..., "input":..., "output":...}
     node_io_name = out.get("last_node_name")
 
+    level = record_for(str(out.get("logverbosity") or ""), node_name, str(out.get("status") or ""), node_io)
+    if level == "skip":
+        if not out.get("lastnode"):
+            out["lastnode"] = "LOGGER"
+        return out
+
+    os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+
+    turns: List[Dict[str, Any]] = list(out.get("turns", []))
+    coherenceflags: List[Dict[str, Any]] = list(out.get("coherenceflags", []))
+    rejectionhistory: List[Dict[str, Any]] = list(out.get("rejectionhistory", []))
+
     record: Dict[str, Any] = {
         "ts": _utc_ts(),
         "type": "STATE_TRANSITION",
         "node": node_name,
-        "debug": {
-            "cwd": os.getcwd(),
-            "has_last_node_io": node_io is not None,
-            "has_last_node_name": node_io_name is not None,
-        },
         "snapshot": {
             "topic": out.get("topic", ""),
             "roundidx": out.get("roundidx", 0),
@@ -70,6 +74,7 @@ def logger_node(state: DebateState) -> DebateState:
             "turns_len": len(turns),
             "coherenceflags_len": len(coherenceflags),
             "rejectionhistory_len": len(rejectionhistory),
+            "parsestats": out.get("parsestats", {}),
         },
         # Keep logs readable: store only tails
         "turns_tail": _safe_tail(turns, 2),
@@ -77,16 +82,28 @@ def logger_node(state: DebateState) -> DebateState:
         "rejectionhistory_tail": _safe_tail(rejectionhistory, 3),
     }
 
+    if level == VERBOSITY_DEBUG:
+        record["debug"] = {
+            "cwd": os.getcwd(),
+            "has_last_node_io": node_io is not None,
+            "has_last_node_name": node_io_name is not None,
+        }
     if isinstance(node_io, dict):
-        record["node_io"] = node_io
+        record["node_io"] = minimal_node_io(node_io) if level == VERBOSITY_MINIMAL else node_io
     if isinstance(node_io_name, str) and node_io_name.strip():
         record["node_io_name"] = node_io_name
 
+    log_format = out.get("logformat") or FORMAT_JSONL
     try:
-        with open(abs_path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
-            f.flush()
-            os.fsync(f.fileno())
+        if log_format == FORMAT_JSONL:
+            append_jsonl(abs_path, json.dumps(record, ensure_ascii=False), int(out.get("logmaxbytes") or 0))
+        else:
+            writer = writer_for(abs_path, log_format, int(out.get("logkeyframe", DEFAULT_KEYFRAME_EVERY)))
+            writer.append(record)
+            if out.get("status") == "ERROR" or node_name == "JUDGE":
+                close_writer(abs_path)  # last record of the debate: finish the frame
+        if out.get("status") == "ERROR" or node_name == "JUDGE":
+            close_diagnostics(abs_path)  # remaining rejection details go to <log>.diag.jsonl
     except Exception as e:
         out["status"] = "ERROR"
         out["error"] = f"LoggerNode exception: {type(e).__name__}: {e}"
@@ -4,15 +4,40 @@ import json
 import re
 from typing import Any, Dict, List, Optional
 
+from nodes.diagnostics import diagnostics_for
+from nodes.retry_scheduler import record_outcome
+from nodes.stance import stance_vector, tracker_for
 from nodes.state import DebateState
+from nodes.telemetry import record_cascade
 from nodes.semantic import (
+    keyword_hits,
     normalize_for_repetition,
     near_duplicate_details,
     looks_like_fallback,
     normalize_text,
+    topic_profile,
+    topic_relevance,
 )
 
 
+# Validator thresholds. state["validation"] may override any of them, which is how
+# scripts/replay_validation.py tries new values against recorded drafts.
+DEFAULT_VALIDATION: Dict[str, Any] = {
+    "min_chars": 140,
+    "max_chars": 1100,
+    "ngram_n": 4,
+    "dup_any_threshold": 0.90,
+    "dup_last_threshold": 0.86,
+    "dup_lead_threshold": 0.92,
+    "contradiction_threshold": 0.35,  # log-only POSSIBLE_CONTRADICTION flag (see nodes.stance)
+    "fallback_markers": None,  # None -> nodes.semantic._FALLBACK_MARKERS
+}
+
+
+def validation_config(state: Dict[str, Any]) -> Dict[str, Any]:
+    return {**DEFAULT_VALIDATION, **(state.get("validation") or {})}
+
+
 def _clean(s: str) -> str:
     return (s or "").strip()
 
@@ -34,38 +59,17 @@ def _first_sentence(text: str) -> str:
     return (parts[0] or "").strip()
 
 
-def _topic_keywords(topic: str) -> List[str]:
-    t = normalize_text(topic)
-    stop = {
-        "the", "a", "an", "and", "or", "to", "of", "for", "in", "on", "with", "without",
-        "using", "use", "is", "are", "be", "should", "could", "would",
-    }
-    words = [w for w in t.split() if len(w) >= 5 and w not in stop]
-    seen = set()
-    out: List[str] = []
-    for w in words:
-        if w not in seen:
-            out.append(w)
-            seen.add(w)
-    return out[:8]
-
-
-def _topic_hit_count(topic: str, text: str) -> int:
-    kws = _topic_keywords(topic)
-    if not kws:
-        return 1
-    body = normalize_text(text)
-    return sum(1 for k in kws if k in body)
-
-
-def _possible_contradiction(prev: str, cur: str) -> bool:
-    p = normalize_text(prev)
-    c = normalize_text(cur)
-    neg = ("should not", "must not", "cannot", "never", "no one should")
-    pos = ("should", "must", "beneficial", "necessary", "good idea")
-    has_neg = any(n in c for n in neg) or any(n in p for n in neg)
-    has_pos = any(w in c for w in pos) or any(w in p for w in pos)
-    return bool(has_neg and has_pos)
+def _topic_hit_count(profile: Dict[str, Any], body: str) -> int:
+    # `body` is the normalized argument; the topic side comes precomputed from the profile.
+    return keyword_hits(profile, body)
+
+
+def _state_topic_profile(state: Dict[str, Any]) -> Dict[str, Any]:
+    topic = state.get("topic", "")
+    profile = state.get("topicprofile")
+    if isinstance(profile, dict) and profile.get("topic") == topic:
+        return profile
+    return topic_profile(topic)  # states built outside UserInputNode (replay, benchmarks)
 
 
 def _parse_pending(pendingtext: str) -> Dict[str, Any]:
@@ -129,6 +133,10 @@ def memory_node(state: DebateState) -> DebateState:
             "pendingspeaker": speaker,
             "pendingagentname": agent_name,
             "pendingtext_preview": pendingtext[:240],
+            # Full draft and retry position, so scripts/replay_validation.py can re-run this decision.
+            "pendingtext": pendingtext,
+            "retrycount": int(out.get("retrycount", 0)),
+            "maxretries": int(out.get("maxretries", 2)),
             "turns_len": len(turns),
         },
         "output": {},
@@ -142,6 +150,7 @@ def memory_node(state: DebateState) -> DebateState:
 
     max_retries = int(out.get("maxretries", 2))
     retrycount = int(out.get("retrycount", 0))
+    cfg = validation_config(out)
 
     parsed = _parse_pending(pendingtext)
     argument = _clean(parsed.get("argument", ""))
@@ -150,32 +159,33 @@ def memory_node(state: DebateState) -> DebateState:
 
     # ---------- format checks ----------
     format_issues: List[str] = []
-    if len(argument) < 140:
+    if len(argument) < cfg["min_chars"]:
         format_issues.append("argument_too_short")
-    if len(argument) > 1100:
+    if len(argument) > cfg["max_chars"]:
         format_issues.append("argument_too_long")
     if "\n" in argument:
         format_issues.append("argument_contains_newlines")
 
     # ---------- topic drift ----------
-    hit_count = _topic_hit_count(topic, argument)
+    profile = _state_topic_profile(out)
+    argument_norm = normalize_text(argument)
+    hit_count = _topic_hit_count(profile, argument_norm)
     if hit_count < 1:
         format_issues.append("topic_keywords_missing")
         coherenceflags = list(out.get("coherenceflags", []))
-        coherenceflags.append(
-            {"round": round_no, "speaker": speaker, "type": "TOPIC_DRIFT_SUSPECTED", "details": {"hit_count": hit_count}}
-        )
+        details = {"hit_count": hit_count, "relevance": topic_relevance(profile, argument_norm)}
+        coherenceflags.append({"round": round_no, "speaker": speaker, "type": "TOPIC_DRIFT_SUSPECTED", "details": details})
         out["coherenceflags"] = coherenceflags
 
     # ---------- repetition (paragraph) ----------
     cand_norm = normalize_for_repetition(argument)
     prior_norm = [normalize_for_repetition(t.get("text", "")) for t in turns]
-    dup_any = near_duplicate_details(cand_norm, prior_norm, ngram_n=4, threshold=0.90) if prior_norm else None
+    dup_any = near_duplicate_details(cand_norm, prior_norm, ngram_n=cfg["ngram_n"], threshold=cfg["dup_any_threshold"]) if prior_norm else None
 
     dup_last = None
     if turns:
         last_norm = normalize_for_repetition(turns[-1].get("text", ""))
-        dup_last = near_duplicate_details(cand_norm, [last_norm], ngram_n=4, threshold=0.86)
+        dup_last = near_duplicate_details(cand_norm, [last_norm], ngram_n=cfg["ngram_n"], threshold=cfg["dup_last_threshold"])
 
     # ---------- repetition (lead sentence) ----------
     lead = _first_sentence(argument)
@@ -186,10 +196,14 @@ def memory_node(state: DebateState) -> DebateState:
     lead_norm = normalize_for_repetition(lead)
     prior_leads = [_first_sentence(t.get("text", "")) for t in turns]
     prior_leads_norm = [normalize_for_repetition(x) for x in prior_leads if x]
-    dup_lead = near_duplicate_details(lead_norm, prior_leads_norm, ngram_n=4, threshold=0.92) if prior_leads_norm else None
+    dup_lead = (
+        near_duplicate_details(lead_norm, prior_leads_norm, ngram_n=cfg["ngram_n"], threshold=cfg["dup_lead_threshold"])
+        if prior_leads_norm
+        else None
+    )
 
     # ---------- boilerplate / fallback detection ----------
-    is_fallback = looks_like_fallback(argument)
+    is_fallback = looks_like_fallback(argument, cfg["fallback_markers"])
     if is_fallback:
         format_issues.append("looks_like_fallback_template")
 
@@ -203,50 +217,55 @@ def memory_node(state: DebateState) -> DebateState:
     if dup_lead is not None:
         reject_reasons.append("duplicate_lead_sentence")
 
+    # Full rejection details are stored once; flags and rejectionhistory carry only the id.
+    detail_ref: Dict[str, Any] = {}
+    if reject_reasons:
+        detail = {
+            "reasons": reject_reasons,
+            "format_issues": format_issues,
+            "dup_any": dup_any,
+            "dup_last": dup_last,
+            "dup_lead": dup_lead,
+            "hit_count": hit_count,
+        }
+        ref = diagnostics_for(out).put(detail, round=round_no, speaker=speaker, agent=agent_name)
+        detail_ref = {"ref": ref, "reasons": reject_reasons}
+
     # ---------- coherence flags (log-only) ----------
     coherenceflags = list(out.get("coherenceflags", []))
     if dup_any or dup_last or dup_lead:
+        # Any duplicate is also a rejection reason, so the details are in the store.
+        coherenceflags.append({"round": round_no, "speaker": speaker, "type": "REPETITION_DETECTED", "details": detail_ref})
+
+    # Stance of this draft against every earlier turn of the same speaker, in one pass.
+    stance = tracker_for(out, turns)
+    stance_vec = stance_vector(argument)
+    conflicts = stance.conflicts(speaker, stance_vec, float(cfg["contradiction_threshold"]))
+    if conflicts:
         coherenceflags.append(
             {
                 "round": round_no,
                 "speaker": speaker,
-                "type": "REPETITION_DETECTED",
-                "details": {"dup_any": dup_any, "dup_last": dup_last, "dup_lead": dup_lead},
+                "type": "POSSIBLE_CONTRADICTION",
+                "details": {"with_round": conflicts[0]["round"], "conflicts": conflicts},
             }
         )
-
-    if turns:
-        prev_same_speaker = None
-        for t in reversed(turns):
-            if t.get("speaker") == speaker:
-                prev_same_speaker = t
-                break
-        if prev_same_speaker and _possible_contradiction(prev_same_speaker.get("text", ""), argument):
-            coherenceflags.append(
-                {
-                    "round": round_no,
-                    "speaker": speaker,
-                    "type": "POSSIBLE_CONTRADICTION",
-                    "details": {"with_round": prev_same_speaker.get("round")},
-                }
-            )
     out["coherenceflags"] = coherenceflags
 
+    # Feed the outcome of the agent's chosen temperature/hint back to the retry scheduler,
+    # and count it against the model cascade tier that wrote the draft.
+    attempt = out.get("pendingattempt") or {}
+    record_outcome(out, attempt, accepted=not reject_reasons, reasons=reject_reasons)
+    if attempt.get("model"):
+        record_cascade(out, "agent", int(attempt.get("tier", 0)), str(attempt["model"]), not reject_reasons, float(attempt.get("wall_s", 0.0)))
+    out["pendingattempt"] = {}
+
     # ---------- rejection / retry ----------
     if reject_reasons:
         rejectionhistory = list(out.get("rejectionhistory", []))
-        detail = {
-            "reasons": reject_reasons,
-            "format_issues": format_issues,
-            "dup_any": dup_any,
-            "dup_last": dup_last,
-            "dup_lead": dup_lead,
-            "hit_count": hit_count,
-        }
-
-        coherenceflags.append({"round": round_no, "speaker": speaker, "type": "TURN_REJECTED", "details": detail})
+        coherenceflags.append({"round": round_no, "speaker": speaker, "type": "TURN_REJECTED", "details": detail_ref})
         out["coherenceflags"] = coherenceflags
-        rejectionhistory.append({"round": round_no, "speaker": speaker, "agent": agent_name, "details": detail})
+        rejectionhistory.append({"round": round_no, "speaker": speaker, "agent": agent_name, "details": detail_ref})
         out["rejectionhistory"] = rejectionhistory
 
         # HARD BLOCKS: never accept these after retries.
@@ -278,17 +297,19 @@ def memory_node(state: DebateState) -> DebateState:
         if hard_block:
             forced = _forced_rewrite(topic, speaker)
             coherenceflags.append(
-                {"round": round_no, "speaker": speaker, "type": "RETRY_EXHAUSTED_FORCED_REWRITE", "details": detail}
+                {"round": round_no, "speaker": speaker, "type": "RETRY_EXHAUSTED_FORCED_REWRITE", "details": detail_ref}
             )
             out["coherenceflags"] = coherenceflags
             argument = forced
+            stance_vec = None  # the stored turn is the rewrite, not the scored draft
         else:
             coherenceflags.append(
-                {"round": round_no, "speaker": speaker, "type": "RETRY_EXHAUSTED_ACCEPTED", "details": detail}
+                {"round": round_no, "speaker": speaker, "type": "RETRY_EXHAUSTED_ACCEPTED", "details": detail_ref}
             )
             out["coherenceflags"] = coherenceflags
 
     # ACCEPT
+    out["stance"] = stance.with_turn(speaker, round_no, argument, stance_vec)
     turns.append(
         {
             "round": round_no,
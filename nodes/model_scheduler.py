@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterator, Optional
+
+
+@dataclass
+class _Ticket:
+    model: str
+    enqueued: float
+    granted: bool = False
+
+
+class ModelScheduler:
+    """
+    Admission control for LLM calls in batch runs, grouped by model.
+
+    Calls for the resident model are granted (up to max_inflight at once) while other
+    models queue. The scheduler switches model when the resident queue runs dry, or when
+    another model's oldest call has waited longer than max_wait_s (the fairness bound).
+    It then stops admitting resident calls, lets the in-flight ones finish and switches,
+    so the server never interleaves two models.
+    """
+
+    def __init__(self, max_inflight: int = 4, max_wait_s: float = 30.0):
+        self.max_inflight = max(1, int(max_inflight))
+        self.max_wait_s = float(max_wait_s)
+        # A freshly switched-to model keeps the server this long before fairness can preempt it.
+        self.min_residency_s = self.max_wait_s / 4
+        self.resident: Optional[str] = None
+        self._resident_since = 0.0
+        self._cond = threading.Condition()
+        self._waiting: Dict[str, Deque[_Ticket]] = {}
+        self._running = 0
+        self._draining = False
+
+        self.switches = 0
+        self.fairness_switches = 0
+        self.grants: Counter = Counter()
+        self.max_queue_wait_s = 0.0
+        self.total_queue_wait_s = 0.0
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        while self._running < self.max_inflight:
+            pending = {m: q for m, q in self._waiting.items() if q}
+            if not pending:
+                break
+
+            if self.resident not in pending or self._draining:
+                if self._running:
+                    break  # let the resident model finish before switching
+                choices = [m for m in pending if m != self.resident] if self._draining else list(pending)
+                target = min(choices or list(pending), key=lambda m: pending[m][0].enqueued)
+                if self.resident is not None and target != self.resident:
+                    self.switches += 1
+                    if self._draining:
+                        self.fairness_switches += 1
+                self.resident = target
+                self._resident_since = now
+                self._draining = False
+
+            others = [q[0].enqueued for m, q in pending.items() if m != self.resident]
+            if others and now - min(others) > self.max_wait_s and now - self._resident_since >= self.min_residency_s:
+                self._draining = True
+                continue
+
+            t = pending[self.resident].popleft()
+            t.granted = True
+            self._running += 1
+            self.grants[t.model] += 1
+        self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, model: str) -> Iterator[float]:
+        """Blocks until a call for `model` may run; yields the queue wait in seconds."""
+        t = _Ticket(model=model, enqueued=time.monotonic())
+        with self._cond:
+            self._waiting.setdefault(model, deque()).append(t)
+            self._dispatch()
+            while not t.granted:
+                # Periodic re-dispatch so the fairness timer fires without other events.
+                self._cond.wait(timeout=0.25)
+                if not t.granted:
+                    self._dispatch()
+            waited = time.monotonic() - t.enqueued
+            self.total_queue_wait_s += waited
+            self.max_queue_wait_s = max(self.max_queue_wait_s, waited)
+        try:
+            yield waited
+        finally:
+            with self._cond:
+                self._running -= 1
+                self._dispatch()
+
+    def counters(self) -> Dict[str, Any]:
+        with self._cond:
+            grants = sum(self.grants.values())
+            return {
+                "resident": self.resident,
+                "model_switches": self.switches,
+                "fairness_switches": self.fairness_switches,
+                "grants": dict(self.grants),
+                "max_queue_wait_s": round(self.max_queue_wait_s, 3),
+                "avg_queue_wait_s": round(self.total_queue_wait_s / grants, 3) if grants else 0.0,
+                "waiting": {m: len(q) for m, q in self._waiting.items() if q},
+            }
+
+
+_ACTIVE: Optional[ModelScheduler] = None
+
+
+def install(scheduler: Optional[ModelScheduler]) -> None:
+    """Batch runners install one scheduler for the process; interactive runs leave it unset."""
+    global _ACTIVE
+    _ACTIVE = scheduler
+
+
+def active_scheduler() -> Optional[ModelScheduler]:
+    return _ACTIVE
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Frames at or below this function are time spent waiting on the model.
+_LLM_WAIT_FRAME = "chat_invoke"
+
+
+def _snapshot() -> Any:
+    import tracemalloc
+
+    return tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+
+
+class _NodeProfile:
+    def __init__(self) -> None:
+        import cProfile
+
+        self.profile = cProfile.Profile()
+        self.calls = 0
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.llm_wait_s = 0.0
+        self.peak_bytes: List[int] = []
+        self.stacks: Counter = Counter()
+        self.alloc_sites: Counter = Counter()
+        self.alloc_samples = 0
+
+
+class DebateProfiler:
+    """
+    --profile mode: every node call runs under cProfile (deterministic, wall clock) and
+    tracemalloc, while a sampler thread records the node thread's stack for flame graphs.
+
+    Wall time per node is split into CPU time of the node thread, LLM wait (the node's
+    telemetry spans) and other waiting (file I/O, locks). Sampled stacks under chat_invoke
+    are rooted at "llm_wait", everything else at "cpu", so the two are separate towers
+    in the flame graph.
+
+    Peak allocation is measured on every call; allocation sites come from tracemalloc
+    snapshots, which cost tenths of a second each, so only every alloc_every-th call
+    of a node (starting with the first) is snapshotted.
+    """
+
+    def __init__(self, interval_s: float = 0.005, alloc_every: int = 10, nframes: int = 1):
+        import tracemalloc
+
+        self.interval_s = interval_s
+        self.alloc_every = max(1, int(alloc_every))
+        self.nodes: Dict[str, _NodeProfile] = {}
+        self.t0 = time.perf_counter()
+        self.own_s = 0.0  # snapshot time, excluded from graph overhead
+        self._active: Optional[Tuple[str, int]] = None  # (node, thread ident) being sampled
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(nframes)
+        self._sampler = threading.Thread(target=self._sample_loop, name="profile-sampler", daemon=True)
+        self._sampler.start()
+
+    def _sample_loop(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            with self._lock:
+                active = self._active
+            if active is None:
+                continue
+            name, ident = active
+            frame = sys._current_frames().get(ident)
+            if frame is None:
+                continue
+            stack: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.reverse()
+            root = "llm_wait" if any(s.startswith(_LLM_WAIT_FRAME + " ") for s in stack) else "cpu"
+            self.nodes[name].stacks[";".join([root] + stack)] += 1
+
+    @contextmanager
+    def node(self, name: str) -> Iterator[Dict[str, Any]]:
+        """Profiles one node call; the caller sets rec["llm_wait_s"] before the block exits."""
+        import tracemalloc
+
+        prof = self.nodes.get(name)
+        if prof is None:
+            prof = self.nodes[name] = _NodeProfile()
+        prof.calls += 1
+        sample_alloc = (prof.calls - 1) % self.alloc_every == 0
+        s0 = time.perf_counter()
+        before = _snapshot() if sample_alloc else None
+        self.own_s += time.perf_counter() - s0
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+
+        rec: Dict[str, Any] = {"llm_wait_s": 0.0}
+        with self._lock:
+            self._active = (name, threading.get_ident())
+        w0, c0 = time.perf_counter(), time.thread_time()
+        prof.profile.enable()
+        try:
+            yield rec
+        finally:
+            prof.profile.disable()
+            prof.cpu_s += time.thread_time() - c0
+            prof.wall_s += time.perf_counter() - w0
+            with self._lock:
+                self._active = None
+            _, peak = tracemalloc.get_traced_memory()
+            prof.peak_bytes.append(max(0, peak - base))
+            prof.llm_wait_s += float(rec.get("llm_wait_s", 0.0))
+            if before is not None:
+                s0 = time.perf_counter()
+                after = _snapshot()
+                for stat in after.compare_to(before, "lineno"):
+                    if stat.size_diff > 0:
+                        frame = stat.traceback[0]
+                        prof.alloc_sites[f"{frame.filename}:{frame.lineno}"] += stat.size_diff
+                prof.alloc_samples += 1
+                self.own_s += time.perf_counter() - s0
+
+    def summary(self) -> Dict[str, Any]:
+        total_s = time.perf_counter() - self.t0
+        nodes: Dict[str, Any] = {}
+        for name, p in sorted(self.nodes.items(), key=lambda kv: -kv[1].wall_s):
+            llm_wait = min(p.llm_wait_s, p.wall_s)
+            nodes[name] = {
+                "calls": p.calls,
+                "wall_s": round(p.wall_s, 4),
+                "cpu_s": round(p.cpu_s, 4),
+                "llm_wait_s": round(llm_wait, 4),
+                "other_wait_s": round(max(0.0, p.wall_s - p.cpu_s - llm_wait), 4),
+                "peak_alloc_bytes_max": max(p.peak_bytes, default=0),
+                "peak_alloc_bytes_mean": int(sum(p.peak_bytes) / len(p.peak_bytes)) if p.peak_bytes else 0,
+                "stack_samples": sum(p.stacks.values()),
+            }
+        node_s = sum(p.wall_s for p in self.nodes.values())
+        return {
+            "total_s": round(total_s, 4),
+            "nodes_s": round(node_s, 4),
+            # Time between nodes: LangGraph scheduling, state merging and the CLI loop.
+            "graph_overhead_s": round(max(0.0, total_s - node_s - self.own_s), 4),
+            "profiler_s": round(self.own_s, 4),
+            "sample_interval_s": self.interval_s,
+            "nodes": nodes,
+        }
+
+    def write(self, out_dir: str, top: int = 15) -> Dict[str, Any]:
+        """
+        Writes, per node: <Node>.collapsed (flamegraph.pl / speedscope input),
+        <Node>.pstats (cProfile dump) and <Node>.alloc.txt (peak and top allocation sites);
+        plus summary.json for the whole run. Returns the summary.
+        """
+        import pstats
+
+        self._stop.set()
+        self._sampler.join(timeout=1.0)
+        os.makedirs(out_dir, exist_ok=True)
+        summary = self.summary()
+        for name, p in self.nodes.items():
+            with open(os.path.join(out_dir, f"{name}.collapsed"), "w", encoding="utf-8") as f:
+                for stack, n in sorted(p.stacks.items()):
+                    f.write(f"{stack} {n}\n")
+            p.profile.dump_stats(os.path.join(out_dir, f"{name}.pstats"))
+            s = summary["nodes"][name]
+            with open(os.path.join(out_dir, f"{name}.alloc.txt"), "w", encoding="utf-8") as f:
+                f.write(f"{name}: {p.calls} calls, peak {s['peak_alloc_bytes_max']} B (mean {s['peak_alloc_bytes_mean']} B)\n")
+                f.write(f"Net allocations by site over {p.alloc_samples} sampled calls:\n")
+                for site, size in p.alloc_sites.most_common(top):
+                    f.write(f"{size:>12} B  {site}\n")
+                f.write("\ncProfile, top functions by cumulative time:\n")
+                pstats.Stats(p.profile, stream=f).sort_stats("cumulative").print_stats(top)
+        with open(os.path.join(out_dir, "summary.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        return summary
+
+
+def profile_table(summary: Dict[str, Any]) -> str:
+    header = f"{'node':<14}{'calls':>6}{'wall s':>9}{'cpu s':>9}{'llm s':>9}{'other s':>9}{'peak KiB':>10}"
+    rows = [header, "-" * len(header)]
+    for name, n in summary["nodes"].items():
+        rows.append(
+            f"{name:<14}{n['calls']:>6}{n['wall_s']:>9.3f}{n['cpu_s']:>9.3f}{n['llm_wait_s']:>9.3f}"
+            f"{n['other_wait_s']:>9.3f}{n['peak_alloc_bytes_max'] / 1024:>10.1f}"
+        )
+    rows.append(
+        f"graph overhead {summary['graph_overhead_s']:.3f}s of {summary['total_s']:.3f}s total "
+        f"(profiler snapshots {summary['profiler_s']:.3f}s excluded)"
+    )
+    return "\n".join(rows)
+
+
+_ACTIVE: Optional[DebateProfiler] = None
+
+
+def install(profiler: Optional[DebateProfiler]) -> None:
+    """run_debate.py --profile installs one profiler; nodes.telemetry.timed_node picks it up."""
+    global _ACTIVE
+    _ACTIVE = profiler
+
+
+def active_profiler() -> Optional[DebateProfiler]:
+    return _ACTIVE
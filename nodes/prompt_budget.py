@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+
+# Word runs and single punctuation marks; each is at least one BPE token.
+_PIECE_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+# Chat templates wrap every message in role/header tokens.
+MESSAGE_OVERHEAD_TOKENS = 8
+
+# Headroom kept free between prompt + completion and num_ctx.
+CONTEXT_RESERVE_TOKENS = 64
+
+
+def _piece_tokens(piece: str) -> int:
+    # Llama-family tokenizers keep short words whole and split long ones
+    # every few characters; this errs on the high side on purpose.
+    return max(1, (len(piece) + 5) // 6)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap local token estimate (no tokenizer download, no model call).
+    Slightly overestimates for English prose so budgets stay safe.
+    """
+    return sum(_piece_tokens(m.group(0)) for m in _PIECE_RE.finditer(text or ""))
+
+
+def trim_to_tokens(text: str, max_tokens: int, keep: Literal["head", "tail"] = "head") -> str:
+    text = text or ""
+    if max_tokens <= 0:
+        return ""
+    pieces = list(_PIECE_RE.finditer(text))
+    total = sum(_piece_tokens(m.group(0)) for m in pieces)
+    if total <= max_tokens:
+        return text
+
+    used = 0
+    if keep == "head":
+        end = 0
+        for m in pieces:
+            cost = _piece_tokens(m.group(0))
+            if used + cost > max_tokens:
+                break
+            used += cost
+            end = m.end()
+        return text[:end].rstrip()
+
+    start = len(text)
+    for m in reversed(pieces):
+        cost = _piece_tokens(m.group(0))
+        if used + cost > max_tokens:
+            break
+        used += cost
+        start = m.start()
+    return text[start:].lstrip()
+
+
+@dataclass
+class PromptSection:
+    name: str
+    text: str
+    priority: int = 50                  # lower priority is trimmed first
+    max_tokens: Optional[int] = None    # per-section cap, applied before the total budget
+    min_tokens: int = 0                 # trimmed below this -> dropped entirely
+    keep: Literal["head", "tail"] = "head"
+
+
+def prompt_budget(num_ctx: int, max_new_tokens: int, reserve: int = CONTEXT_RESERVE_TOKENS) -> int:
+    return max(0, int(num_ctx) - int(max_new_tokens) - int(reserve))
+
+
+def assemble_prompt(sections: List[PromptSection], budget: int, sep: str = "\n") -> Tuple[str, Dict[str, Any]]:
+    """
+    Joins sections in the given order, keeping the estimated total within `budget`.
+    - Each section is first cut to its own max_tokens.
+    - If the total is still over budget, sections are trimmed lowest-priority first.
+    Returns (text, report) where report is small enough for last_node_io.
+    """
+    texts: List[str] = []
+    counts: List[int] = []
+    trimmed: List[str] = []
+    dropped: List[str] = []
+
+    for s in sections:
+        t = (s.text or "").strip()
+        n = estimate_tokens(t)
+        if s.max_tokens is not None and n > s.max_tokens:
+            t = trim_to_tokens(t, s.max_tokens, keep=s.keep)
+            n = estimate_tokens(t)
+            trimmed.append(s.name)
+        texts.append(t)
+        counts.append(n)
+
+    overflow = sum(counts) - budget
+    if overflow > 0:
+        order = sorted(range(len(sections)), key=lambda i: sections[i].priority)
+        for i in order:
+            if overflow <= 0:
+                break
+            if counts[i] == 0:
+                continue
+            s = sections[i]
+            target = max(0, counts[i] - overflow)
+            if target < s.min_tokens:
+                target = 0
+            t = trim_to_tokens(texts[i], target, keep=s.keep) if target else ""
+            n = estimate_tokens(t)
+            overflow -= counts[i] - n
+            texts[i] = t
+            counts[i] = n
+            (dropped if not t else trimmed).append(s.name)
+
+    text = sep.join(t for t in texts if t)
+    report = {
+        "tokens": sum(counts),
+        "budget": budget,
+        "sections": {s.name: counts[i] for i, s in enumerate(sections) if counts[i]},
+        "trimmed": sorted(set(trimmed) - set(dropped)),
+        "dropped": dropped,
+    }
+    return text, report
+
+
+def messages_tokens(*contents: str) -> int:
+    return sum(estimate_tokens(c) + MESSAGE_OVERHEAD_TOKENS for c in contents)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from nodes.log_codec import iter_records
+from nodes.log_index import map_logs, memory_decision, record_keys
+from nodes.memory_node import memory_node
+
+
+def _replayed_decision(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    out = (after.get("last_node_io") or {}).get("output") or {}
+    new_flags = (after.get("coherenceflags") or [])[len(before.get("coherenceflags") or []):]
+    new_rej = (after.get("rejectionhistory") or [])[len(before.get("rejectionhistory") or []):]
+    types = {f.get("type") for f in new_flags}
+    if "RETRY_EXHAUSTED_FORCED_REWRITE" in types:
+        action = "forced_rewrite"
+    elif "RETRY_EXHAUSTED_ACCEPTED" in types:
+        action = "exhausted_accept"
+    else:
+        action = str(out.get("action") or out.get("status") or "")
+    reasons = sorted({r for e in new_rej for r in ((e.get("details") or {}).get("reasons") or [])})
+    return {"action": action, "reasons": reasons}
+
+
+def replay_log(path: str, validation: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Re-runs every recorded memory_node decision of one log through the current memory_node,
+    with `validation` overrides. Each decision is evaluated against the debate as it was
+    recorded (the accepted turns before it), not a re-simulated debate, so one changed
+    decision does not cascade into the ones after it.
+    """
+    result: Dict[str, Any] = {"path": path, "decisions": 0, "replayed": 0, "no_draft": 0, "changed": []}
+    turns: Dict[int, Dict[str, Any]] = {}
+    prev: Optional[Dict[str, Any]] = None
+    for rec in iter_records(path):
+        if rec.get("node") == "USER_INPUT":
+            turns, prev = {}, None
+        keys = record_keys(rec, prev)
+        prev = rec
+        decision = memory_decision(rec, keys)
+        if decision is not None:
+            result["decisions"] += 1
+            io_in = (rec.get("node_io") or {}).get("input") or {}
+            draft = io_in.get("pendingtext")
+            if not draft:
+                # Logged before drafts were recorded in full; the preview is not enough to re-validate.
+                result["no_draft"] += 1
+            else:
+                round_no = int(keys["round"][0]) if keys["round"] else 0
+                state: Dict[str, Any] = {
+                    "topic": (rec.get("snapshot") or {}).get("topic", ""),
+                    "turns": [turns[r] for r in sorted(turns) if r < round_no],
+                    "pendingspeaker": io_in.get("pendingspeaker"),
+                    "pendingagentname": io_in.get("pendingagentname"),
+                    "pendingtext": draft,
+                    "retrycount": int(io_in.get("retrycount", 0)),
+                    "maxretries": int(io_in.get("maxretries", 2)),
+                    "status": "OK",
+                    "coherenceflags": [],
+                    "rejectionhistory": [],
+                    "pendingattempt": {},  # keeps the retry scheduler statistics untouched
+                    "validation": validation or {},
+                }
+                after = _replayed_decision(state, memory_node(state))
+                result["replayed"] += 1
+                action, reasons = decision
+                if after["action"] != action or after["reasons"] != sorted(reasons):
+                    result["changed"].append(
+                        {
+                            "round": round_no,
+                            "speaker": io_in.get("pendingspeaker"),
+                            "retrycount": state["retrycount"],
+                            "before": {"action": action, "reasons": sorted(reasons)},
+                            "after": after,
+                            "draft_preview": draft[:160],
+                        }
+                    )
+        # Accepted turns come back in full in turns_tail; keep them by round.
+        for t in rec.get("turns_tail") or []:
+            if isinstance(t, dict) and t.get("round") is not None:
+                turns[int(t["round"])] = t
+    return result
+
+
+class _Replay:
+    # Picklable callable for worker processes.
+    def __init__(self, validation: Optional[Dict[str, Any]]):
+        self.validation = validation
+
+    def __call__(self, path: str) -> Dict[str, Any]:
+        return replay_log(path, self.validation)
+
+
+def replay_logs(paths: Iterable[str], validation: Optional[Dict[str, Any]] = None, workers: Optional[int] = None) -> Dict[str, Any]:
+    """Replays many logs in parallel; returns totals, transition counts and per-log changes."""
+    totals: Dict[str, Any] = {"logs": 0, "decisions": 0, "replayed": 0, "no_draft": 0, "changed": 0, "transitions": {}, "errors": [], "by_log": []}
+    for path, res, err in map_logs(_Replay(validation), paths, workers):
+        totals["logs"] += 1
+        if err is not None:
+            totals["errors"].append(f"{path}: {type(err).__name__}: {err}"[:300])
+            continue
+        for k in ("decisions", "replayed", "no_draft"):
+            totals[k] += res[k]
+        totals["changed"] += len(res["changed"])
+        for c in res["changed"]:
+            key = f"{c['before']['action']} -> {c['after']['action']}"
+            totals["transitions"][key] = totals["transitions"].get(key, 0) + 1
+        if res["changed"]:
+            totals["by_log"].append({"path": path, "changed": res["changed"]})
+    totals["by_log"].sort(key=lambda r: r["path"])
+    return totals
+
+
+def format_changes(totals: Dict[str, Any], limit: int = 20) -> str:
+    lines: List[str] = [
+        f"{totals['logs']} logs, {totals['decisions']} decisions, {totals['replayed']} replayed "
+        f"({totals['no_draft']} without a full draft), {totals['changed']} changed",
+    ]
+    for key, n in sorted(totals["transitions"].items(), key=lambda kv: -kv[1]):
+        lines.append(f"  {n:>6}  {key}")
+    shown = 0
+    for entry in totals["by_log"]:
+        for c in entry["changed"]:
+            if shown >= limit:
+                return "\n".join(lines)
+            added = sorted(set(c["after"]["reasons"]) - set(c["before"]["reasons"]))
+            removed = sorted(set(c["before"]["reasons"]) - set(c["after"]["reasons"]))
+            lines.append(
+                f"{entry['path']} R{c['round']} {c['speaker']} try {c['retrycount']}: "
+                f"{c['before']['action']} -> {c['after']['action']}"
+                + (f" +{','.join(added)}" if added else "")
+                + (f" -{','.join(removed)}" if removed else "")
+            )
+            shown += 1
+    return "\n".join(lines)
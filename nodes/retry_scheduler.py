@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import json
+import os
+import random
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Candidate temperatures the adaptive scheduler may pick from.
+TEMPERATURE_GRID = (0.2, 0.35, 0.5, 0.65, 0.8, 0.9)
+
+# An arm needs this many observations before it can beat the fixed ladder.
+MIN_SAMPLES = 5
+EXPLORE_RATE = 0.1
+FLUSH_EVERY = 32
+
+# One short, targeted instruction per rejection reason.
+HINTS: Dict[str, str] = {
+    "non_json": "Output one JSON object with a single key, argument, and nothing else.",
+    "truncated_output": "Keep the whole argument under 90 words so the JSON object is closed.",
+    "argument_too_short": "Write three full sentences of at least 15 words each.",
+    "argument_too_long": "Keep the whole argument under 120 words.",
+    "argument_needs_multiple_sentences": "Write three separate sentences, each ending with a period.",
+    "argument_contains_newlines": "Keep the argument on a single line.",
+    "topic_keywords_missing": "Name the topic's key terms explicitly in the first sentence.",
+    "duplicate_argument": "Use an example, mechanism or stakeholder that no earlier round mentioned.",
+    "duplicate_last_turn": "Do not paraphrase the previous turn; attack one specific claim in it instead.",
+    "duplicate_lead_sentence": "Open with a concrete claim that differs from every earlier opening sentence.",
+    "boilerplate_lead_while": "Start with a direct claim, never with 'While'.",
+    "looks_like_fallback_template": "Avoid stock phrases such as 'stop conditions', 'legitimacy depends on' or 'the debate on'.",
+}
+
+FIRST_CONTEXT = "first"
+
+# state["retryscheduler"] when unset: the reproducible ladder; "adaptive" is opt-in.
+DEFAULT_SCHEDULER = "fixed"
+
+
+def _project_root() -> str:
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def default_stats_path() -> str:
+    return os.path.join(_project_root(), ".cache", "retry_stats.json")
+
+
+def fixed_ladder(base_temp: float, max_retries: int) -> List[float]:
+    return [base_temp] + [min(0.9, base_temp + 0.15 * i) for i in range(1, max_retries + 1)]
+
+
+def scheduler_mode(state: Dict[str, Any]) -> str:
+    return state.get("retryscheduler") or DEFAULT_SCHEDULER
+
+
+def primary_reason(reasons: str) -> str:
+    first = (reasons or "").split(",")[0].strip()
+    return first or FIRST_CONTEXT
+
+
+def arm_key(temperature: float, hint: bool) -> str:
+    return f"t={temperature:.2f}|h={int(hint)}"
+
+
+@dataclass
+class AttemptPlan:
+    context: str
+    temperature: float
+    hint: str
+    arm: str
+    explored: bool
+
+
+class RetryStats:
+    """
+    Per (context, arm) counts: attempts, accepts and the rejection reasons that followed.
+    context = "first" for a turn's first draft, else the primary reason the previous draft was rejected for.
+    arm = temperature + whether the reason-specific hint was added to the prompt.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, Dict[str, Any]]] = self._read()
+        self._pending: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._pending_n = 0
+
+    def _read(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data.get("arms", {}) if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _add(into: Dict[str, Dict[str, Dict[str, Any]]], context: str, arm: str, src: Dict[str, Any]) -> None:
+        cell = into.setdefault(context, {}).setdefault(arm, {"n": 0, "ok": 0, "reasons": {}})
+        cell["n"] += int(src.get("n", 0))
+        cell["ok"] += int(src.get("ok", 0))
+        for r, c in (src.get("reasons") or {}).items():
+            cell["reasons"][r] = cell["reasons"].get(r, 0) + int(c)
+
+    def record(self, context: str, arm: str, accepted: bool, reasons: Optional[List[str]] = None) -> None:
+        delta = {"n": 1, "ok": int(accepted), "reasons": {r: 1 for r in (reasons or [])}}
+        with self._lock:
+            self._add(self._totals, context, arm, delta)
+            self._add(self._pending, context, arm, delta)
+            self._pending_n += 1
+            due = self._pending_n >= FLUSH_EVERY
+        if due:
+            self.flush()
+
+    def arms(self, context: str) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {k: dict(v) for k, v in self._totals.get(context, {}).items()}
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        with self._lock:
+            return json.loads(json.dumps(self._totals))
+
+    def flush(self) -> None:
+        """
+        Merge pending counts into whatever is on disk (other processes may have written)
+        and replace the file atomically.
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending, self._pending_n = self._pending, {}, 0
+            merged = self._read()
+            for context, arms in pending.items():
+                for arm, cell in arms.items():
+                    self._add(merged, context, arm, cell)
+            self._totals = merged
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                tmp = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"version": 1, "arms": merged}, f, ensure_ascii=False, indent=1, sort_keys=True)
+                os.replace(tmp, self.path)
+            except OSError:
+                pass
+
+
+_STATS: Dict[str, RetryStats] = {}
+_STATS_LOCK = threading.Lock()
+
+
+def stats_for(state: Dict[str, Any]) -> RetryStats:
+    path = os.path.abspath(state.get("retrystatspath") or default_stats_path())
+    with _STATS_LOCK:
+        st = _STATS.get(path)
+        if st is None:
+            st = RetryStats(path)
+            _STATS[path] = st
+        return st
+
+
+def flush_all() -> None:
+    with _STATS_LOCK:
+        stats = list(_STATS.values())
+    for st in stats:
+        st.flush()
+
+
+def _accept_rate(cell: Dict[str, Any]) -> float:
+    # Laplace-smoothed; expected LLM calls per accepted turn from this arm is 1 / rate.
+    return (int(cell.get("ok", 0)) + 1) / (int(cell.get("n", 0)) + 2)
+
+
+def plan_attempt(
+    state: Dict[str, Any],
+    context: str,
+    ladder_temp: float,
+    rng: random.Random,
+) -> AttemptPlan:
+    """
+    fixed mode (default): the old base + 0.15*i ladder, no hints.
+    adaptive mode, first drafts, seeded runs or too little data: the same ladder plus the
+    reason-specific hint.
+    adaptive mode otherwise: the arm with the best smoothed accept rate for this context,
+    with occasional exploration of untried arms so the statistics keep improving.
+    """
+    if scheduler_mode(state) != "adaptive":
+        return AttemptPlan(context, ladder_temp, "", arm_key(ladder_temp, False), False)
+
+    hint_text = HINTS.get(context, "") if context != FIRST_CONTEXT else ""
+    default = AttemptPlan(context, ladder_temp, hint_text, arm_key(ladder_temp, bool(hint_text)), False)
+    # The learned arms live in a shared file that changes from run to run: keep them away
+    # from ordinary first drafts, and from seeded runs so --seed still reproduces a debate.
+    if context == FIRST_CONTEXT or state.get("seed") is not None:
+        return default
+
+    candidates: List[Tuple[float, bool]] = [(t, h) for t in TEMPERATURE_GRID for h in ((False, True) if hint_text else (False,))]
+    arms = stats_for(state).arms(context)
+
+    if rng.random() < EXPLORE_RATE:
+        t, h = rng.choice(candidates)
+        return AttemptPlan(context, t, hint_text if h else "", arm_key(t, h), True)
+
+    best = default
+    best_rate = _accept_rate(arms.get(default.arm, {})) if int(arms.get(default.arm, {}).get("n", 0)) >= MIN_SAMPLES else -1.0
+    for t, h in candidates:
+        cell = arms.get(arm_key(t, h))
+        if not cell or int(cell.get("n", 0)) < MIN_SAMPLES:
+            continue
+        rate = _accept_rate(cell)
+        if rate > best_rate:
+            best_rate = rate
+            best = AttemptPlan(context, t, hint_text if h else "", arm_key(t, h), False)
+    return best
+
+
+def record_outcome(state: Dict[str, Any], plan: Dict[str, Any], accepted: bool, reasons: Optional[List[str]] = None) -> None:
+    if not plan or not plan.get("arm"):
+        return
+    stats_for(state).record(str(plan.get("context") or FIRST_CONTEXT), str(plan["arm"]), accepted, reasons)
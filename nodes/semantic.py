@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-from typing import List, Optional, Dict
+from typing import Any, List, Optional, Dict, Sequence
+from functools import lru_cache
+import math
 import re
 import string
+import zlib
 
 
 _TRANSLATOR = str.maketrans("", "", string.punctuation)
@@ -110,6 +113,82 @@ _FALLBACK_MARKERS = (
 )
 
 
-def looks_like_fallback(text: str) -> bool:
+def looks_like_fallback(text: str, markers: Optional[Sequence[str]] = None) -> bool:
     t = normalize_text(text)
-    return any(m in t for m in _FALLBACK_MARKERS)
+    return any(m in t for m in (_FALLBACK_MARKERS if markers is None else markers))
+
+
+_TOPIC_STOPWORDS = frozenset(
+    {
+        "the", "a", "an", "and", "or", "to", "of", "for", "in", "on", "with", "without",
+        "using", "use", "is", "are", "be", "should", "could", "would",
+    }
+)
+
+# Buckets of the hashed bag-of-words vectors used for topic relevance.
+TOPIC_VECTOR_DIM = 1024
+
+
+def _bucket(word: str, dim: int) -> int:
+    # crc32, not hash(): buckets must agree across processes (state and logs are shared).
+    return zlib.crc32(word.encode("utf-8")) % dim
+
+
+def hashed_vector(normalized: str, dim: int = TOPIC_VECTOR_DIM) -> Dict[int, float]:
+    """Sparse L2-normalized term-frequency vector (sublinear tf) of already-normalized text."""
+    counts: Dict[int, int] = {}
+    for w in normalized.split():
+        if w not in _TOPIC_STOPWORDS:
+            b = _bucket(w, dim)
+            counts[b] = counts.get(b, 0) + 1
+    vec = {b: 1.0 + math.log(c) for b, c in counts.items()}
+    norm = math.sqrt(sum(v * v for v in vec.values()))
+    return {b: v / norm for b, v in vec.items()} if norm else {}
+
+
+@lru_cache(maxsize=256)
+def _build_topic_profile(topic: str) -> Dict[str, Any]:
+    t = normalize_text(topic)
+    keywords: List[str] = []
+    for w in t.split():
+        if len(w) >= 5 and w not in _TOPIC_STOPWORDS and w not in keywords:
+            keywords.append(w)
+    vec = hashed_vector(t)
+    return {
+        "topic": topic,
+        "normalized": t,
+        "keywords": keywords[:8],
+        # [[bucket, weight], ...]: JSON-safe, unlike a dict with int keys.
+        "vector": sorted([b, round(w, 6)] for b, w in vec.items()),
+        "dim": TOPIC_VECTOR_DIM,
+    }
+
+
+def topic_profile(topic: str) -> Dict[str, Any]:
+    """
+    Everything the validators need from the topic, computed once (UserInputNode stores it
+    as state["topicprofile"]): normalized form, up to 8 keywords, hashed vector.
+    Treat the result as read-only; it is shared between debates on the same topic.
+    """
+    return _build_topic_profile(topic)
+
+
+def keyword_hits(profile: Dict[str, Any], normalized: str) -> int:
+    """
+    Topic keywords occurring in already-normalized text (substring match, as before).
+    Plain `in` over the few keywords is a C-speed scan; a compiled alternation regex
+    measured 10-20x slower on typical arguments.
+    """
+    kws = profile.get("keywords") or ()
+    if not kws:
+        return 1
+    return sum(1 for k in kws if k in normalized)
+
+
+def topic_relevance(profile: Dict[str, Any], normalized: str) -> float:
+    """Cosine similarity between the topic vector and already-normalized text."""
+    tvec = profile.get("vector") or ()
+    if not tvec:
+        return 0.0
+    vec = hashed_vector(normalized, int(profile.get("dim") or TOPIC_VECTOR_DIM))
+    return round(sum(w * vec.get(int(b), 0.0) for b, w in tvec), 4)
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from nodes.semantic import normalize_text
+
+# Buckets of the hashed claim vectors (float32: 1 KiB per turn).
+STANCE_DIM = 256
+
+# Sentence polarity lexicon, matched on normalize_text() tokens (apostrophes removed).
+NEGATIONS = frozenset(
+    {
+        "not", "never", "cannot", "no", "nor", "neither", "against", "oppose", "opposes", "reject",
+        "rejects", "ban", "harmful", "dangerous", "unjustified", "unnecessary", "shouldnt", "mustnt",
+        "cant", "wont", "dont", "doesnt", "isnt", "arent",
+    }
+)
+MODALS = frozenset(
+    {
+        "should", "must", "beneficial", "necessary", "essential", "support", "supports", "favor",
+        "justified", "improve", "improves", "benefit", "benefits", "worthwhile",
+    }
+)
+_STOPWORDS = frozenset(
+    {
+        "this", "that", "these", "those", "with", "without", "from", "into", "than", "then", "they",
+        "their", "there", "which", "while", "would", "could", "will", "also", "more", "most", "such",
+        "because", "about", "when", "where", "what", "only", "even", "have", "been", "being", "were",
+    }
+)
+_SENTENCE_RE = re.compile(r"(?<=[.!?;])\s+")
+
+
+def _bucket(word: str) -> int:
+    return zlib.crc32(word.encode("utf-8")) % STANCE_DIM
+
+
+def _polarity(tokens: Sequence[str]) -> int:
+    if any(t in NEGATIONS for t in tokens):
+        return -1
+    return 1 if any(t in MODALS for t in tokens) else 0
+
+
+def stance_vector(text: str) -> np.ndarray:
+    """
+    Signed claim vector of one argument: per sentence, the hashed bag of content words
+    times its polarity (-1 negated, +1 modal/approving, 0 neutral), summed and L2-normalized.
+    Two turns making the same claim with opposite polarity have a negative dot product.
+    """
+    vec = np.zeros(STANCE_DIM, dtype=np.float32)
+    for sentence in _SENTENCE_RE.split(text or ""):
+        tokens = normalize_text(sentence).split()
+        pol = _polarity(tokens)
+        if not pol:
+            continue
+        idx = [_bucket(t) for t in tokens if len(t) >= 4 and t not in NEGATIONS and t not in MODALS and t not in _STOPWORDS]
+        if not idx:
+            continue
+        bow = np.bincount(np.asarray(idx, dtype=np.intp), minlength=STANCE_DIM).astype(np.float32)
+        vec += pol * bow / np.linalg.norm(bow)
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm else vec
+
+
+class _History:
+    """
+    One speaker's stance rows and round numbers. Rows live in a buffer shared by successive
+    snapshots: appending to the newest snapshot writes in place (amortized O(1)); appending
+    to an older one (a replayed or forked state) copies its prefix first.
+    """
+
+    __slots__ = ("buf", "rounds", "n", "_fill")
+
+    def __init__(self, buf: np.ndarray, rounds: np.ndarray, n: int, fill: List[int]):
+        self.buf, self.rounds, self.n, self._fill = buf, rounds, n, fill
+
+    @classmethod
+    def empty(cls, cap: int = 8) -> "_History":
+        return cls(np.zeros((cap, STANCE_DIM), dtype=np.float32), np.zeros(cap, dtype=np.int32), 0, [0])
+
+    def rows(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.buf[: self.n], self.rounds[: self.n]
+
+    def append(self, round_no: int, vec: np.ndarray) -> "_History":
+        buf, rounds, fill = self.buf, self.rounds, self._fill
+        if self.n != fill[0] or self.n >= len(buf):
+            cap = max(8, 2 * self.n) if self.n >= len(buf) else len(buf)
+            buf = np.zeros((cap, STANCE_DIM), dtype=np.float32)
+            rounds = np.zeros(cap, dtype=np.int32)
+            buf[: self.n], rounds[: self.n] = self.buf[: self.n], self.rounds[: self.n]
+            fill = [self.n]
+        buf[self.n], rounds[self.n] = vec, round_no
+        fill[0] = self.n + 1
+        return _History(buf, rounds, self.n + 1, fill)
+
+
+class StanceTracker:
+    """
+    Per-speaker stance history of the accepted turns, kept in state["stance"]. Immutable from
+    the outside like the other state values: with_turn() returns a new tracker.
+    """
+
+    def __init__(self, histories: Optional[Dict[str, _History]] = None, turns: int = 0):
+        self._h: Dict[str, _History] = histories or {}
+        self.turns = turns
+
+    @classmethod
+    def from_turns(cls, turns: Sequence[Dict[str, Any]]) -> "StanceTracker":
+        tracker = cls()
+        for t in turns:
+            tracker = tracker.with_turn(str(t.get("speaker") or ""), int(t.get("round") or 0), t.get("text", ""))
+        return tracker
+
+    def with_turn(self, speaker: str, round_no: int, text: str, vec: Optional[np.ndarray] = None) -> "StanceTracker":
+        hist = self._h.get(speaker) or _History.empty()
+        v = stance_vector(text) if vec is None else vec
+        return StanceTracker({**self._h, speaker: hist.append(round_no, v)}, self.turns + 1)
+
+    def conflicts(self, speaker: str, vec: np.ndarray, threshold: float, top: int = 3) -> List[Dict[str, Any]]:
+        """
+        Prior rounds of `speaker` whose stance conflicts with `vec` (score = -cosine of the
+        signed claim vectors, one matrix-vector product over the whole history), strongest first.
+        """
+        hist = self._h.get(speaker)
+        if hist is None or not hist.n or not vec.any():
+            return []
+        rows, rounds = hist.rows()
+        scores = -(rows @ vec)
+        hits = np.flatnonzero(scores >= threshold)
+        if not hits.size:
+            return []
+        best = hits[np.argsort(-scores[hits], kind="stable")[:top]]
+        return [{"round": int(rounds[i]), "score": round(float(scores[i]), 4)} for i in best]
+
+    def __repr__(self) -> str:
+        return f"StanceTracker(turns={self.turns}, speakers={ {k: h.n for k, h in self._h.items()} })"
+
+
+def tracker_for(state: Dict[str, Any], turns: Sequence[Dict[str, Any]]) -> StanceTracker:
+    """state["stance"] when it matches the accepted turns, else rebuilt from them (replays, old states)."""
+    tracker = state.get("stance")
+    if isinstance(tracker, StanceTracker) and tracker.turns == len(turns):
+        return tracker
+    return StanceTracker.from_turns(turns)
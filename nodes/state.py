@@ -37,11 +37,27 @@ class DebateState(TypedDict, total=False):
     llmmodel: str
     llmtemperature: float
     llmmaxtokens: int
+    llmnumctx: int
+
+    # LLM call guard (see nodes.llm_guard.CallPolicy for defaults)
+    llmtimeout: float
+    llmhedge: bool
+    llmhedgemin: float
+    llmtransportretries: int
+    llmbreakerfailures: int
+    llmbreakerreset: float
+    llmbackends: List[str]          # "http://host:port[=max_concurrency]"; empty -> default endpoint
+    llmqueuetimeout: float          # max wait for a free backend slot, outside the call deadline
     judgemodel: str
 
+    # Model cascades, cheapest first: retries (agent) / invalid JSON (judge) escalate one tier.
+    llmcascade: List[str]
+    judgecascade: List[str]
+
     # ---- user input ----
     rawtopic: str
     topic: str
+    topicprofile: Dict[str, Any]     # nodes.semantic.topic_profile(topic): keywords, normalized form, hashed vector
 
     # ---- controller ----
     roundidx: int
@@ -52,6 +68,12 @@ class DebateState(TypedDict, total=False):
 
     lastnode: str
 
+    # ---- log file format (see nodes.log_codec) ----
+    logformat: Literal["jsonl", "delta-gzip", "delta-zstd"]
+    logkeyframe: int                 # delta formats: full record every N records
+    logverbosity: Literal["minimal", "normal", "debug"]   # see nodes.log_manager
+    logmaxbytes: int                 # JSONL: rotate (and gzip in the background) past this size; 0 = never
+
     # ---- logging helpers (captured by LoggerNode) ----
     last_node_io: Dict[str, Any]
     last_node_name: str
@@ -63,6 +85,7 @@ class DebateState(TypedDict, total=False):
 
     # ---- debate memory ----
     turns: List[Turn]
+    stance: Any                      # nodes.stance.StanceTracker of the accepted turns (in-process only)
     summary: str
 
     memoryfora: Dict[str, Any]
@@ -72,11 +95,66 @@ class DebateState(TypedDict, total=False):
     coherenceflags: List[Dict[str, Any]]
     formatviolations: List[Dict[str, Any]]
 
+    validation: Dict[str, Any]      # overrides for memory_node.DEFAULT_VALIDATION
     retrycount: int
     retryreason: str
     lastrejectedtext: str
-    rejectionhistory: List[Dict[str, Any]]
+    rejectionhistory: List[Dict[str, Any]]   # details are {"ref", "reasons"}; see nodes.diagnostics
+    diagcap: int                     # rejection details kept in memory before spilling to <log>.diag.jsonl
+
+    # ---- retry scheduling ----
+    retryscheduler: Literal["adaptive", "fixed"]   # default fixed (retry_scheduler.DEFAULT_SCHEDULER)
+    retrystatspath: str
+    pendingattempt: Dict[str, Any]   # temperature/hint plan and cascade tier of the draft in pendingtext
 
     usedquotes: List[str]
 
+    # ---- structured output ----
+    llmjsonschema: bool
+    parsestats: Dict[str, int]
+
+    # ---- telemetry (see nodes.telemetry) ----
+    llmspans: List[Dict[str, Any]]   # LLM attempts of the running node; moved into last_node_io
+    telemetry: Dict[str, Any]        # per-node / per-model aggregates for the whole run
+
     verdict: Optional[Verdict]
+
+
+def new_debate_state(topic: str, logpath: str, seed: Optional[int] = None, **overrides: Any) -> Dict[str, Any]:
+    """Initial graph input shared by the CLI and the batch runner; UserInputNode normalizes the rest."""
+    state: Dict[str, Any] = {
+        "rawtopic": topic,
+        "topic": topic,
+        "maxrounds": 8,
+        "maxretries": 2,
+        "logpath": logpath,
+        "seed": seed,
+        "gotojudge": True,
+
+        "status": "OK",
+        "error": "",
+        "turns": [],
+        "summary": "",
+        "verdict": None,
+
+        "roundidx": 0,
+        "nextspeaker": "A",
+
+        "pendingspeaker": "A",
+        "pendingagentname": "",
+        "pendingtext": "",
+        "pendingattempt": {},
+
+        "coherenceflags": [],
+        "formatviolations": [],
+        "rejectionhistory": [],
+        "retrycount": 0,
+        "retryreason": "",
+        "lastrejectedtext": "",
+        "usedquotes": [],
+        "lastnode": "",
+        "last_node_io": {},
+        "last_node_name": "",
+    }
+    state.update(overrides)
+    return state
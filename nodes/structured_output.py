@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import ast
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple, Union
+
+
+ARGUMENT_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {"argument": {"type": "string"}},
+    "required": ["argument"],
+}
+
+VERDICT_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "winner": {"type": "string", "enum": ["Scientist", "Philosopher"]},
+        "reason": {"type": "string"},
+    },
+    "required": ["summary", "winner", "reason"],
+}
+
+# Parse outcomes, counted per kind ("argument" / "verdict") in state["parsestats"].
+PATH_STRICT = "strict"
+PATH_REPAIRED = "repaired"
+PATH_TRUNCATED = "truncated"  # cut off at num_predict: parseable once closed, but incomplete
+PATH_FAILED = "failed"
+
+_FENCE_RE = re.compile(r"^```[a-zA-Z]*\s*|\s*```$")
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+
+
+@lru_cache(maxsize=1)
+def backend_supports_schema() -> bool:
+    """
+    langchain-ollama >= 0.2.1 forwards a JSON schema dict as Ollama's `format`;
+    older wrappers only accept "json".
+    """
+    try:
+        from langchain_ollama import ChatOllama
+
+        ann = ChatOllama.model_fields["format"].annotation
+    except Exception:
+        return False
+    return "dict" in str(ann)
+
+
+def json_format(state: Dict[str, Any], schema: Dict[str, Any]) -> Union[str, Dict[str, Any]]:
+    if state.get("llmjsonschema", True) and backend_supports_schema():
+        return schema
+    return "json"
+
+
+def _first_object(text: str) -> Tuple[str, bool]:
+    """
+    Returns (first {...} span, truncated?), honouring strings and escapes.
+    A truncated object (generation hit num_predict) is closed off and flagged.
+    """
+    start = text.find("{")
+    if start < 0:
+        return "", False
+    depth = 0
+    in_str = False
+    esc = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_str:
+            if esc:
+                esc = False
+            elif ch == "\\":
+                esc = True
+            elif ch == '"':
+                in_str = False
+            continue
+        if ch == '"':
+            in_str = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start : i + 1], False
+    tail = text[start:]
+    if esc:
+        tail = tail[:-1]
+    return tail + ('"' if in_str else "") + "}" * max(depth, 0), True
+
+
+def _unescape_values(data: Dict[str, Any]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for k, v in data.items():
+        if isinstance(v, str) and "\\" in v:
+            v = v.replace('\\"', '"').replace("\\n", " ").replace("\\t", " ")
+        if isinstance(v, str) and ("\n" in v or "\t" in v):
+            v = " ".join(v.split())
+        out[k] = v
+    return out
+
+
+def _loads_dict(text: str) -> Optional[Dict[str, Any]]:
+    try:
+        data = json.loads(text, strict=False)
+    except Exception:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def parse_json_object(raw: str) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    Strict json.loads first; otherwise a cheap repair pass:
+    - strip markdown fences and surrounding prose, take the first object
+    - close truncated strings/braces, drop trailing commas
+    - decode double-encoded JSON strings and python-style dicts
+    Returns (dict or None, path). Output cut off mid-object comes back as PATH_TRUNCATED with
+    whatever could be recovered: callers must not treat it as a complete reply.
+    """
+    raw = (raw or "").strip()
+    try:
+        data = json.loads(raw)
+        if isinstance(data, dict):
+            return data, PATH_STRICT
+    except Exception:
+        data = None
+
+    # Double-encoded: "{\"argument\": \"...\"}"
+    if isinstance(data, str):
+        inner = _loads_dict(data.strip())
+        if inner is not None:
+            return _unescape_values(inner), PATH_REPAIRED
+
+    text = _FENCE_RE.sub("", raw).strip()
+    obj, truncated = _first_object(text)
+    if not obj:
+        return None, PATH_FAILED
+    path = PATH_TRUNCATED if truncated else PATH_REPAIRED
+
+    for candidate in (obj, _TRAILING_COMMA_RE.sub(r"\1", obj)):
+        parsed = _loads_dict(candidate)
+        if parsed is not None:
+            return _unescape_values(parsed), path
+
+    try:
+        parsed = ast.literal_eval(obj)
+    except Exception:
+        parsed = None
+    if isinstance(parsed, dict):
+        return _unescape_values({str(k): v for k, v in parsed.items()}), path
+
+    return None, PATH_FAILED
+
+
+def count_parse(out: Dict[str, Any], kind: str, path: str) -> None:
+    stats = dict(out.get("parsestats") or {})
+    key = f"{kind}.{path}"
+    stats[key] = int(stats.get(key, 0)) + 1
+    out["parsestats"] = stats
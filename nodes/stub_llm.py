@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+
+# Offline stand-in for the Ollama chat models: used by scripts/stub_ollama_server.py,
+# the benchmarks and the soak test. Replies are shaped like real agent/judge output
+# so they go through the same parsing and MemoryNode validation.
+
+_CLAIMS = (
+    "Pilot programs on {topic} show outcomes that vary sharply across regions and income groups.",
+    "Independent audits of {topic} keep finding gaps between promised and delivered results.",
+    "Communities most affected by {topic} rarely get a say in who decides and who pays.",
+    "Historical analogies to {topic} suggest incentives drift once public oversight weakens.",
+    "Cost curves for {topic} only fall when supply chains mature and standards converge.",
+    "Public trust in {topic} depends on transparent reporting of failures, not only successes.",
+    "Local experiments with {topic} let citizens compare alternatives before national commitments.",
+    "Long horizons for {topic} turn the choice of discount rate into a moral judgement.",
+    "Insurance markets price the risks of {topic} more honestly than campaign promises do.",
+    "Workers displaced by {topic} need retraining budgets written into the original plan.",
+    "Open data requirements for {topic} make it harder to hide uneven distribution of benefits.",
+    "International coordination on {topic} prevents a race to the bottom on safety rules.",
+    "Small firms working on {topic} innovate faster when licensing costs stay predictable.",
+    "Courts have already shaped {topic} through liability rulings that legislators ignored.",
+    "Measured against realistic baselines, {topic} delivers smaller gains than its advocates claim.",
+    "Future generations inherit the infrastructure decisions made about {topic} today.",
+)
+
+_TOPIC_RE = re.compile(r"^Topic:\s*(.+)$", re.MULTILINE)
+_COUNTER = itertools.count()
+_COUNTER_LOCK = threading.Lock()
+
+
+def _content(m: Any) -> str:
+    if isinstance(m, dict):
+        return str(m.get("content", ""))
+    return str(getattr(m, "content", m))
+
+
+def _role(m: Any) -> str:
+    if isinstance(m, dict):
+        return str(m.get("role", ""))
+    return str(getattr(m, "type", ""))
+
+
+def stub_reply(messages: List[Any], seed: Optional[int] = None) -> str:
+    system = next((_content(m) for m in messages if _role(m) == "system"), "")
+    user = next((_content(m) for m in messages if _role(m) in ("user", "human")), "")
+
+    if "debate judge" in system.lower():
+        winner = "Philosopher" if len(user) % 2 else "Scientist"
+        return json.dumps(
+            {"summary": "Both sides traded evidence and principles across all rounds.", "winner": winner, "reason": "More specific rebuttals."}
+        )
+
+    m = _TOPIC_RE.search(system) or _TOPIC_RE.search(user)
+    topic = (m.group(1).strip() if m else "the proposal").rstrip(".")
+    with _COUNTER_LOCK:
+        n = next(_COUNTER)
+    rng = random.Random(f"{seed}-{n}" if seed is not None else None)
+    sents = [s.format(topic=topic) for s in rng.sample(_CLAIMS, 3)]
+    return json.dumps({"argument": " ".join(sents)}, ensure_ascii=False)
+
+
+def ollama_metadata(model: str, prompt: str, reply: str, elapsed_s: float) -> Dict[str, Any]:
+    # Same keys Ollama puts in the final chunk; durations are in nanoseconds.
+    prompt_tokens = max(1, len(prompt) // 4)
+    eval_tokens = max(1, len(reply) // 4)
+    total_ns = int(elapsed_s * 1e9)
+    return {
+        "model": model,
+        "done": True,
+        "done_reason": "stop",
+        "total_duration": total_ns,
+        "load_duration": 0,
+        "prompt_eval_count": prompt_tokens,
+        "prompt_eval_duration": total_ns // 5,
+        "eval_count": eval_tokens,
+        "eval_duration": total_ns - total_ns // 5,
+    }
+
+
+class StubChatModel:
+    """Drop-in for ChatOllama(...).invoke / .stream with zero (or fixed) latency."""
+
+    def __init__(self, model: str = "stub", latency_s: float = 0.0, seed: Optional[int] = None, **_: Any):
+        self.model = model
+        self.latency_s = latency_s
+        self.seed = seed
+
+    def invoke(self, messages: List[Any], **_: Any) -> Any:
+        from langchain_core.messages import AIMessage
+
+        t0 = time.perf_counter()
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        reply = stub_reply(messages, self.seed)
+        prompt = "".join(_content(m) for m in messages)
+        meta = ollama_metadata(self.model, prompt, reply, time.perf_counter() - t0)
+        return AIMessage(content=reply, response_metadata=meta)
+
+    def stream(self, messages: List[Any], **_: Any) -> Iterator[Any]:
+        from langchain_core.messages import AIMessageChunk
+
+        msg = self.invoke(messages)
+        text = msg.content
+        for i in range(0, len(text), 8):
+            yield AIMessageChunk(content=text[i : i + 8])
+        yield AIMessageChunk(content="", response_metadata=msg.response_metadata)
+
+
+def install_stub(latency_s: float = 0.0) -> None:
+    """Routes every chat_invoke in this process to StubChatModel (benchmarks and soak test)."""
+    import nodes.llm_provider as llm_provider
+
+    llm_provider.build_chat_llm = lambda cfg: StubChatModel(cfg.model, latency_s=latency_s, seed=cfg.seed)
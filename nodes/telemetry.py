@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import functools
+import os
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List
+
+from nodes.profiling import active_profiler
+
+# Histogram upper bounds (seconds) shared by node and LLM durations.
+BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def llm_span(msg: Any, decisions: Dict[str, Any], model: str, wall_s: float, error: str = "") -> Dict[str, Any]:
+    """
+    One LLM attempt: wall time (queue included), queue time and Ollama's token counts/durations.
+    Ollama reports prompt_eval_count/eval_count and *_duration in ns in response_metadata;
+    other chat models fall back to usage_metadata with no durations.
+    """
+    meta = getattr(msg, "response_metadata", None) or {}
+    usage = getattr(msg, "usage_metadata", None) or {}
+    prompt_tokens = int(meta.get("prompt_eval_count") or usage.get("input_tokens") or 0)
+    completion_tokens = int(meta.get("eval_count") or usage.get("output_tokens") or 0)
+    eval_s = float(meta.get("eval_duration") or 0) / 1e9
+    span: Dict[str, Any] = {
+        "model": model,
+        "wall_s": round(wall_s, 4),
+        "queue_s": round(float(decisions.get("queue_s", 0.0) or 0.0), 4),
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "prompt_eval_s": round(float(meta.get("prompt_eval_duration") or 0) / 1e9, 4),
+        "eval_s": round(eval_s, 4),
+        "load_s": round(float(meta.get("load_duration") or 0) / 1e9, 4),
+        "tokens_per_s": round(completion_tokens / eval_s, 2) if eval_s > 0 else 0.0,
+    }
+    if decisions.get("backend_url"):
+        span["backend"] = decisions["backend_url"]
+    if error:
+        span["error"] = error
+    return span
+
+
+def record_llm_span(state: Dict[str, Any], span: Dict[str, Any]) -> None:
+    # Collected by timed_node into last_node_io["telemetry"] for the node that made the call.
+    spans = state.get("llmspans")
+    if isinstance(spans, list):
+        spans.append(span)
+
+
+def _hist() -> Dict[str, Any]:
+    return {"count": 0, "sum": 0.0, "max": 0.0, "buckets": [0] * len(BUCKETS)}
+
+
+def _observe(h: Dict[str, Any], v: float) -> None:
+    h["count"] += 1
+    h["sum"] = round(h["sum"] + v, 6)
+    h["max"] = max(h["max"], round(v, 6))
+    for i, le in enumerate(BUCKETS):
+        if v <= le:
+            h["buckets"][i] += 1
+
+
+def _merge_hist(a: Dict[str, Any], b: Dict[str, Any]) -> None:
+    a["count"] += b.get("count", 0)
+    a["sum"] = round(a["sum"] + b.get("sum", 0.0), 6)
+    a["max"] = max(a["max"], b.get("max", 0.0))
+    a["buckets"] = [x + y for x, y in zip(a["buckets"], b.get("buckets") or [0] * len(BUCKETS))]
+
+
+def record_cascade(state: Dict[str, Any], role: str, tier: int, model: str, accepted: bool, wall_s: float) -> None:
+    """
+    Outcome of one cascade attempt (agent draft accepted by MemoryNode, judge reply parsed),
+    kept per role|tier|model in state["telemetry"]["cascade"] with the attempt's wall time.
+    """
+    telemetry = state.get("telemetry") or {}
+    cascade = dict(telemetry.get("cascade") or {})
+    key = f"{role}|{tier}|{model}"
+    cur = cascade.get(key) or {"role": role, "tier": tier, "model": model, "attempts": 0, "accepted": 0, "wall": _hist()}
+    cur = {**cur, "wall": {**cur["wall"], "buckets": list(cur["wall"]["buckets"])}}
+    cur["attempts"] += 1
+    cur["accepted"] += 1 if accepted else 0
+    _observe(cur["wall"], float(wall_s))
+    cascade[key] = cur
+    state["telemetry"] = {**telemetry, "cascade": cascade}
+
+
+_LLM_COUNTERS = ("prompt_tokens", "completion_tokens", "queue_s", "eval_s", "prompt_eval_s", "errors")
+
+
+def _aggregate(telemetry: Dict[str, Any], node: str, wall_s: float, spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    agg = {"nodes": dict(telemetry.get("nodes") or {}), "llm": dict(telemetry.get("llm") or {})}
+    if telemetry.get("cascade"):
+        agg["cascade"] = telemetry["cascade"]
+    n = dict(agg["nodes"].get(node) or _hist())
+    n["buckets"] = list(n["buckets"])
+    _observe(n, wall_s)
+    agg["nodes"][node] = n
+    for s in spans:
+        key = f"{node}|{s.get('model', '')}"
+        cur = agg["llm"].get(key) or {"node": node, "model": s.get("model", ""), "wall": _hist(), **{c: 0 for c in _LLM_COUNTERS}}
+        cur = {**cur, "wall": {**cur["wall"], "buckets": list(cur["wall"]["buckets"])}}
+        _observe(cur["wall"], float(s.get("wall_s", 0.0)))
+        for c in _LLM_COUNTERS[:-1]:
+            cur[c] = round(cur[c] + (s.get(c) or 0), 6)
+        cur["errors"] += 1 if s.get("error") else 0
+        agg["llm"][key] = cur
+    return agg
+
+
+def timed_node(name: str, fn: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Wraps a graph node: measures its wall time, collects the LLM spans it recorded,
+    attaches both to last_node_io["telemetry"] and folds them into state["telemetry"].
+    LoggerNode runs after the wrapped node, so each logged record carries its own spans.
+    """
+
+    @functools.wraps(fn)
+    def wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
+        profiler = active_profiler()
+        with profiler.node(name) if profiler is not None else nullcontext({}) as prof:
+            # Timed inside the profiler block, so its allocation snapshots are not node time.
+            t0 = time.perf_counter()
+            out = fn({**state, "llmspans": []})
+            wall_s = time.perf_counter() - t0
+            spans = list(out.get("llmspans") or [])
+            prof["llm_wait_s"] = sum(float(s.get("wall_s", 0.0)) for s in spans)
+        out["llmspans"] = []
+        out["telemetry"] = _aggregate(out.get("telemetry") or {}, name, wall_s, spans)
+        # LoggerNode only forwards state; its timing goes to the aggregate, not the record it just wrote.
+        node_io = out.get("last_node_io")
+        if name != "LoggerNode" and isinstance(node_io, dict):
+            out["last_node_io"] = {**node_io, "telemetry": {"node": name, "wall_s": round(wall_s, 4), "llm": spans}}
+        return out
+
+    return wrapper
+
+
+def merge_telemetry(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combines the per-debate aggregates of a batch run."""
+    merged: Dict[str, Any] = {"nodes": {}, "llm": {}}
+    for t in items:
+        for node, h in (t.get("nodes") or {}).items():
+            cur = merged["nodes"].setdefault(node, _hist())
+            _merge_hist(cur, h)
+        for key, v in (t.get("llm") or {}).items():
+            cur = merged["llm"].setdefault(key, {"node": v.get("node"), "model": v.get("model"), "wall": _hist(), **{c: 0 for c in _LLM_COUNTERS}})
+            _merge_hist(cur["wall"], v.get("wall") or {})
+            for c in _LLM_COUNTERS:
+                cur[c] = round(cur[c] + (v.get(c) or 0), 6)
+        for key, v in (t.get("cascade") or {}).items():
+            cur = merged.setdefault("cascade", {}).setdefault(key, {"role": v.get("role"), "tier": v.get("tier"), "model": v.get("model"), "attempts": 0, "accepted": 0, "wall": _hist()})
+            _merge_hist(cur["wall"], v.get("wall") or {})
+            cur["attempts"] += int(v.get("attempts") or 0)
+            cur["accepted"] += int(v.get("accepted") or 0)
+    return merged
+
+
+def _labels(**kv: str) -> str:
+    esc = {k: str(v).replace("\\", "\\\\").replace('"', '\\"') for k, v in kv.items()}
+    return "{" + ",".join(f'{k}="{v}"' for k, v in esc.items()) + "}"
+
+
+def _histogram_lines(metric: str, h: Dict[str, Any], labels: Dict[str, str]) -> List[str]:
+    lines = []
+    for le, c in zip(BUCKETS, h["buckets"]):
+        lines.append(f"{metric}_bucket{_labels(**labels, le=repr(le))} {c}")
+    lines.append(f"{metric}_bucket{_labels(**labels, le='+Inf')} {h['count']}")
+    lines.append(f"{metric}_sum{_labels(**labels)} {h['sum']}")
+    lines.append(f"{metric}_count{_labels(**labels)} {h['count']}")
+    return lines
+
+
+def to_prometheus(telemetry: Dict[str, Any]) -> str:
+    """Prometheus text exposition format (for node_exporter's textfile collector or a push gateway)."""
+    lines: List[str] = [
+        "# HELP debate_node_duration_seconds Wall time of one graph node execution.",
+        "# TYPE debate_node_duration_seconds histogram",
+    ]
+    for node, h in sorted((telemetry.get("nodes") or {}).items()):
+        lines += _histogram_lines("debate_node_duration_seconds", h, {"node": node})
+
+    llm = sorted((telemetry.get("llm") or {}).values(), key=lambda v: (v["node"], v["model"]))
+    lines += [
+        "# HELP debate_llm_call_duration_seconds Wall time of one LLM attempt, queue wait included.",
+        "# TYPE debate_llm_call_duration_seconds histogram",
+    ]
+    for v in llm:
+        lines += _histogram_lines("debate_llm_call_duration_seconds", v["wall"], {"node": v["node"], "model": v["model"]})
+
+    counters = (
+        ("debate_llm_prompt_tokens_total", "prompt_tokens", "Prompt tokens evaluated by the model."),
+        ("debate_llm_completion_tokens_total", "completion_tokens", "Tokens generated by the model."),
+        ("debate_llm_queue_seconds_total", "queue_s", "Time LLM calls waited for a model slot."),
+        ("debate_llm_prompt_eval_seconds_total", "prompt_eval_s", "Model time spent on prompt evaluation."),
+        ("debate_llm_eval_seconds_total", "eval_s", "Model time spent generating tokens."),
+        ("debate_llm_errors_total", "errors", "LLM attempts that ended in LLMUnavailable."),
+    )
+    for metric, key, help_text in counters:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+        for v in llm:
+            lines.append(f"{metric}{_labels(node=v['node'], model=v['model'])} {v[key]}")
+
+    lines += ["# HELP debate_llm_tokens_per_second Generation throughput (completion tokens / eval time).", "# TYPE debate_llm_tokens_per_second gauge"]
+    for v in llm:
+        tps = v["completion_tokens"] / v["eval_s"] if v["eval_s"] else 0.0
+        lines.append(f"debate_llm_tokens_per_second{_labels(node=v['node'], model=v['model'])} {round(tps, 3)}")
+
+    cascade = sorted((telemetry.get("cascade") or {}).values(), key=lambda v: (v["role"], v["tier"], v["model"]))
+    if cascade:
+        lines += [
+            "# HELP debate_cascade_attempt_duration_seconds Wall time of one attempt per cascade tier.",
+            "# TYPE debate_cascade_attempt_duration_seconds histogram",
+        ]
+        for v in cascade:
+            lines += _histogram_lines("debate_cascade_attempt_duration_seconds", v["wall"], _cascade_labels(v))
+        for metric, key, help_text in (
+            ("debate_cascade_attempts_total", "attempts", "Attempts made on a cascade tier."),
+            ("debate_cascade_accepted_total", "accepted", "Attempts of a cascade tier that were accepted (agent) or parsed (judge)."),
+        ):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            for v in cascade:
+                lines.append(f"{metric}{_labels(**_cascade_labels(v))} {v[key]}")
+    return "\n".join(lines) + "\n"
+
+
+def _cascade_labels(v: Dict[str, Any]) -> Dict[str, str]:
+    return {"role": v["role"], "tier": str(v["tier"]), "model": v["model"]}
+
+
+def write_prometheus(telemetry: Dict[str, Any], path: str) -> str:
+    abs_path = os.path.abspath(path)
+    os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+    tmp = f"{abs_path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(to_prometheus(telemetry))
+    os.replace(tmp, abs_path)  # textfile collectors must never see a partial file
+    return abs_path
+
+
+def summary_table(telemetry: Dict[str, Any]) -> str:
+    """Fixed-width per-node table for the CLI."""
+    llm_by_node: Dict[str, Dict[str, float]] = {}
+    for v in (telemetry.get("llm") or {}).values():
+        cur = llm_by_node.setdefault(v["node"], {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "queue_s": 0.0, "eval_s": 0.0})
+        cur["calls"] += v["wall"]["count"]
+        for k in ("prompt_tokens", "completion_tokens", "queue_s", "eval_s"):
+            cur[k] += v[k]
+
+    header = f"{'node':<14}{'runs':>6}{'total s':>10}{'mean s':>9}{'max s':>9}{'llm':>6}{'prompt tok':>12}{'compl tok':>11}{'tok/s':>8}{'queue s':>9}"
+    rows = [header, "-" * len(header)]
+    for node, h in sorted((telemetry.get("nodes") or {}).items(), key=lambda kv: -kv[1]["sum"]):
+        l: Dict[str, Any] = llm_by_node.get(node) or {}
+        tps = l["completion_tokens"] / l["eval_s"] if l.get("eval_s") else 0.0
+        mean = h["sum"] / h["count"] if h["count"] else 0.0
+        rows.append(
+            f"{node:<14}{h['count']:>6}{h['sum']:>10.3f}{mean:>9.3f}{h['max']:>9.3f}"
+            f"{int(l.get('calls', 0)):>6}{int(l.get('prompt_tokens', 0)):>12}{int(l.get('completion_tokens', 0)):>11}"
+            f"{tps:>8.1f}{l.get('queue_s', 0.0):>9.3f}"
+        )
+    cascade = sorted((telemetry.get("cascade") or {}).values(), key=lambda v: (v["role"], v["tier"]))
+    if cascade:
+        head = f"{'cascade':<8}{'tier':>5}  {'model':<22}{'attempts':>9}{'accepted':>9}{'rate':>7}{'mean s':>9}{'max s':>9}"
+        rows += ["", head, "-" * len(head)]
+        for v in cascade:
+            h = v["wall"]
+            rate = v["accepted"] / v["attempts"] if v["attempts"] else 0.0
+            mean = h["sum"] / h["count"] if h["count"] else 0.0
+            rows.append(
+                f"{v['role']:<8}{v['tier']:>5}  {v['model'][:21]:<22}{v['attempts']:>9}{v['accepted']:>9}{rate:>7.0%}{mean:>9.3f}{h['max']:>9.3f}"
+            )
+    return "\n".join(rows)
+
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import re
+import shutil
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional, TextIO
+
+_ARG_RE = re.compile(r'^\s*\{\s*"argument"\s*:\s*"')
+_ESCAPES = {"n": " ", "t": " ", "r": " ", '"': '"', "\\": "\\", "/": "/", "b": "", "f": ""}
+_ANSI_RE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+
+_DIM, _STRIKE, _RESET = "\x1b[2m", "\x1b[9m", "\x1b[0m"
+
+
+def draft_text(raw: str) -> str:
+    """
+    Readable text of a partial agent reply: the (possibly unterminated) "argument" string of
+    a JSON reply, or the raw text for non-JSON replies, on one line.
+    """
+    m = _ARG_RE.match(raw)
+    if not m:
+        return "" if raw.lstrip().startswith("{") else " ".join(raw.split())
+    body = raw[m.end():]
+    out = []
+    i = 0
+    while i < len(body):
+        c = body[i]
+        if c == "\\":
+            if i + 1 >= len(body):
+                break
+            n = body[i + 1]
+            if n == "u":
+                if i + 6 > len(body):
+                    break
+                try:
+                    out.append(chr(int(body[i + 2 : i + 6], 16)))
+                except ValueError:
+                    pass
+                i += 6
+                continue
+            out.append(_ESCAPES.get(n, n))
+            i += 2
+            continue
+        if c == '"':
+            break
+        out.append(c)
+        i += 1
+    return " ".join("".join(out).split())
+
+
+class TerminalStreamer:
+    """
+    Shows the agent reply being generated as one in-place line under the accepted rounds:
+    "[Round N] Agent ...: <text so far>". A rejected draft is struck through with its reason
+    and then overwritten by the next draft; clear() removes the draft line before the CLI
+    prints the accepted turn, so the scrollback is the same as without streaming.
+
+    Tokens may arrive from several threads: a hedged duplicate call streams too, and a call
+    the guard gave up on may still be streaming when the next draft begins. begin() takes the
+    owner of the new draft (one per chat_invoke); tokens from any other owner are ignored, and
+    within the owner only the first stream (attempt) to produce a token is displayed. end()
+    redraws with the reply that actually won.
+    """
+
+    def __init__(self, out: Optional[TextIO] = None):
+        self.out = out or sys.stdout
+        self._lock = threading.Lock()
+        self._label: Optional[Dict[str, Any]] = None
+        self._owner: Any = None
+        self._stream: Any = None
+        self._raw = ""
+        self._shown = ""
+        self._rejected = ""
+        self._rows = 0
+        self.first_token_at: Optional[float] = None
+
+    def begin(self, label: Dict[str, Any], owner: Any) -> None:
+        with self._lock:
+            self._erase()
+            self._label, self._owner, self._stream = dict(label), owner, None
+            self._raw, self._rejected = "", ""
+            self._render()
+
+    def token(self, owner: Any, stream: Any, text: str) -> None:
+        with self._lock:
+            if self._label is None or owner is not self._owner:
+                return
+            if self._stream is None:
+                self._stream = stream
+                if self.first_token_at is None:
+                    self.first_token_at = time.time()
+            if stream is not self._stream:
+                return
+            self._raw += text
+            self._render()
+
+    def end(self, owner: Any, text: str) -> None:
+        with self._lock:
+            if self._label is not None and owner is self._owner and text != self._raw:
+                self._raw = text
+                self._render()
+
+    def reject(self, reason: str) -> None:
+        with self._lock:
+            if self._label is not None:
+                self._rejected = reason or "rejected"
+                self._render(force=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._erase()
+            self._label = None
+
+    def _head(self) -> str:
+        lb = self._label or {}
+        retry = f" (retry {lb['retry']})" if lb.get("retry") else ""
+        return f"[Round {lb.get('round', '?')}] {lb.get('agent') or lb.get('speaker', '')}{retry}"
+
+    def _line(self) -> str:
+        text = draft_text(self._raw)
+        if self._rejected:
+            return f"{_DIM}{self._head()} {_STRIKE}{text}{_RESET}{_DIM} [rejected: {self._rejected}]{_RESET}"
+        return f"{_DIM}{self._head()} ...{_RESET} {text}"
+
+    def _render(self, force: bool = False) -> None:
+        line = self._line()
+        if not force and self._shown and line.startswith(self._shown) and "\x1b" not in line[len(self._shown):]:
+            # Common case: the draft only grew; write just the new characters.
+            self._write(line[len(self._shown):])
+        else:
+            self._erase()
+            self._write(line)
+        self._shown = line
+        visible = len(_ANSI_RE.sub("", line))
+        cols = max(1, shutil.get_terminal_size((100, 20)).columns)
+        self._rows = max(1, (visible - 1) // cols + 1)
+        self.out.flush()
+
+    def _erase(self) -> None:
+        if not self._rows:
+            return
+        up = f"\x1b[{self._rows - 1}A" if self._rows > 1 else ""
+        self._write("\r" + up + "\x1b[J")
+        self._rows = 0
+        self._shown = ""
+
+    def _write(self, s: str) -> None:
+        self.out.write(s)
+
+
+_ACTIVE: Optional[TerminalStreamer] = None
+
+
+def install(sink: Optional[TerminalStreamer]) -> None:
+    """run_debate.py installs a streamer on a terminal; nodes.llm_provider.chat_invoke feeds it."""
+    global _ACTIVE
+    _ACTIVE = sink
+
+
+def active_sink() -> Optional[TerminalStreamer]:
+    return _ACTIVE
+
+
+def reject_draft(reason: str) -> None:
+    """Marks the streamed draft as rejected (agent-side checks: non-JSON, empty argument...)."""
+    if _ACTIVE is not None:
+        _ACTIVE.reject(reason)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from typing import Any, Dict
 
+from nodes.semantic import topic_profile
 from nodes.state import DebateState
 
 
@@ -27,6 +28,8 @@ def user_input_node(state: DebateState) -> DebateState:
 
     out["rawtopic"] = raw
     out["topic"] = topic
+    # Built once here; memory_node's topic checks then only scan the argument.
+    out["topicprofile"] = topic_profile(topic)
 
     # assignment requirement
     out["maxrounds"] = 8
@@ -39,6 +42,7 @@ def user_input_node(state: DebateState) -> DebateState:
     out["verdict"] = None
 
     out["turns"] = []
+    out["stance"] = None
     out["summary"] = ""
 
     out["roundidx"] = 0
@@ -56,6 +60,7 @@ def user_input_node(state: DebateState) -> DebateState:
     out["formatviolations"] = []
     out["coherenceflags"] = []
     out["usedquotes"] = []
+    out["parsestats"] = {}
 
     out["memoryfora"] = {"summary": "", "recentturns": [], "lastownturn": None, "lastopponentturn": None, "youare": "AgentA"}
     out["memoryforb"] = {"summary": "", "recentturns": [], "lastownturn": None, "lastopponentturn": None, "youare": "AgentB"}
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from nodes.backend_pool import default_base_url, pool_from_state
+
+
+def warm_model(model: str, base_url: Optional[str] = None, keep_alive: str = "10m", timeout_s: float = 120.0) -> str:
+    """
+    Loads `model` into memory without generating anything: Ollama treats a
+    /api/generate request with no prompt as a preload and honours keep_alive.
+    Returns the base URL that was warmed.
+    """
+    import urllib.request
+
+    url = (base_url or default_base_url()).rstrip("/")
+    body = json.dumps({"model": model, "keep_alive": keep_alive}).encode("utf-8")
+    req = urllib.request.Request(f"{url}/api/generate", data=body, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=timeout_s) as resp:
+        resp.read()
+    return url
+
+
+def warm_model_for_state(state: Dict[str, Any], model: str, keep_alive: str = "10m") -> str:
+    # With a backend pool, warm the server the router would pick so affinity keeps sending the model there.
+    pool = pool_from_state(state)
+    timeout_s = float(state.get("llmtimeout", 120.0))
+    if pool is None:
+        return warm_model(model, keep_alive=keep_alive, timeout_s=timeout_s)
+    with pool.lease(model, timeout_s) as backend:
+        return warm_model(model, backend.url, keep_alive=keep_alive, timeout_s=timeout_s)
+
+
+class Readiness:
+    """
+    Runs startup tasks on background threads and records when each finished.
+    result(name) joins the task and re-raises its error; report() never blocks.
+    """
+
+    def __init__(self, t0: Optional[float] = None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self._threads: Dict[str, threading.Thread] = {}
+        self._results: Dict[str, Any] = {}
+        self._errors: Dict[str, BaseException] = {}
+        self._done_at: Dict[str, float] = {}
+
+    def run(self, name: str, fn: Callable[[], Any]) -> None:
+        def target() -> None:
+            try:
+                self._results[name] = fn()
+            except BaseException as e:  # surfaced by result()/report()
+                self._errors[name] = e
+            finally:
+                self._done_at[name] = time.perf_counter()
+
+        th = threading.Thread(target=target, name=f"startup-{name}", daemon=True)
+        self._threads[name] = th
+        th.start()
+
+    def result(self, name: str, timeout: Optional[float] = None) -> Any:
+        self._threads[name].join(timeout)
+        if name in self._errors:
+            raise self._errors[name]
+        return self._results.get(name)
+
+    def wait(self, name: str, timeout: Optional[float] = None) -> bool:
+        th = self._threads.get(name)
+        if th is None:
+            return False
+        th.join(timeout)
+        return name in self._done_at and name not in self._errors
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        out: Dict[str, Dict[str, Any]] = {}
+        for name in self._threads:
+            if name not in self._done_at:
+                out[name] = {"ready": False, "pending": True}
+            elif name in self._errors:
+                e = self._errors[name]
+                out[name] = {"ready": False, "error": f"{type(e).__name__}: {e}"[:200], "at_s": round(self._done_at[name] - self.t0, 3)}
+            else:
+                out[name] = {"ready": True, "at_s": round(self._done_at[name] - self.t0, 3)}
+        return out
@@ -1,20 +1,36 @@
 from __future__ import annotations
 
+import time
+
+# Process start, for --verbose startup timings.
+_T0 = time.perf_counter()
+_T0_WALL = time.time()
+
 import argparse
 import os
+import sys
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-from nodes.graph_builder import build_graph
+from nodes.dag_export import export_dag_async, exported_path
+from nodes.diagnostics import close_diagnostics
+from nodes.llm_provider import KEEP_ALIVE, parse_cascade, state_models
+from nodes.log_codec import FORMAT_JSONL, FORMATS, close_writer
+from nodes.log_manager import SHARD_NONE, SHARDS, VERBOSITIES, VERBOSITY_NORMAL, debate_log_path, flush as flush_logs
+from nodes.profiling import DebateProfiler, install as install_profiler, profile_table
+from nodes.retry_scheduler import DEFAULT_SCHEDULER, flush_all as flush_retry_stats
+from nodes.state import new_debate_state
+from nodes.telemetry import summary_table, write_prometheus
+from nodes.token_stream import TerminalStreamer, install as install_streamer
+from nodes.warmup import Readiness, warm_model_for_state
 
 
 def project_root() -> str:
     return os.path.dirname(os.path.abspath(__file__))
 
 
-def default_log_path() -> str:
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return os.path.join(project_root(), "examples", f"debate_log_{ts}.jsonl")
+def default_log_path(log_format: str = FORMAT_JSONL, shard: str = SHARD_NONE) -> str:
+    return debate_log_path(os.path.join(project_root(), "examples"), log_format, shard)
 
 
 def default_dag_path() -> str:
@@ -22,6 +38,13 @@ def default_dag_path() -> str:
     return os.path.join(project_root(), "examples", f"debate_dag_{ts}.png")
 
 
+def compiled_graph() -> Any:
+    # Deferred so --help and log tools never pay for langgraph/langchain imports.
+    from nodes.graph_builder import build_graph
+
+    return build_graph()
+
+
 def first_present(d: Dict[str, Any], *keys: str) -> Optional[Any]:
     for k in keys:
         if k in d:
@@ -79,47 +102,108 @@ def _turn_to_cli_text(turn: Dict[str, Any]) -> str:
     return _strip_struct_labels(turn.get("text", ""))
 
 
-def _try_write_dag(app: Any, dag_path: str) -> None:
-    """
-    Best-effort DAG export; will not crash if unsupported.
-    Many LangGraph apps support app.get_graph() then drawing via Mermaid. [web:102][web:238]
-    """
-    try:
-        g = app.get_graph()
-    except Exception:
-        return
-
-    # Try common draw methods
-    try:
-        png_bytes = g.draw_mermaid_png()
-        os.makedirs(os.path.dirname(os.path.abspath(dag_path)), exist_ok=True)
-        with open(dag_path, "wb") as f:
-            f.write(png_bytes)
-        return
-    except Exception:
-        pass
-
-    # Some setups expose draw_png instead (varies by version)
-    try:
-        png_bytes = g.draw_png()
-        os.makedirs(os.path.dirname(os.path.abspath(dag_path)), exist_ok=True)
-        with open(dag_path, "wb") as f:
-            f.write(png_bytes)
-        return
-    except Exception:
-        pass
-
-
 def main() -> None:
     p = argparse.ArgumentParser()
     p.add_argument("--topic", default=None, help="Debate topic; if omitted, you'll be prompted.")
     p.add_argument("--seed", type=int, default=None, help="Optional seed (best-effort determinism).")
     p.add_argument("--log-path", default=None, help="Path to JSONL log file.")
     p.add_argument("--dag-path", default=None, help="Path to DAG PNG output (optional).")
+    p.add_argument(
+        "--log-format",
+        choices=FORMATS,
+        default=FORMAT_JSONL,
+        help="Plain JSONL (default), or delta-encoded records compressed with gzip/zstd (read with scripts/read_log.py).",
+    )
+    p.add_argument(
+        "--log-verbosity",
+        choices=VERBOSITIES,
+        default=VERBOSITY_NORMAL,
+        help="minimal: accepted turns, rejections and the verdict only; debug: adds process diagnostics.",
+    )
+    p.add_argument("--log-shard", choices=SHARDS, default=SHARD_NONE, help="Default log path: examples/, or per date / per hour subdirectories.")
+    p.add_argument("--log-max-bytes", type=int, default=0, help="Rotate a JSONL log past this size and gzip the old part in the background (0 = never).")
     p.add_argument("--max-rounds", type=int, default=8, help="Must be 8 for this assignment.")
     p.add_argument("--recursion-limit", type=int, default=200, help="LangGraph recursion limit.")
+    p.add_argument(
+        "--retry-scheduler",
+        choices=("adaptive", "fixed"),
+        default=DEFAULT_SCHEDULER,
+        help="Retry temperature/hint policy: the fixed ladder, or learned from past rejections "
+        "(first drafts and --seed runs keep the ladder).",
+    )
+    p.add_argument("--retry-stats", default=None, help="Path to the retry scheduler statistics file.")
+    p.add_argument("--llm-timeout", type=float, default=120.0, help="Per-call LLM deadline in seconds.")
+    p.add_argument("--no-hedge", action="store_true", help="Never send a duplicate request for slow LLM calls.")
+    p.add_argument("--llm-retries", type=int, default=2, help="Extra attempts after LLM transport errors.")
+    p.add_argument(
+        "--backends",
+        default=None,
+        help="Comma-separated Ollama URLs, each optionally '=N' for max concurrent requests "
+        "(default: $OLLAMA_BACKENDS, else the single default endpoint).",
+    )
+    p.add_argument(
+        "--cascade",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="MODELS",
+        help="Agent model cascade, cheapest first (default list: llama3.2:1b,llama3.1:8b): "
+        "drafts use the first model, a retry after a rejected draft escalates one tier.",
+    )
+    p.add_argument(
+        "--judge-cascade",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="MODELS",
+        help="Judge model cascade: invalid verdict JSON is retried on the next model.",
+    )
+    p.add_argument("--no-warmup", action="store_true", help="Do not preload the agent/judge models at startup.")
+    p.add_argument("--verbose", action="store_true", help="Print startup readiness and time to first token.")
+    p.add_argument(
+        "--metrics-path",
+        default=None,
+        help="Prometheus text file with per-node latency and LLM token metrics (default: next to the log, .prom).",
+    )
+    p.add_argument("--no-metrics", action="store_true", help="Skip the metrics file and the timing table.")
+    p.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile every node (cProfile, stack sampling, tracemalloc); reports go to <log>.profile/.",
+    )
+    p.add_argument(
+        "--stream",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Show each argument while the model generates it (default: on when stdout is a terminal).",
+    )
     args = p.parse_args()
 
+    overrides: Dict[str, Any] = {
+        "retryscheduler": args.retry_scheduler,
+        "llmtimeout": float(args.llm_timeout),
+        "llmhedge": not args.no_hedge,
+        "llmtransportretries": int(args.llm_retries),
+        "llmbackends": [b for b in (args.backends or "").split(",") if b.strip()],
+        "logformat": args.log_format,
+        "logverbosity": args.log_verbosity,
+        "logmaxbytes": max(0, int(args.log_max_bytes)),
+    }
+    if args.retry_stats:
+        overrides["retrystatspath"] = os.path.abspath(args.retry_stats)
+    if args.cascade is not None:
+        overrides["llmcascade"] = parse_cascade(args.cascade)
+    if args.judge_cascade is not None:
+        overrides["judgecascade"] = parse_cascade(args.judge_cascade)
+
+    # Work that does not need the topic runs while the user is typing it:
+    # graph compilation and a keep_alive preload of the agent and judge models.
+    ready = Readiness(_T0)
+    ready.run("graph", compiled_graph)
+    if not args.no_warmup:
+        for model in state_models(overrides):
+            ready.run(f"warmup:{model}", lambda m=model: warm_model_for_state(overrides, m, KEEP_ALIVE))
+
     topic = args.topic
     if not topic:
         try:
@@ -133,7 +217,7 @@ def main() -> None:
     if args.max_rounds != 8:
         raise SystemExit("Error: This assignment requires exactly 8 rounds. Use --max-rounds 8.")
 
-    log_path = args.log_path or default_log_path()
+    log_path = args.log_path or default_log_path(args.log_format, args.log_shard)
     if not os.path.isabs(log_path):
         log_path = os.path.join(project_root(), log_path)
     os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
@@ -142,45 +226,19 @@ def main() -> None:
     if not os.path.isabs(dag_path):
         dag_path = os.path.join(project_root(), dag_path)
 
-    app = build_graph()
-
-    # Best-effort DAG export (won't fail run if unsupported)
-    _try_write_dag(app, dag_path)
-
-    init_state: Dict[str, Any] = {
-        "rawtopic": topic,
-        "topic": topic,
-        "maxrounds": 8,
-        "maxretries": 2,
-        "logpath": log_path,
-        "seed": args.seed,
-        "gotojudge": True,
-
-        "status": "OK",
-        "error": "",
-        "turns": [],
-        "summary": "",
-        "verdict": None,
-
-        "roundidx": 0,
-        "nextspeaker": "A",
-
-        "pendingspeaker": "A",
-        "pendingagentname": "",
-        "pendingtext": "",
-
-        "coherenceflags": [],
-        "formatviolations": [],
-        "rejectionhistory": [],
-        "retrycount": 0,
-        "retryreason": "",
-        "lastrejectedtext": "",
-        "usedquotes": [],
-        "lastnode": "",
-        "last_node_io": {},
-        "last_node_name": "",
+    app = ready.result("graph")
+    if args.verbose:
+        for name, r in ready.report().items():
+            state_txt = "ready" if r.get("ready") else ("pending" if r.get("pending") else f"failed ({r.get('error')})")
+            at = f" at {r['at_s']:.2f}s" if "at_s" in r else ""
+            print(f"[startup] {name}: {state_txt}{at}")
 
-    }
+    # DAG export renders once per graph structure into .cache/dag and links it here;
+    # it runs in the background and never fails or delays the run. Its path is printed at the
+    # end if it is done by then, since without Graphviz only a .dot file is written.
+    dag_thread, dag_result = export_dag_async(app, dag_path)
+
+    init_state: Dict[str, Any] = new_debate_state(topic, log_path, args.seed, **overrides)
 
     # Sample-style intro
     a_name = init_state.get("agentaname", "Scientist")
@@ -188,11 +246,18 @@ def main() -> None:
     print(f"Starting debate between {a_name} and {b_name}...")
     print(f"Starting debate on: {topic}")
     print(f"Log file: {log_path}\n")
-    print(f"DAG: {dag_path}\n")
 
     last_seen_turns_len = 0
+    first_token_s: Optional[float] = None
     final_state: Dict[str, Any] = init_state
 
+    profiler = DebateProfiler() if args.profile else None
+    install_profiler(profiler)
+
+    # The draft line uses ANSI cursor moves, so it is off when output is piped.
+    streamer = TerminalStreamer() if (sys.stdout.isatty() if args.stream is None else args.stream) else None
+    install_streamer(streamer)
+
     # Stream state updates after each node
     for chunk in app.stream(
         init_state,
@@ -208,10 +273,23 @@ def main() -> None:
 
         final_state = {**final_state, **update}
 
+        if args.verbose and first_token_s is None and node_name in ("AgentA", "AgentB"):
+            guard = ((update.get("last_node_io") or {}).get("output") or {}).get("llm_guard") or {}
+            if guard.get("first_token_at"):
+                first_token_s = float(guard["first_token_at"]) - _T0_WALL
+                print(f"[startup] first token {first_token_s:.2f}s after start")
+
+        if streamer is not None and node_name == "MemoryNode":
+            mem_out = (update.get("last_node_io") or {}).get("output") or {}
+            if mem_out.get("action") == "retry":
+                streamer.reject(", ".join(mem_out.get("reasons") or []))
+
         # Print when a new turn is appended (typically by MemoryNode)
         if node_name == "MemoryNode" and "turns" in update:
             turns = update.get("turns") or []
             if isinstance(turns, list) and len(turns) > last_seen_turns_len:
+                if streamer is not None:
+                    streamer.clear()
                 for t in turns[last_seen_turns_len:]:
                     r = t.get("round")
                     speaker = t.get("speaker")
@@ -221,9 +299,20 @@ def main() -> None:
                 last_seen_turns_len = len(turns)
 
         if update.get("status") == "ERROR":
+            if streamer is not None:
+                streamer.clear()
             print("\n[ERROR]", update.get("error", "Unknown error"))
             break
 
+    if streamer is not None:
+        streamer.clear()
+    install_streamer(None)
+    flush_retry_stats()
+    install_profiler(None)
+    close_writer(final_state.get("logpath", log_path))
+    close_diagnostics(final_state.get("logpath", log_path))
+    flush_logs()
+
     print("\n[Judge]")
     verdict = final_state.get("verdict") or {}
     if isinstance(verdict, dict):
@@ -242,6 +331,24 @@ def main() -> None:
     print("Log:", final_state.get("logpath", log_path))
     print("Final round:", final_state.get("roundidx"))
     print("Last node:", final_state.get("lastnode"))
+    if dag_thread.is_alive():
+        print("DAG: rendering to", dag_path)
+    elif exported_path(dag_result):
+        print("DAG:", exported_path(dag_result))
+    else:
+        print("DAG: not written", f"({dag_result.get('error')})" if dag_result.get("error") else "")
+
+    if not args.no_metrics and final_state.get("telemetry"):
+        metrics_path = args.metrics_path or os.path.splitext(final_state.get("logpath", log_path))[0] + ".prom"
+        print("\n[Timing]")
+        print(summary_table(final_state["telemetry"]))
+        print("Metrics:", write_prometheus(final_state["telemetry"], metrics_path))
+
+    if profiler is not None:
+        profile_dir = os.path.splitext(final_state.get("logpath", log_path))[0] + ".profile"
+        print("\n[Profile]")
+        print(profile_table(profiler.write(profile_dir)))
+        print("Profile:", profile_dir)
 
 
 if __name__ == "__main__":
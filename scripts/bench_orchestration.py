@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Ensure repo root is on sys.path so "import nodes" works even when running:
+#   python scripts/bench_orchestration.py --rounds 2,8,16 --concurrency 1,4
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from nodes.diagnostics import close_diagnostics
+import nodes.graph_builder as graph_builder
+from nodes.log_codec import FORMAT_JSONL, FORMATS, SUFFIXES, close_writer
+from nodes.model_scheduler import install
+from nodes.state import new_debate_state
+from nodes.stub_llm import install_stub
+from nodes.user_input_node import user_input_node
+
+TOPIC = "Should cities replace private cars with autonomous public transit networks?"
+
+
+def _ints(s: str) -> List[int]:
+    return [int(x) for x in s.split(",") if x.strip()]
+
+
+def _state_bytes(update: Dict[str, Any]) -> int:
+    # Serialized size of what a node handed back to LangGraph: every node returns a full
+    # dict(state) copy, so this is the state copied and merged per superstep.
+    return len(json.dumps(update, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+def bench_graph(rounds: int) -> Any:
+    """
+    build_graph() whose UserInputNode sets maxrounds to `rounds` instead of the fixed 8.
+    The round count stays a benchmark-side knob: debate state has no way to change it.
+    """
+
+    def user_input_rounds(state: Dict[str, Any]) -> Dict[str, Any]:
+        out = user_input_node(state)
+        out["maxrounds"] = rounds
+        return out
+
+    graph_builder.user_input_node = user_input_rounds
+    try:
+        return graph_builder.build_graph.__wrapped__()  # uncached: one graph per round count
+    finally:
+        graph_builder.user_input_node = user_input_node
+
+
+def run_debate(app: Any, log_path: str, rounds: int, seed: int, retry_stats: str) -> Dict[str, Any]:
+    """One debate through app.stream; returns supersteps, state bytes per step, node time and log bytes."""
+    state = new_debate_state(TOPIC, log_path, seed, retrystatspath=retry_stats)
+    steps: Dict[str, int] = {}
+    step_bytes: List[int] = []
+    measure_s = 0.0
+    final: Dict[str, Any] = {}
+    t0 = time.perf_counter()
+    try:
+        for chunk in app.stream(state, config={"recursion_limit": 20 * rounds + 50}, stream_mode="updates"):
+            for node, update in chunk.items():
+                m0 = time.perf_counter()
+                steps[node] = steps.get(node, 0) + 1
+                if isinstance(update, dict):
+                    step_bytes.append(_state_bytes(update))
+                    final = update
+                measure_s += time.perf_counter() - m0
+    finally:
+        close_writer(log_path)
+        close_diagnostics(log_path)
+    wall = time.perf_counter() - t0 - measure_s
+
+    node_s = {n: h.get("sum", 0.0) for n, h in ((final.get("telemetry") or {}).get("nodes") or {}).items()}
+    return {
+        "status": final.get("status"),
+        "wall_s": wall,
+        "supersteps": sum(steps.values()),
+        "steps_by_node": steps,
+        "node_s": node_s,
+        "state_bytes_total": sum(step_bytes),
+        "state_bytes_max": max(step_bytes, default=0),
+        "log_bytes": os.path.getsize(log_path) if os.path.exists(log_path) else 0,
+    }
+
+
+def run_config(app: Any, out_dir: str, rounds: int, concurrency: int, debates: int, log_format: str) -> Dict[str, Any]:
+    suffix = SUFFIXES.get(log_format, ".jsonl")
+    retry_stats = os.path.join(out_dir, "retry_stats.json")
+    lock = threading.Lock()
+    results: List[Dict[str, Any]] = []
+
+    def one(i: int) -> None:
+        r = run_debate(app, os.path.join(out_dir, f"bench_r{rounds}_c{concurrency}_{i:04d}{suffix}"), rounds, i, retry_stats)
+        with lock:
+            results.append(r)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        list(ex.map(one, range(debates)))
+    wall = time.perf_counter() - t0
+
+    n = max(1, len(results))
+    steps = sum(r["supersteps"] for r in results)
+    node_s: Dict[str, float] = {}
+    calls: Dict[str, int] = {}
+    for r in results:
+        for k, v in r["node_s"].items():
+            node_s[k] = node_s.get(k, 0.0) + v
+        for k, v in r["steps_by_node"].items():
+            calls[k] = calls.get(k, 0) + v
+    debate_s = sum(r["wall_s"] for r in results)
+    in_nodes = sum(node_s.values())
+    return {
+        "rounds": rounds,
+        "concurrency": concurrency,
+        "debates": len(results),
+        "errors": sum(1 for r in results if r["status"] != "OK"),
+        "wall_s": round(wall, 4),
+        "debates_per_s": round(len(results) / wall, 3) if wall > 0 else 0.0,
+        "supersteps_per_debate": round(steps / n, 2),
+        "debate_s_mean": round(debate_s / n, 5),
+        # Debate wall time outside node functions: LangGraph scheduling, channel writes, routing.
+        "graph_overhead_s_per_step": round(max(0.0, debate_s - in_nodes) / max(1, steps), 6),
+        "node_ms_mean": {k: round(1000 * node_s[k] / max(1, calls.get(k, 0)), 4) for k in sorted(node_s)},
+        "node_s_share": {k: round(node_s[k] / debate_s, 4) if debate_s > 0 else 0.0 for k in sorted(node_s)},
+        "state_bytes_per_step": round(sum(r["state_bytes_total"] for r in results) / max(1, steps)),
+        "state_bytes_step_max": max((r["state_bytes_max"] for r in results), default=0),
+        "log_bytes_per_debate": round(sum(r["log_bytes"] for r in results) / n),
+        "log_bytes_per_step": round(sum(r["log_bytes"] for r in results) / max(1, steps)),
+    }
+
+
+def table(report: Dict[str, Any]) -> str:
+    header = f"{'rounds':>6}{'conc':>5}{'deb/s':>8}{'steps':>7}{'ovh us/step':>12}{'logger ms':>10}{'state KiB/step':>15}{'log KiB':>9}"
+    rows = [header, "-" * len(header)]
+    for c in report["configs"]:
+        rows.append(
+            f"{c['rounds']:>6}{c['concurrency']:>5}{c['debates_per_s']:>8.2f}{c['supersteps_per_debate']:>7.0f}"
+            f"{c['graph_overhead_s_per_step'] * 1e6:>12.1f}{c['node_ms_mean'].get('LoggerNode', 0.0):>10.3f}"
+            f"{c['state_bytes_per_step'] / 1024:>15.1f}{c['log_bytes_per_debate'] / 1024:>9.1f}"
+        )
+    return "\n".join(rows)
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="End-to-end graph benchmark with a zero-latency stub model.")
+    p.add_argument("--rounds", default="2,8,16", help="Comma-separated round counts.")
+    p.add_argument("--concurrency", default="1,4", help="Comma-separated debates in flight.")
+    p.add_argument("--debates", type=int, default=8, help="Debates per configuration.")
+    p.add_argument("--log-format", choices=FORMATS, default=FORMAT_JSONL)
+    p.add_argument("--latency", type=float, default=0.0, help="Stub model latency per call (seconds).")
+    p.add_argument("--out", default=None, help="Write the JSON report here (default: stdout).")
+    p.add_argument("--keep-logs", default=None, help="Directory to keep debate logs in (default: a temp dir).")
+    args = p.parse_args()
+
+    install_stub(args.latency)
+    install(None)
+
+    configs: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="bench_orch_") as tmp:
+        out_dir = args.keep_logs or tmp
+        os.makedirs(out_dir, exist_ok=True)
+        # warm-up (imports, regex caches) in its own dir so its log and retry stats never mix
+        # with a measured config's files
+        with tempfile.TemporaryDirectory(prefix="bench_orch_warmup_") as warm_dir:
+            run_config(bench_graph(2), warm_dir, 2, 1, 1, args.log_format)
+        for rounds in _ints(args.rounds):
+            app = bench_graph(rounds)
+            for conc in _ints(args.concurrency):
+                configs.append(run_config(app, out_dir, rounds, max(1, conc), args.debates, args.log_format))
+                print(f"rounds={rounds} concurrency={conc}: {configs[-1]['debates_per_s']} debates/s", file=sys.stderr)
+
+    report = {"log_format": args.log_format, "stub_latency_s": args.latency, "configs": configs}
+    print(table(report), file=sys.stderr)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return 1 if any(c["errors"] for c in configs) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
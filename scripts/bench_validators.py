@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+# Ensure repo root is on sys.path so "import nodes" works even when running:
+#   python scripts/bench_validators.py
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from nodes.memory_node import memory_node
+from nodes.semantic import (
+    jaccard_ngram,
+    looks_like_fallback,
+    near_duplicate_details,
+    normalize_text,
+    strip_dynamic_tokens,
+)
+from nodes.stance import StanceTracker
+
+DEFAULT_BASELINE = ROOT / "scripts" / "bench_validators.baseline.json"
+TURN_COUNTS = (8, 100, 1000)
+TOPIC = "Should cities replace private cars with autonomous public transit networks?"
+
+_WORDS = (
+    "transit autonomous cities private networks public safety congestion emissions commuters "
+    "infrastructure funding equity rural accessibility liability insurance regulators pilots "
+    "evidence outcomes costs maintenance labour drivers unions zoning density housing budgets "
+    "sensors failure oversight audits data privacy surveillance incentives fares subsidies "
+    "reliability timetables demand peak corridors suburbs disability elderly students freight"
+).split()
+_OPENERS = ("Round {r} shows that", "Turn {r}: the record suggests", "However", "The evidence from {r} pilots means", "Critics argue")
+
+
+def _argument(rng: random.Random, n_chars: int, r: int) -> str:
+    # One paragraph of topic words, sentences of 8-20 words, cut to about n_chars.
+    parts: List[str] = []
+    size = 0
+    while size < n_chars:
+        words = [rng.choice(_WORDS) for _ in range(rng.randint(8, 20))]
+        s = rng.choice(_OPENERS).format(r=r) + " " + " ".join(words) + "."
+        parts.append(s)
+        size += len(s) + 1
+    return " ".join(parts)[:n_chars].rstrip() + "."
+
+
+def transcript(n_turns: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """Synthetic accepted turns with arguments spread over 200-1,100 characters."""
+    rng = random.Random(seed + n_turns)
+    return [
+        {
+            "round": i + 1,
+            "speaker": "A" if i % 2 == 0 else "B",
+            "agent": "Scientist" if i % 2 == 0 else "Philosopher",
+            "text": _argument(rng, rng.randint(200, 1100), i + 1),
+        }
+        for i in range(n_turns)
+    ]
+
+
+def _measure(fn: Callable[[], Any], min_batch_s: float, repeats: int) -> Tuple[float, int]:
+    """
+    Calls per CPU second of the fastest of `repeats` batches. The batch size is calibrated so
+    one batch takes at least min_batch_s; process time and best-of-N keep a busy machine from
+    skewing the figure as much as wall time would.
+    """
+    fn()  # warm caches (re module, interned strings)
+    n = 1
+    while True:
+        t0 = time.process_time()
+        for _ in range(n):
+            fn()
+        elapsed = time.process_time() - t0
+        if elapsed >= min_batch_s:
+            break
+        n = max(n * 2, int(n * min_batch_s / max(elapsed, 1e-6)))
+    best = elapsed
+    for _ in range(max(1, repeats) - 1):
+        t0 = time.process_time()
+        for _ in range(n):
+            fn()
+        best = min(best, time.process_time() - t0)
+    return n / best, n * max(1, repeats)
+
+
+def cases() -> Dict[str, Callable[[], Any]]:
+    """Benchmark name -> zero-argument callable; '@N' is the transcript length."""
+    out: Dict[str, Callable[[], Any]] = {}
+    for n in TURN_COUNTS:
+        turns = transcript(n)
+        texts = [t["text"] for t in turns]
+        rng = random.Random(n)
+        cand = _argument(rng, 650, n + 1)
+        state = {
+            "topic": TOPIC,
+            "turns": turns,
+            "pendingspeaker": "A" if n % 2 == 0 else "B",
+            "pendingagentname": "Scientist",
+            "pendingtext": json.dumps({"argument": cand}),
+            "retrycount": 0,
+            "maxretries": 2,
+            "status": "OK",
+            "coherenceflags": [],
+            "rejectionhistory": [],
+            "pendingattempt": {},
+            "stance": StanceTracker.from_turns(turns),  # built up turn by turn in a real debate
+        }
+
+        # Per-text helpers run over the whole transcript, so ops/s is transcripts per second.
+        out[f"normalize_text@{n}"] = lambda texts=texts: [normalize_text(t) for t in texts]
+        out[f"strip_dynamic_tokens@{n}"] = lambda texts=texts: [strip_dynamic_tokens(t) for t in texts]
+        out[f"looks_like_fallback@{n}"] = lambda texts=texts: [looks_like_fallback(t) for t in texts]
+        out[f"jaccard_ngram@{n}"] = lambda texts=texts, cand=cand: [jaccard_ngram(cand, t) for t in texts]
+        out[f"near_duplicate_details@{n}"] = lambda texts=texts, cand=cand: near_duplicate_details(cand, texts)
+        out[f"memory_node@{n}"] = lambda state=state: memory_node(state)
+    return out
+
+
+def host_fingerprint() -> str:
+    """Identifies the host a baseline is valid for: name, CPU, core count and Python build."""
+    cpu = platform.processor()
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            cpu = next((ln.split(":", 1)[1].strip() for ln in f if ln.startswith("model name")), cpu)
+    except OSError:
+        pass
+    parts = (platform.node(), platform.machine(), cpu, str(os.cpu_count()), platform.python_implementation(), platform.python_version())
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def run(only: str = "", min_batch_s: float = 0.05, repeats: int = 7) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for name, fn in cases().items():
+        if only and only not in name:
+            continue
+        ops, calls = _measure(fn, min_batch_s, repeats)
+        results[name] = {"ops_per_s": round(ops, 3), "calls": calls}
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "platform": platform.platform(terse=True),
+            "host": host_fingerprint(),
+            "min_batch_s": min_batch_s,
+            "repeats": repeats,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Benchmarks whose throughput fell more than `tolerance` (a fraction) below the baseline."""
+    failures: List[str] = []
+    for name, cur in current["results"].items():
+        base = (baseline.get("results") or {}).get(name)
+        if not base:
+            continue
+        floor = base["ops_per_s"] * (1.0 - tolerance)
+        if cur["ops_per_s"] < floor:
+            failures.append(f"{name}: {cur['ops_per_s']:.1f} ops/s < {floor:.1f} (baseline {base['ops_per_s']:.1f}, tolerance {tolerance:.0%})")
+    return failures
+
+
+def gate(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, min_batch_s: float = 0.05, repeats: int = 7) -> List[str]:
+    """
+    compare(), but the slow benchmarks are measured once more (keeping the faster result in
+    `current`) so a noisy moment on the machine does not fail the gate.
+    """
+    failures = compare(current, baseline, tolerance)
+    if not failures:
+        return failures
+    names = [f.split(":", 1)[0] for f in failures]
+    print(f"Re-running {len(names)} slow benchmark(s)...")
+    fns = cases()
+    for name in names:
+        ops, calls = _measure(fns[name], min_batch_s, repeats)
+        if ops > current["results"][name]["ops_per_s"]:
+            current["results"][name] = {"ops_per_s": round(ops, 3), "calls": calls}
+    return compare(current, baseline, tolerance)
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Micro-benchmarks for nodes.semantic and memory_node, with a baseline regression gate.")
+    p.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON to compare against.")
+    p.add_argument("--save-baseline", action="store_true", help="Write this run as the new baseline instead of comparing.")
+    p.add_argument("--tolerance", type=float, default=0.25, help="Allowed throughput drop vs. baseline (0.25 = 25%%).")
+    p.add_argument("--only", default="", help="Run only benchmarks whose name contains this string.")
+    p.add_argument("--min-batch", type=float, default=0.05, help="Minimum CPU seconds per timed batch.")
+    p.add_argument("--repeats", type=int, default=7, help="Timed batches per benchmark; the fastest counts.")
+    p.add_argument("--out", default=None, help="Also write this run's results as JSON here.")
+    args = p.parse_args()
+
+    current = run(args.only, args.min_batch, args.repeats)
+    baseline: Dict[str, Any] = {}
+    if not args.save_baseline and Path(args.baseline).exists():
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+
+    print(f"{'benchmark':<30}{'ops/s':>12}{'baseline':>12}{'change':>9}")
+    for name, cur in current["results"].items():
+        base = (baseline.get("results") or {}).get(name)
+        if base:
+            change = cur["ops_per_s"] / base["ops_per_s"] - 1.0
+            print(f"{name:<30}{cur['ops_per_s']:>12.1f}{base['ops_per_s']:>12.1f}{change:>+9.1%}")
+        else:
+            print(f"{name:<30}{cur['ops_per_s']:>12.1f}{'-':>12}{'':>9}")
+
+    if args.save_baseline:
+        Path(args.baseline).write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+        if args.out:
+            Path(args.out).write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written: {args.baseline}")
+        return 0
+    if not baseline:
+        print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+        return 0
+    if baseline.get("meta", {}).get("host") != current["meta"]["host"]:
+        print("Note: baseline was recorded on a different host; compare with care.")
+
+    failures = gate(current, baseline, args.tolerance, args.min_batch, args.repeats)
+    if args.out:
+        Path(args.out).write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+    for msg in failures:
+        print(f"FAIL: {msg}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Modules that must stay out of the CLI's cold start (loaded on first graph build / LLM call).
+HEAVY_MODULES = ("langgraph", "langchain_core", "langchain_ollama", "ollama", "httpx", "numpy", "sklearn")
+
+DEFAULT_BUDGET_S = 0.25
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def measure(module: str) -> Tuple[float, List[Tuple[int, str]], List[str]]:
+    """
+    Imports `module` in a fresh interpreter with -X importtime.
+    Returns (cumulative seconds for the module, top self-time imports, heavy modules that got loaded).
+    """
+    code = (
+        "import sys; import {m}; "
+        "print('LOADED=' + ','.join(sorted(k for k in sys.modules if k.split('.')[0] in {heavy!r})))"
+    ).format(m=module, heavy=set(HEAVY_MODULES))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=str(ROOT),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = 0
+    selfs: List[Tuple[int, str]] = []
+    for line in proc.stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if not m:
+            continue
+        self_us, cum_us, _, name = int(m.group(1)), int(m.group(2)), m.group(3), m.group(4)
+        selfs.append((self_us, name))
+        if name == module:
+            total_us = cum_us
+    loaded = []
+    for line in proc.stdout.splitlines():
+        if line.startswith("LOADED="):
+            loaded = [x for x in line[len("LOADED="):].split(",") if x]
+    return total_us / 1e6, sorted(selfs, reverse=True)[:10], loaded
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Fail if the CLI's cold-start import time exceeds a budget.")
+    p.add_argument("--module", default="run_debate", help="Module whose import is measured.")
+    p.add_argument("--budget", type=float, default=DEFAULT_BUDGET_S, help="Max cumulative import seconds (best of --runs).")
+    p.add_argument("--runs", type=int, default=3, help="Fresh interpreters to try; the fastest run is judged.")
+    args = p.parse_args()
+
+    results = [measure(args.module) for _ in range(max(1, args.runs))]
+    best, top, loaded = min(results, key=lambda r: r[0])
+
+    print(f"{args.module}: {best * 1000:.1f} ms cumulative import (budget {args.budget * 1000:.0f} ms)")
+    for self_us, name in top:
+        print(f"  {self_us / 1000:7.2f} ms  {name}")
+
+    failures: Dict[str, str] = {}
+    if best > args.budget:
+        failures["budget"] = f"import took {best * 1000:.1f} ms"
+    if loaded:
+        failures["heavy"] = "heavy modules imported at start-up: " + ", ".join(sorted({m.split('.')[0] for m in loaded}))
+    for msg in failures.values():
+        print(f"FAIL: {msg}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Ensure repo root is on sys.path so "import nodes" works even when running:
+#   python scripts/debate_server.py --port 8765 --workers 2
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from nodes.debate_service import DebateService, QueueFull
+from nodes.diagnostics import load_details, resolve_refs, side_path
+from nodes.graph_builder import build_graph
+from nodes.llm_provider import KEEP_ALIVE, parse_cascade, state_models
+from nodes.log_codec import FORMAT_JSONL, FORMATS, detect_format, iter_records, rotated_segments
+from nodes.log_manager import SHARD_NONE, SHARDS, VERBOSITIES, VERBOSITY_NORMAL
+from nodes.model_scheduler import ModelScheduler, install
+from nodes.warmup import Readiness, warm_model_for_state
+
+_JOB_RE = re.compile(r"^/debates/([0-9a-f]{12})(/events|/log|/diag)?/?$")
+
+
+def make_handler(service: DebateService, heartbeat_s: float) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt: str, *args: Any) -> None:
+            pass
+
+        def _send_json(self, payload: Dict[str, Any], status: int = 200, headers: Optional[Dict[str, str]] = None) -> None:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _start_stream(self, content_type: str) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+
+        def do_POST(self) -> None:
+            if self.path.rstrip("/") != "/debates":
+                self._send_json({"error": "not found"}, 404)
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                req = json.loads(self.rfile.read(length).decode("utf-8") or "{}")
+                seed = req.get("seed")
+                job = service.submit(str(req.get("topic") or ""), None if seed is None else int(seed))
+            except QueueFull as e:
+                # Backpressure: the client should retry later rather than pile up work.
+                self._send_json({"error": f"busy: {e}", **service.stats()}, 429, {"Retry-After": "5"})
+                return
+            except (ValueError, TypeError) as e:
+                self._send_json({"error": str(e)}, 400)
+                return
+            self._send_json(
+                {"id": job.id, "status": job.status, "events": f"/debates/{job.id}/events", "log": f"/debates/{job.id}/log", "diag": f"/debates/{job.id}/diag"},
+                202,
+                {"Location": f"/debates/{job.id}"},
+            )
+
+        def do_GET(self) -> None:
+            if self.path == "/health":
+                self._send_json({"status": "ok", **service.stats()})
+                return
+            if self.path == "/metrics":
+                body = service.metrics().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            route, _, query = self.path.partition("?")
+            m = _JOB_RE.match(route)
+            job = service.get(m.group(1)) if m else None
+            if job is None:
+                self._send_json({"error": "not found"}, 404)
+                return
+            if m.group(2) == "/events":
+                self._events(job)
+            elif m.group(2) == "/log":
+                self._log(job.log_path, resolve="resolve=1" in query.split("&"))
+            elif m.group(2) == "/diag":
+                self._diag(job.log_path)
+            else:
+                self._send_json(job.info())
+
+        def _events(self, job: Any) -> None:
+            # Server-sent events: everything so far, then live until the debate finishes.
+            # Last-Event-ID lets a reconnecting client skip what it has already seen.
+            # A missing or malformed header replays from the start.
+            try:
+                start = max(0, int(self.headers.get("Last-Event-ID") or -1) + 1)
+            except ValueError:
+                start = 0
+            self._start_stream("text/event-stream")
+            try:
+                n = start
+                for ev in job.follow(start, heartbeat_s):
+                    if ev is None:
+                        self.wfile.write(b": keep-alive\n\n")
+                    else:
+                        data = json.dumps(ev, ensure_ascii=False)
+                        self.wfile.write(f"id: {n}\nevent: {ev['event']}\ndata: {data}\n\n".encode("utf-8"))
+                        n += 1
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def _log(self, path: str, resolve: bool = False) -> None:
+            if not os.path.exists(path) and not rotated_segments(path):
+                self._send_json({"error": "log not written yet"}, 404)
+                return
+            # The per-debate log, always as JSONL (delta logs and rotated parts are decoded on the fly).
+            # ?resolve=1 joins rejection refs with the details written to the side file so far.
+            details = load_details(path) if resolve else {}
+            self._start_stream("application/x-ndjson")
+            try:
+                if details:
+                    for rec in iter_records(path):
+                        self.wfile.write((json.dumps(resolve_refs(rec, details), ensure_ascii=False) + "\n").encode("utf-8"))
+                elif not rotated_segments(path) and detect_format(path) == FORMAT_JSONL:
+                    with open(path, "rb") as f:
+                        for chunk in iter(lambda: f.read(1 << 16), b""):
+                            self.wfile.write(chunk)
+                else:
+                    for rec in iter_records(path):
+                        self.wfile.write((json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8"))
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def _diag(self, path: str) -> None:
+            # Rejection details (<log>.diag.jsonl): complete once the debate has finished.
+            diag = side_path(path)
+            if not os.path.exists(diag):
+                self._send_json({"error": "no rejection details written yet"}, 404)
+                return
+            self._start_stream("application/x-ndjson")
+            try:
+                with open(diag, "rb") as f:
+                    for chunk in iter(lambda: f.read(1 << 16), b""):
+                        self.wfile.write(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    return Handler
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Local debate service: POST /debates, stream rounds as server-sent events.")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--workers", type=int, default=2, help="Debates run concurrently.")
+    p.add_argument("--max-queue", type=int, default=8, help="Debates allowed to wait for a worker; more get HTTP 429.")
+    p.add_argument("--log-dir", default=str(ROOT / "examples" / "service"), help="Directory for per-debate logs.")
+    p.add_argument("--log-format", choices=FORMATS, default=FORMAT_JSONL)
+    p.add_argument("--log-verbosity", choices=VERBOSITIES, default=VERBOSITY_NORMAL, help="minimal: accepted turns, rejections and verdicts only.")
+    p.add_argument("--log-shard", choices=SHARDS, default=SHARD_NONE, help="Per date / per hour subdirectories under the log dir.")
+    p.add_argument("--log-max-bytes", type=int, default=0, help="Rotate JSONL logs past this size, gzipping old parts (0 = never).")
+    p.add_argument("--model", default=None, help="Agent model (state llmmodel).")
+    p.add_argument("--judge-model", default=None, help="Judge model (state judgemodel).")
+    p.add_argument("--cascade", nargs="?", const="", default=None, metavar="MODELS", help="Agent model cascade, cheapest first; retries escalate one tier (no list: llama3.2:1b,llama3.1:8b).")
+    p.add_argument("--judge-cascade", nargs="?", const="", default=None, metavar="MODELS", help="Judge model cascade; invalid verdict JSON escalates one tier.")
+    p.add_argument("--backends", default=None, help="Comma-separated Ollama URLs, optionally '=N' each.")
+    p.add_argument("--no-residency", action="store_true", help="Do not group LLM calls by resident model.")
+    p.add_argument("--max-inflight", type=int, default=4, help="Concurrent LLM calls on the resident model.")
+    p.add_argument("--retry-stats", default=None, help="Path to the retry scheduler statistics file.")
+    p.add_argument("--no-warmup", action="store_true", help="Do not preload the agent/judge models at startup.")
+    p.add_argument("--keep-finished", type=int, default=256, help="Finished debates whose events stay available.")
+    p.add_argument("--heartbeat", type=float, default=15.0, help="Seconds between SSE keep-alive comments.")
+    p.add_argument("--recursion-limit", type=int, default=200)
+    args = p.parse_args()
+
+    overrides: Dict[str, Any] = {
+        "logformat": args.log_format,
+        "logverbosity": args.log_verbosity,
+        "logmaxbytes": max(0, args.log_max_bytes),
+    }
+    if args.model:
+        overrides["llmmodel"] = args.model
+    if args.judge_model:
+        overrides["judgemodel"] = args.judge_model
+    if args.retry_stats:
+        overrides["retrystatspath"] = os.path.abspath(args.retry_stats)
+    if args.cascade is not None:
+        overrides["llmcascade"] = parse_cascade(args.cascade)
+    if args.judge_cascade is not None:
+        overrides["judgecascade"] = parse_cascade(args.judge_cascade)
+    if args.backends:
+        overrides["llmbackends"] = [b for b in args.backends.split(",") if b.strip()]
+
+    install(None if args.no_residency else ModelScheduler(max_inflight=args.max_inflight))
+    if not args.no_warmup:
+        # Keep the models resident before the first request arrives; failures only delay it.
+        ready = Readiness()
+        for model in state_models(overrides):
+            ready.run(f"warmup:{model}", lambda m=model: warm_model_for_state(overrides, m, KEEP_ALIVE))
+
+    service = DebateService(
+        build_graph(),
+        args.log_dir,
+        workers=args.workers,
+        max_queue=args.max_queue,
+        overrides=overrides,
+        recursion_limit=args.recursion_limit,
+        keep_finished=args.keep_finished,
+        log_shard=args.log_shard,
+    )
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service, args.heartbeat))
+    server.daemon_threads = True
+    print(f"debate service on http://{args.host}:{args.port} ({service.workers} workers, queue {service.max_queue})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+        install(None)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
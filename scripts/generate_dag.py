@@ -9,15 +9,18 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+from nodes.dag_export import export_dag
 from nodes.graph_builder import build_graph
 
 
 def main() -> int:
     out = ROOT / "dag.png"  # always write to repo root
-    graph = build_graph().compile()
-    png_bytes = graph.get_graph().draw_mermaid_png()
-    out.write_bytes(png_bytes)
-    print(f"Wrote {out}")
+    # build_graph() already returns the compiled graph.
+    result = export_dag(build_graph(), str(out))
+    if not result.get("ok"):
+        print(f"PNG rendering unavailable ({result.get('error')}); DOT source: {result.get('dot_path')}")
+        return 1
+    print(f"Wrote {out} ({'cached' if result.get('cache_hit') else 'rendered'}, graph {result['hash']})")
     return 0
 
 
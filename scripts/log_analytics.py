@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Ensure repo root is on sys.path so "import nodes" works even when running:
+#   python scripts/log_analytics.py export logs/ --out analytics/
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from nodes.log_analytics import build_report, export_logs, format_report
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Columnar export of debate logs and a summary report.")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    ex = sub.add_parser("export", help="Parse logs in parallel into .npz or CSV partitions.")
+    ex.add_argument("paths", nargs="*", help="Log files or directories (default: examples/ and logs/).")
+    ex.add_argument("--out", required=True, help="Output directory for part-NNNNN files.")
+    ex.add_argument("--format", choices=("npz", "csv"), default="npz")
+    ex.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    ex.add_argument("--partition-rows", type=int, default=512, help="Debates per partition.")
+
+    rp = sub.add_parser("report", help="Rejection/fallback/winner breakdowns per topic and model.")
+    rp.add_argument("export_dir", help="Directory written by 'export'.")
+    rp.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    rp.add_argument("--top", type=int, default=20, help="Rows per breakdown table.")
+    args = p.parse_args()
+
+    if args.cmd == "export":
+        t0 = time.perf_counter()
+        result = export_logs(
+            args.paths or [str(ROOT / "examples"), str(ROOT / "logs")],
+            args.out,
+            fmt=args.format,
+            workers=args.workers,
+            rows_per_partition=args.partition_rows,
+        )
+        for err in result["errors"]:
+            print(f"skip {err}", file=sys.stderr)
+        print(f"{result['debates']} debates -> {len(result['partitions'])} partitions in {args.out} ({time.perf_counter() - t0:.2f}s)")
+        return 0
+
+    report = build_report(args.export_dir)
+    print(json.dumps(report, indent=2) if args.json else format_report(report, top=args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
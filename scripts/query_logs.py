@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Ensure repo root is on sys.path so "import nodes" works even when running:
+#   python scripts/query_logs.py --reason duplicate_lead_sentence
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from nodes.diagnostics import load_details, resolve_refs
+from nodes.log_index import KEYS, find_logs, match, read_records, update_index
+
+
+def _brief(rec: Dict) -> str:
+    io = rec.get("node_io") or {}
+    out = io.get("output") or {}
+    snap = rec.get("snapshot") or {}
+    action = out.get("action") or out.get("status") or ""
+    reasons = ",".join(out.get("reasons") or [])
+    return f"{rec.get('node', '')} round={snap.get('roundidx')} {action} {reasons}".strip()
+
+
+def _where(log: str, idx: Dict, pos: List[int]) -> str:
+    if idx.get("format") != "jsonl":
+        return f"{log}@{pos[0]}+{pos[1]}"  # frame offset + record in frame
+    if pos[0]:
+        return f"{log}.{pos[0]}#{pos[1]}"  # rotated part + record number
+    return f"{log}@{pos[1]}"
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Query debate logs through per-log offset indexes (<log>.idx.json).")
+    p.add_argument("paths", nargs="*", help="Log files or directories (default: examples/ and logs/).")
+    p.add_argument("--node", help="Record node, e.g. MEMORY, AGENT_A, JUDGE.")
+    p.add_argument("--round", help="Debate round the record concerns.")
+    p.add_argument("--speaker", choices=("A", "B"))
+    p.add_argument("--flag", help="New coherence flag type, e.g. RETRY_EXHAUSTED_FORCED_REWRITE.")
+    p.add_argument("--reason", help="Rejection reason, e.g. duplicate_lead_sentence.")
+    p.add_argument("--count", action="store_true", help="Print match counts per log only.")
+    p.add_argument("--json", action="store_true", help="Print matching records as JSONL.")
+    p.add_argument("--resolve", action="store_true", help="With --json, join rejection refs with their details (<log>.diag.jsonl).")
+    p.add_argument("--limit", type=int, default=0, help="Stop after this many records (0 = no limit).")
+    args = p.parse_args()
+
+    query = {k: getattr(args, k) for k in KEYS if getattr(args, k)}
+    logs = find_logs(args.paths or [str(ROOT / "examples"), str(ROOT / "logs")])
+
+    t0 = time.perf_counter()
+    reindexed = shown = total = 0
+    for log in logs:
+        try:
+            idx, rebuilt = update_index(log)
+        except (OSError, ValueError) as e:
+            print(f"skip {log}: {type(e).__name__}: {e}", file=sys.stderr)
+            continue
+        reindexed += rebuilt
+        ids = match(idx, query)
+        total += len(ids)
+        if args.count:
+            if ids:
+                print(f"{len(ids):>6}  {log}")
+            continue
+        details = load_details(log) if args.json and args.resolve and ids else {}
+        for pos, rec in read_records(log, idx, ids):
+            if args.json:
+                print(json.dumps(resolve_refs(rec, details) if details else rec, ensure_ascii=False))
+            else:
+                print(f"{_where(log, idx, pos)}  {_brief(rec)}")
+            shown += 1
+            if args.limit and shown >= args.limit:
+                break
+        if args.limit and shown >= args.limit:
+            break
+
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    print(f"{total} matches in {len(logs)} logs ({reindexed} re-indexed) in {elapsed_ms:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+# Ensure repo root is on sys.path so "import nodes" works even when running:
+#   python scripts/read_log.py examples/debate_log_<ts>.dlog.gz
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from nodes.diagnostics import load_details, resolve_refs
+from nodes.log_codec import detect_format, frame_offsets, iter_records
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Print debate log records as plain JSONL (any log format).")
+    p.add_argument("path", help="Log file (.jsonl, .dlog.gz or .dlog.zst).")
+    p.add_argument("--offset", type=int, default=0, help="Start at this frame offset (see --frames).")
+    p.add_argument("--frames", action="store_true", help="List frame offsets instead of records.")
+    p.add_argument("--stats", action="store_true", help="Compare on-disk size with the equivalent plain JSONL.")
+    p.add_argument("--resolve", action="store_true", help="Join rejection refs with their details from <log>.diag.jsonl.")
+    args = p.parse_args()
+
+    if args.frames:
+        for off in frame_offsets(args.path):
+            print(off)
+        return 0
+
+    if args.stats:
+        n, plain = 0, 0
+        for rec in iter_records(args.path):
+            n += 1
+            plain += len(json.dumps(rec, ensure_ascii=False).encode("utf-8")) + 1
+        size = os.path.getsize(args.path)
+        ratio = plain / size if size else 0.0
+        print(f"{args.path}: {detect_format(args.path)}, {n} records, {size} bytes on disk, {plain} bytes as JSONL ({ratio:.1f}x)")
+        return 0
+
+    details = load_details(args.path) if args.resolve else {}
+    out = sys.stdout
+    try:
+        for rec in iter_records(args.path, args.offset):
+            if details:
+                rec = resolve_refs(rec, details)
+            out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    except BrokenPipeError:  # e.g. piped into head
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
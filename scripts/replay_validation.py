@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+# Ensure repo root is on sys.path so "import nodes" works even when running:
+#   python scripts/replay_validation.py logs/ --set dup_lead_threshold=0.95
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from nodes.memory_node import DEFAULT_VALIDATION
+from nodes.replay import format_changes, replay_logs
+
+
+def _overrides(args: argparse.Namespace) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for item in args.set or []:
+        key, _, value = item.partition("=")
+        if key not in DEFAULT_VALIDATION or key == "fallback_markers":
+            raise SystemExit(f"Error: unknown setting {key!r}; choose from {', '.join(k for k in DEFAULT_VALIDATION if k != 'fallback_markers')}")
+        try:
+            out[key] = type(DEFAULT_VALIDATION[key])(value)
+        except ValueError:
+            raise SystemExit(f"Error: {key} expects {type(DEFAULT_VALIDATION[key]).__name__}, got {value!r}")
+    if args.fallback_markers:
+        with open(args.fallback_markers, "r", encoding="utf-8") as f:
+            out["fallback_markers"] = [ln.strip().lower() for ln in f if ln.strip() and not ln.startswith("#")]
+    return out
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Re-validate recorded drafts with the current memory_node and report changed decisions.")
+    p.add_argument("paths", nargs="*", help="Log files or directories (default: examples/ and logs/).")
+    p.add_argument("--set", action="append", metavar="KEY=VALUE", help="Validator override, e.g. dup_lead_threshold=0.95 (repeatable).")
+    p.add_argument("--fallback-markers", default=None, help="File with one fallback marker phrase per line (replaces the built-in list).")
+    p.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    p.add_argument("--limit", type=int, default=20, help="Changed decisions to list.")
+    p.add_argument("--json", action="store_true", help="Print the full result as JSON.")
+    args = p.parse_args()
+
+    validation = _overrides(args)
+    t0 = time.perf_counter()
+    totals = replay_logs(args.paths or [str(ROOT / "examples"), str(ROOT / "logs")], validation, args.workers)
+    for err in totals["errors"]:
+        print(f"skip {err}", file=sys.stderr)
+    if args.json:
+        print(json.dumps({"validation": validation, **totals}, ensure_ascii=False, indent=2))
+    else:
+        print(format_changes(totals, args.limit))
+    print(f"replayed in {time.perf_counter() - t0:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+# Ensure repo root is on sys.path so "import nodes" works even when running:
+#   python scripts/retry_report.py
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from nodes.retry_scheduler import RetryStats, default_stats_path, fixed_ladder
+
+
+def _iter_logs(paths: List[str]) -> Iterable[Path]:
+    for p in paths:
+        path = Path(p)
+        if path.is_dir():
+            yield from sorted(path.rglob("*.jsonl"))
+        elif path.is_file():
+            yield path
+
+
+def _agent_calls(node_io: Dict[str, Any]) -> int:
+    out = node_io.get("output") or {}
+    if "llm_calls" in out:
+        return int(out["llm_calls"])
+    # Logs written before llm_calls existed: infer from the attempt index.
+    if "attempt" in out:
+        return int(out["attempt"]) - int(out.get("start_i", 0)) + 1
+    # Fallback after every rung of the ladder (maxretries + 1 rungs; 2 before it was logged).
+    rungs = len(fixed_ladder(0.0, int((node_io.get("input") or {}).get("max_retries", 2))))
+    return rungs - int(out.get("start_i", 0))
+
+
+def summarize_log(path: Path) -> Dict[str, Any]:
+    mode = "fixed"
+    calls = 0
+    accepted = 0
+    retries = 0
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            node_io = rec.get("node_io") or {}
+            node = rec.get("node")
+            if node in ("AGENT_A", "AGENT_B"):
+                mode = (node_io.get("input") or {}).get("retry_scheduler", mode)
+                calls += _agent_calls(node_io)
+            elif node == "MEMORY":
+                action = (node_io.get("output") or {}).get("action")
+                if action == "accept":
+                    accepted += 1
+                elif action == "retry":
+                    retries += 1
+    return {"mode": mode, "calls": calls, "accepted": accepted, "retries": retries}
+
+
+def print_log_report(paths: List[str]) -> None:
+    by_mode: Dict[str, Dict[str, int]] = defaultdict(lambda: {"debates": 0, "calls": 0, "accepted": 0, "retries": 0})
+    for path in _iter_logs(paths):
+        s = summarize_log(path)
+        if not s["accepted"]:
+            continue
+        row = by_mode[s["mode"]]
+        row["debates"] += 1
+        for k in ("calls", "accepted", "retries"):
+            row[k] += s[k]
+
+    print(f"{'scheduler':<10} {'debates':>8} {'turns':>7} {'llm_calls':>10} {'calls/turn':>11} {'mem_retries':>12}")
+    for mode in sorted(by_mode):
+        row = by_mode[mode]
+        per_turn = row["calls"] / row["accepted"] if row["accepted"] else 0.0
+        print(f"{mode:<10} {row['debates']:>8} {row['accepted']:>7} {row['calls']:>10} {per_turn:>11.2f} {row['retries']:>12}")
+
+
+def print_stats_report(stats_path: str) -> None:
+    arms = RetryStats(stats_path).snapshot()
+    if not arms:
+        print(f"No retry statistics at {stats_path}")
+        return
+    print(f"\n{'context':<34} {'arm':<12} {'n':>6} {'ok':>6} {'exp_calls':>10}  top rejection")
+    for context in sorted(arms):
+        for arm, cell in sorted(arms[context].items(), key=lambda kv: -kv[1].get("n", 0)):
+            rate = (cell.get("ok", 0) + 1) / (cell.get("n", 0) + 2)
+            reasons = cell.get("reasons") or {}
+            top = max(reasons, key=reasons.get) if reasons else "-"
+            print(f"{context:<34} {arm:<12} {cell.get('n', 0):>6} {cell.get('ok', 0):>6} {1.0 / rate:>10.2f}  {top}")
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="LLM calls per accepted turn, fixed ladder vs adaptive retry scheduler.")
+    p.add_argument("paths", nargs="*", default=[str(ROOT / "examples"), str(ROOT / "logs")], help="Log files or directories.")
+    p.add_argument("--stats", default=default_stats_path(), help="Retry statistics file to summarize.")
+    args = p.parse_args()
+
+    print_log_report(args.paths)
+    print_stats_report(args.stats)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Ensure repo root is on sys.path so "import nodes" works even when running:
+#   python scripts/run_batch.py --topics-file topics.txt
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from nodes.diagnostics import close_diagnostics
+from nodes.graph_builder import build_graph
+from nodes.llm_provider import parse_cascade
+from nodes.log_codec import FORMAT_JSONL, FORMATS, close_writer
+from nodes.log_manager import SHARD_NONE, SHARDS, VERBOSITIES, VERBOSITY_NORMAL, debate_log_path, flush as flush_logs
+from nodes.model_scheduler import ModelScheduler, install
+from nodes.retry_scheduler import flush_all as flush_retry_stats
+from nodes.state import new_debate_state
+from nodes.telemetry import merge_telemetry, summary_table, write_prometheus
+
+
+def _topics(args: argparse.Namespace) -> List[str]:
+    topics: List[str] = list(args.topic or [])
+    if args.topics_file:
+        with open(args.topics_file, "r", encoding="utf-8") as f:
+            topics.extend(ln.strip() for ln in f if ln.strip() and not ln.startswith("#"))
+    return [t for t in topics for _ in range(max(1, args.repeat))]
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Run many debates concurrently in one process.")
+    p.add_argument("--topic", action="append", help="Debate topic (repeatable).")
+    p.add_argument("--topics-file", default=None, help="File with one topic per line.")
+    p.add_argument("--repeat", type=int, default=1, help="Run each topic this many times.")
+    p.add_argument("--concurrency", type=int, default=4, help="Debates in flight at once.")
+    p.add_argument("--log-dir", default=None, help="Directory for per-debate JSONL logs.")
+    p.add_argument("--log-format", choices=FORMATS, default=FORMAT_JSONL, help="Per-debate log format.")
+    p.add_argument("--log-verbosity", choices=VERBOSITIES, default=VERBOSITY_NORMAL, help="minimal: accepted turns, rejections and verdicts only.")
+    p.add_argument("--log-shard", choices=SHARDS, default=SHARD_NONE, help="Per date / per hour subdirectories under the log dir.")
+    p.add_argument("--log-max-bytes", type=int, default=0, help="Rotate JSONL logs past this size, gzipping old parts (0 = never).")
+    p.add_argument("--seed", type=int, default=None)
+    p.add_argument("--model", default=None, help="Agent model (state llmmodel).")
+    p.add_argument("--judge-model", default=None, help="Judge model (state judgemodel).")
+    p.add_argument("--cascade", nargs="?", const="", default=None, metavar="MODELS", help="Agent model cascade, cheapest first; retries escalate one tier (no list: llama3.2:1b,llama3.1:8b).")
+    p.add_argument("--judge-cascade", nargs="?", const="", default=None, metavar="MODELS", help="Judge model cascade; invalid verdict JSON escalates one tier.")
+    p.add_argument("--backends", default=None, help="Comma-separated Ollama URLs, optionally '=N' each.")
+    p.add_argument("--no-residency", action="store_true", help="Do not group LLM calls by resident model.")
+    p.add_argument("--max-inflight", type=int, default=4, help="Concurrent LLM calls on the resident model.")
+    p.add_argument("--max-wait", type=float, default=30.0, help="Fairness bound: max seconds a call waits for its model.")
+    p.add_argument("--retry-stats", default=None, help="Path to the retry scheduler statistics file.")
+    p.add_argument("--recursion-limit", type=int, default=200)
+    args = p.parse_args()
+
+    topics = _topics(args)
+    if not topics:
+        raise SystemExit("Error: give --topic and/or --topics-file.")
+
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    log_dir = Path(args.log_dir or ROOT / "examples" / f"batch_{ts}")
+    log_dir.mkdir(parents=True, exist_ok=True)
+
+    scheduler = None if args.no_residency else ModelScheduler(max_inflight=args.max_inflight, max_wait_s=args.max_wait)
+    install(scheduler)
+
+    overrides: Dict[str, Any] = {}
+    if args.model:
+        overrides["llmmodel"] = args.model
+    if args.judge_model:
+        overrides["judgemodel"] = args.judge_model
+    if args.retry_stats:
+        overrides["retrystatspath"] = os.path.abspath(args.retry_stats)
+    if args.cascade is not None:
+        overrides["llmcascade"] = parse_cascade(args.cascade)
+    if args.judge_cascade is not None:
+        overrides["judgecascade"] = parse_cascade(args.judge_cascade)
+    overrides["logformat"] = args.log_format
+    overrides["logverbosity"] = args.log_verbosity
+    overrides["logmaxbytes"] = max(0, args.log_max_bytes)
+    if args.backends:
+        overrides["llmbackends"] = [b for b in args.backends.split(",") if b.strip()]
+
+    app = build_graph()
+
+    telemetry: List[Dict[str, Any]] = []
+
+    def run_one(i: int, topic: str) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        seed = None if args.seed is None else args.seed + i
+        log_path = debate_log_path(str(log_dir), args.log_format, args.log_shard, prefix=f"debate_log_{i:04d}")
+        state = new_debate_state(topic, log_path, seed, **overrides)
+        try:
+            final = app.invoke(state, config={"recursion_limit": int(args.recursion_limit)})
+        finally:
+            close_writer(state["logpath"])
+            close_diagnostics(state["logpath"])
+        verdict = final.get("verdict") or {}
+        telemetry.append(final.get("telemetry") or {})
+        return {
+            "index": i,
+            "topic": topic,
+            "status": final.get("status"),
+            "winner": verdict.get("winner"),
+            "rounds": final.get("roundidx"),
+            "seconds": round(time.perf_counter() - t0, 3),
+            "log": final.get("logpath"),
+        }
+
+    t_start = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as ex:
+        futures = [ex.submit(run_one, i, t) for i, t in enumerate(topics)]
+        for fut in as_completed(futures):
+            try:
+                r = fut.result()
+            except Exception as e:
+                r = {"status": "ERROR", "error": f"{type(e).__name__}: {e}"}
+            results.append(r)
+            print(f"[{len(results)}/{len(topics)}] {r.get('status')} {r.get('winner') or '-'} {r.get('seconds', '-')}s {r.get('topic', '')[:60]}")
+
+    wall = time.perf_counter() - t_start
+    summary: Dict[str, Any] = {
+        "debates": len(results),
+        "errors": sum(1 for r in results if r.get("status") != "OK"),
+        "wall_s": round(wall, 3),
+        "max_debate_s": max((r.get("seconds", 0.0) for r in results), default=0.0),
+        "scheduler": scheduler.counters() if scheduler is not None else None,
+        "results": sorted(results, key=lambda r: r.get("index", -1)),
+    }
+    flush_retry_stats()
+    flush_logs()
+    install(None)
+
+    out = log_dir / "batch_summary.json"
+    out.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+    merged = merge_telemetry(telemetry)
+    metrics = write_prometheus(merged, str(log_dir / "metrics.prom"))
+    print(f"\n{summary['debates']} debates in {summary['wall_s']}s ({summary['errors']} errors); slowest {summary['max_debate_s']}s")
+    if scheduler is not None:
+        c = summary["scheduler"]
+        print(f"model switches: {c['model_switches']} (fairness: {c['fairness_switches']}), grants: {c['grants']}")
+        print(f"queue wait: avg {c['avg_queue_wait_s']}s, max {c['max_queue_wait_s']}s")
+    print("\n" + summary_table(merged))
+    print(f"Summary: {out}")
+    print(f"Metrics: {metrics}")
+    return 0 if not summary["errors"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Ensure repo root is on sys.path so "import nodes" works even when running:
+#   python scripts/soak_memory.py --debates 2000
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from nodes.diagnostics import close_diagnostics, side_path
+from nodes.log_codec import FORMAT_JSONL, FORMATS, SUFFIXES, close_writer
+from nodes.model_scheduler import install
+from nodes.retry_scheduler import flush_all as flush_retry_stats
+from nodes.state import new_debate_state
+from nodes.stub_llm import install_stub
+
+from bench_orchestration import bench_graph  # scripts/ is sys.path[0] when run as a script
+
+TOPIC = "Should cities replace private cars with autonomous public transit networks?"
+
+
+def rss_bytes() -> int:
+    """Current resident set size (Linux /proc), else the peak from getrusage."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def slope(xs: List[float], ys: List[float]) -> float:
+    """Least-squares growth of ys per unit of xs (bytes per debate)."""
+    n = len(xs)
+    if n < 2:
+        return 0.0
+    mx, my = sum(xs) / n, sum(ys) / n
+    var = sum((x - mx) ** 2 for x in xs)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / var if var else 0.0
+
+
+def _sample(done: int, t0: float) -> Dict[str, Any]:
+    gc.collect()
+    traced, _ = tracemalloc.get_traced_memory()
+    return {"debates": done, "elapsed_s": round(time.perf_counter() - t0, 2), "rss_bytes": rss_bytes(), "traced_bytes": traced, "gc_objects": len(gc.get_objects())}
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+
+
+def top_sites(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, limit: int) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    for stat in after.compare_to(before, "traceback")[:limit]:
+        if stat.size_diff <= 0:
+            break
+        out.append(
+            {
+                "size_diff": stat.size_diff,
+                "count_diff": stat.count_diff,
+                "traceback": [f"{fr.filename}:{fr.lineno}" for fr in stat.traceback],
+            }
+        )
+    return out
+
+
+def run(debates: int, rounds: int, warmup: int, interval: int, log_format: str, log_dir: str, keep_logs: bool, top: int) -> Dict[str, Any]:
+    app = bench_graph(rounds)
+    suffix = SUFFIXES.get(log_format, ".jsonl")
+    retry_stats = os.path.join(log_dir, "retry_stats.json")
+    samples: List[Dict[str, Any]] = []
+    errors = 0
+    base_snap: Optional[tracemalloc.Snapshot] = None
+    t0 = time.perf_counter()
+
+    for i in range(warmup + debates):
+        log_path = os.path.join(log_dir, f"soak_{i:06d}{suffix}")
+        state = new_debate_state(TOPIC, log_path, i, retrystatspath=retry_stats, logformat=log_format)
+        try:
+            final = app.invoke(state, config={"recursion_limit": 20 * rounds + 50})
+            errors += final.get("status") != "OK"
+        finally:
+            close_writer(log_path)
+            close_diagnostics(log_path)
+            if not keep_logs:
+                for path in (log_path, side_path(log_path)):
+                    if os.path.exists(path):
+                        os.remove(path)
+        del state
+        final = None
+
+        done = i + 1 - warmup
+        if done == 0:
+            # Warm-up over: imports, compiled regexes and first-use caches are in place.
+            samples.append(_sample(0, t0))
+            base_snap = _snapshot()
+        elif done > 0 and (done % interval == 0 or done == debates):
+            samples.append(_sample(done, t0))
+            print(
+                f"[{done}/{debates}] rss {samples[-1]['rss_bytes'] / 2**20:.1f} MiB, "
+                f"traced {samples[-1]['traced_bytes'] / 2**20:.2f} MiB, {samples[-1]['elapsed_s']}s",
+                file=sys.stderr,
+            )
+
+    flush_retry_stats()
+    end_snap = _snapshot()
+    # The first measured interval still absorbs one-time growth (LangGraph's signature caches,
+    # the allocator's arenas), so the per-debate fit starts at the first interval sample.
+    fit = samples[1:] if len(samples) >= 3 else samples
+    xs = [float(s["debates"]) for s in fit]
+    return {
+        "debates": debates,
+        "warmup": warmup,
+        "rounds": rounds,
+        "errors": errors,
+        "traced_growth_per_debate": round(slope(xs, [float(s["traced_bytes"]) for s in fit]), 1),
+        "rss_growth_per_debate": round(slope(xs, [float(s["rss_bytes"]) for s in fit]), 1),
+        "gc_objects_growth_per_debate": round(slope(xs, [float(s["gc_objects"]) for s in fit]), 3),
+        "samples": samples,
+        "top_sites": top_sites(base_snap, end_snap, top) if base_snap is not None else [],
+    }
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Run many debates in one process against the stub model and fail on memory growth.")
+    p.add_argument("--debates", type=int, default=2000, help="Measured debates (after warm-up).")
+    p.add_argument("--rounds", type=int, default=4, help="Rounds per debate.")
+    p.add_argument("--warmup", type=int, default=20, help="Debates run before the baseline sample.")
+    p.add_argument("--interval", type=int, default=100, help="Sample memory every N debates.")
+    p.add_argument("--log-format", choices=FORMATS, default=FORMAT_JSONL)
+    p.add_argument("--log-dir", default=None, help="Where debate logs go (default: a temp dir).")
+    p.add_argument("--keep-logs", action="store_true", help="Keep each debate's log instead of deleting it.")
+    p.add_argument("--max-traced-growth", type=float, default=1024.0, help="Fail above this many tracemalloc bytes per debate.")
+    p.add_argument("--max-rss-growth", type=float, default=16384.0, help="Fail above this many RSS bytes per debate.")
+    p.add_argument("--nframes", type=int, default=1, help="tracemalloc traceback depth (each extra frame slows debates down noticeably).")
+    p.add_argument("--top", type=int, default=15, help="Allocation sites to report.")
+    p.add_argument("--out", default=None, help="Write the JSON report here.")
+    args = p.parse_args()
+
+    install_stub()
+    install(None)
+    tracemalloc.start(max(1, args.nframes))
+    with tempfile.TemporaryDirectory(prefix="soak_") as tmp:
+        log_dir = args.log_dir or tmp
+        os.makedirs(log_dir, exist_ok=True)
+        report = run(args.debates, args.rounds, args.warmup, max(1, args.interval), args.log_format, log_dir, args.keep_logs, args.top)
+    tracemalloc.stop()
+
+    failures: List[str] = []
+    if report["errors"]:
+        failures.append(f"{report['errors']} debates ended in ERROR")
+    if report["traced_growth_per_debate"] > args.max_traced_growth:
+        failures.append(f"traced memory grows {report['traced_growth_per_debate']:.0f} B/debate (max {args.max_traced_growth:.0f})")
+    if report["rss_growth_per_debate"] > args.max_rss_growth:
+        failures.append(f"RSS grows {report['rss_growth_per_debate']:.0f} B/debate (max {args.max_rss_growth:.0f})")
+    report["failures"] = failures
+
+    print(
+        f"{report['debates']} debates ({report['rounds']} rounds): traced {report['traced_growth_per_debate']:+.0f} B/debate, "
+        f"RSS {report['rss_growth_per_debate']:+.0f} B/debate, gc objects {report['gc_objects_growth_per_debate']:+.2f}/debate"
+    )
+    print("Top allocation sites since warm-up:")
+    for site in report["top_sites"]:
+        print(f"  {site['size_diff']:>10} B {site['count_diff']:>+7} blocks  {site['traceback'][0] if site['traceback'] else '?'}")
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    for msg in failures:
+        print(f"FAIL: {msg}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Ensure repo root is on sys.path so "import nodes" works even when running:
+#   python scripts/stub_ollama_server.py --port 11501
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from nodes.stub_llm import ollama_metadata, stub_reply
+
+
+class StubState:
+    """What a real Ollama server would hold: resident models (LRU, bounded) and request counters."""
+
+    def __init__(self, max_loaded: int, load_delay_s: float, latency_s: float):
+        self.lock = threading.Lock()
+        self.max_loaded = max_loaded
+        self.load_delay_s = load_delay_s
+        self.latency_s = latency_s
+        self.loaded: List[str] = []
+        self.requests = 0
+        self.loads = 0
+
+    def touch(self, model: str) -> float:
+        """Returns the load delay to pay (0 when the model is already resident)."""
+        with self.lock:
+            self.requests += 1
+            if model in self.loaded:
+                self.loaded.remove(model)
+                self.loaded.append(model)
+                return 0.0
+            self.loaded.append(model)
+            self.loads += 1
+            while len(self.loaded) > self.max_loaded:
+                self.loaded.pop(0)
+            return self.load_delay_s
+
+
+def make_handler(state: StubState) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt: str, *args: Any) -> None:
+            pass
+
+        def _send_json(self, payload: Dict[str, Any], status: int = 200) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            if self.path == "/api/ps":
+                with state.lock:
+                    models = [{"name": m, "model": m} for m in state.loaded]
+                self._send_json({"models": models})
+            elif self.path == "/api/tags":
+                with state.lock:
+                    models = [{"name": m, "model": m} for m in state.loaded]
+                self._send_json({"models": models})
+            elif self.path == "/stats":
+                with state.lock:
+                    self._send_json({"requests": state.requests, "loads": state.loads, "loaded": list(state.loaded)})
+            else:
+                self._send_json({"error": "not found"}, 404)
+
+        def do_HEAD(self) -> None:
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            req = json.loads(self.rfile.read(length).decode("utf-8") or "{}")
+            model = str(req.get("model", "stub"))
+            t0 = time.perf_counter()
+            delay = state.touch(model) + state.latency_s
+
+            if self.path == "/api/generate":
+                # Ollama preloads a model for an empty-prompt generate.
+                time.sleep(delay)
+                self._send_json({"model": model, "response": "", "done": True, "done_reason": "load"})
+                return
+            if self.path != "/api/chat":
+                self._send_json({"error": "not found"}, 404)
+                return
+
+            time.sleep(delay)
+            messages = req.get("messages") or []
+            reply = stub_reply(messages)
+            prompt = "".join(str(m.get("content", "")) for m in messages)
+            meta = ollama_metadata(model, prompt, reply, time.perf_counter() - t0)
+            created = datetime.now(timezone.utc).isoformat()
+
+            if not req.get("stream", True):
+                self._send_json({**meta, "created_at": created, "message": {"role": "assistant", "content": reply}})
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            def chunk(obj: Dict[str, Any]) -> None:
+                data = (json.dumps(obj) + "\n").encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+
+            for i in range(0, len(reply), 8):
+                chunk({"model": model, "created_at": created, "message": {"role": "assistant", "content": reply[i : i + 8]}, "done": False})
+            chunk({**meta, "created_at": created, "message": {"role": "assistant", "content": ""}})
+            self.wfile.write(b"0\r\n\r\n")
+
+    return Handler
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Minimal Ollama-compatible stand-in (/api/chat, /api/generate, /api/ps).")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=11501, help="Port to listen on; run several for a backend pool.")
+    p.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request.")
+    p.add_argument("--max-loaded", type=int, default=1, help="Models kept resident before evicting the least recent.")
+    p.add_argument("--load-delay", type=float, default=0.0, help="Seconds a cold model load costs.")
+    args = p.parse_args()
+
+    state = StubState(max_loaded=max(1, args.max_loaded), load_delay_s=args.load_delay, latency_s=args.latency)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    print(f"stub ollama listening on http://{args.host}:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,102 @@
+"""Every log format, and rotated JSONL logs, must read back as the records that were written."""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+from nodes.log_codec import (
+    FORMAT_DELTA_ZSTD,
+    FORMAT_JSONL,
+    FORMATS,
+    SUFFIXES,
+    DeltaLogWriter,
+    detect_format,
+    frame_offsets,
+    iter_records,
+    rotated_segments,
+)
+from nodes.log_manager import append_jsonl, flush
+
+
+def _records(n: int = 40) -> List[Dict[str, Any]]:
+    # Shaped like LoggerNode records: nested state that grows, keys that come and go.
+    out = []
+    turns: List[Dict[str, Any]] = []
+    for i in range(n):
+        if i % 3 == 2:
+            turns = turns + [{"round": len(turns) + 1, "speaker": "AB"[len(turns) % 2], "text": f"Argument {i} – ünïcode"}]
+        rec: Dict[str, Any] = {
+            "ts": f"2026-10-19T00:00:{i:02d}",
+            "node": ("AGENT_A", "MEMORY", "AGENT_B", "MEMORY")[i % 4],
+            "snapshot": {"roundidx": len(turns), "turns": turns, "flags": [] if i % 5 else ["X"]},
+            "node_io": {"output": {"attempt": i % 3, "score": i / 7}},
+        }
+        if i % 4 == 1:
+            rec["node_io"]["output"]["reasons"] = ["duplicate_lead_sentence"]
+        if i % 6 == 0:
+            rec["error"] = None
+        out.append(rec)
+    return out
+
+
+def _write(path: str, fmt: str, records: List[Dict[str, Any]]) -> None:
+    if fmt == FORMAT_JSONL:
+        for rec in records:
+            append_jsonl(path, json.dumps(rec, ensure_ascii=False))
+        return
+    w = DeltaLogWriter(path, fmt, keyframe_every=8)
+    for rec in records:
+        w.append(rec, fsync=False)
+    w.close()
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_round_trip(tmp_path: Path, fmt: str) -> None:
+    if fmt == FORMAT_DELTA_ZSTD:
+        pytest.importorskip("zstandard")
+    path = str(tmp_path / f"log{SUFFIXES.get(fmt, '.jsonl')}")
+    records = _records()
+    _write(path, fmt, records)
+    assert detect_format(path) == fmt
+    assert list(iter_records(path)) == records
+
+
+@pytest.mark.parametrize("fmt", [f for f in FORMATS if f != FORMAT_JSONL])
+def test_delta_log_reads_from_any_frame(tmp_path: Path, fmt: str) -> None:
+    if fmt == FORMAT_DELTA_ZSTD:
+        pytest.importorskip("zstandard")
+    path = str(tmp_path / f"log{SUFFIXES[fmt]}")
+    records = _records()
+    _write(path, fmt, records)
+    offsets = frame_offsets(path)
+    assert len(offsets) == 5  # a keyframe every 8 of 40 records
+    for k, off in enumerate(offsets):
+        assert list(iter_records(path, off)) == records[k * 8 :]
+
+
+@pytest.mark.parametrize("compress", [False, True], ids=["plain-parts", "gzipped-parts"])
+def test_rotated_jsonl_round_trip(tmp_path: Path, compress: bool) -> None:
+    path = str(tmp_path / "log.jsonl")
+    records = _records()
+    for rec in records:
+        append_jsonl(path, json.dumps(rec, ensure_ascii=False), max_bytes=2000, compress=compress)
+    flush()
+    segments = rotated_segments(path)
+    assert len(segments) > 2
+    assert all(s.endswith(".gz") == compress for s in segments)
+    assert list(iter_records(path)) == records
+
+
+def test_rotated_log_without_live_file(tmp_path: Path) -> None:
+    # The last append can rotate the live file away; the parts alone still hold every record.
+    path = str(tmp_path / "log.jsonl")
+    records = _records(10)
+    for rec in records:
+        append_jsonl(path, json.dumps(rec, ensure_ascii=False), max_bytes=1)
+    flush()
+    assert not os.path.exists(path)
+    assert list(iter_records(path)) == records
@@ -0,0 +1,63 @@
+"""
+The performance gates of scripts/ under pytest: the import-time budget of the CLI and the
+validator micro-benchmarks against their recorded baseline. Both stay runnable on their own
+(python scripts/check_import_time.py, python scripts/bench_validators.py).
+
+Absolute timings only mean something on the host they were recorded on, so the gates are
+opt-in: PERF_GATES=1 python -m pytest -q tests
+"""
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import sys
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+perf_gate = pytest.mark.skipif(os.environ.get("PERF_GATES") != "1", reason="timing gate; set PERF_GATES=1 to run")
+
+
+def _script(name: str) -> ModuleType:
+    # scripts/ is not a package; load the module from its file.
+    spec = importlib.util.spec_from_file_location(f"scripts_{name}", ROOT / "scripts" / f"{name}.py")
+    assert spec is not None and spec.loader is not None
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+@perf_gate
+def test_cli_import_time_within_budget() -> None:
+    check = _script("check_import_time")
+    best, top, loaded = min((check.measure("run_debate") for _ in range(3)), key=lambda r: r[0])
+    assert not loaded, f"heavy modules imported at start-up: {loaded}"
+    slowest = ", ".join(f"{name} {us / 1000:.1f} ms" for us, name in top[:3])
+    assert best <= check.DEFAULT_BUDGET_S, f"import took {best * 1000:.1f} ms (slowest: {slowest})"
+
+
+@perf_gate
+def test_validators_within_baseline() -> None:
+    bench = _script("bench_validators")
+    if not bench.DEFAULT_BASELINE.exists():
+        pytest.skip(f"no baseline at {bench.DEFAULT_BASELINE}; run bench_validators.py --save-baseline")
+    baseline = json.loads(bench.DEFAULT_BASELINE.read_text(encoding="utf-8"))
+    if baseline.get("meta", {}).get("host") != bench.host_fingerprint():
+        pytest.skip("baseline was recorded on a different host; re-record it with --save-baseline")
+    current = bench.run()
+    assert set(current["results"]) >= set(baseline.get("results") or {}), "benchmarks missing from run()"
+    failures = bench.gate(current, baseline, 0.25)
+    assert not failures, "\n".join(failures)
+
+
+def test_compare_flags_only_real_drops() -> None:
+    bench = _script("bench_validators")
+    baseline = {"results": {"a": {"ops_per_s": 100.0}, "b": {"ops_per_s": 100.0}}}
+    current = {"results": {"a": {"ops_per_s": 80.0}, "b": {"ops_per_s": 70.0}, "new": {"ops_per_s": 1.0}}}
+    failures = bench.compare(current, baseline, 0.25)
+    assert [f.split(":", 1)[0] for f in failures] == ["b"]
@@ -0,0 +1,66 @@
+"""parse_json_object decides which agent drafts are retried and which verdicts escalate."""
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from nodes.structured_output import (
+    PATH_FAILED,
+    PATH_REPAIRED,
+    PATH_STRICT,
+    PATH_TRUNCATED,
+    parse_json_object,
+)
+
+
+def test_strict() -> None:
+    assert parse_json_object('{"argument": "Transit is safer."}') == ({"argument": "Transit is safer."}, PATH_STRICT)
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        '```json\n{"argument": "Transit is safer."}\n```',
+        'Here is my answer:\n{"argument": "Transit is safer."}\nThanks!',
+        '{"argument": "Transit is safer.",}',
+        '```\n{"argument": "Transit is safer.", }\n```',
+        json.dumps(json.dumps({"argument": "Transit is safer."})),
+        "{'argument': 'Transit is safer.'}",
+    ],
+    ids=["fenced", "prose", "trailing-comma", "fenced-trailing-comma", "double-encoded", "python-dict"],
+)
+def test_repaired(raw: str) -> None:
+    assert parse_json_object(raw) == ({"argument": "Transit is safer."}, PATH_REPAIRED)
+
+
+def test_repaired_values_are_unescaped() -> None:
+    # Escapes left over from a python-style dict, and raw newlines inside a JSON string.
+    data, path = parse_json_object("{'argument': 'He said \\\\\"no\\\\\".\\\\nThen left.'}")
+    assert (data, path) == ({"argument": 'He said "no". Then left.'}, PATH_REPAIRED)
+    data, path = parse_json_object('Reply: {"argument": "First line\n\tsecond line"}')
+    assert (data, path) == ({"argument": "First line second line"}, PATH_REPAIRED)
+
+
+@pytest.mark.parametrize(
+    "raw, recovered",
+    [
+        ('{"argument": "Car-free downtowns cut injuries, but rural', "Car-free downtowns cut injuries, but rural"),
+        ('```json\n{"argument": "Ends on an escape \\', "Ends on an escape "),
+        ('{"summary": "Close debate", "winner": {"name": "Scientist"', None),
+    ],
+    ids=["mid-string", "mid-escape", "nested"],
+)
+def test_truncated_is_not_repaired(raw: str, recovered: str) -> None:
+    data, path = parse_json_object(raw)
+    assert path == PATH_TRUNCATED
+    assert data is not None
+    if recovered is not None:
+        assert data["argument"] == recovered
+
+
+@pytest.mark.parametrize("raw", ["", "   ", "I cannot answer that.", "[1, 2, 3]", "{not: valid, at all"])
+def test_garbage_fails(raw: str) -> None:
+    data, path = parse_json_object(raw)
+    assert path == PATH_FAILED
+    assert data is None